@@ -1,9 +1,9 @@
-import copy
 import math
-import sys
-from PIL import Image, ImageQt
-from PyQt5 import QtWidgets, QtCore, QtGui, QtWidgets
+from PyQt5 import QtWidgets, QtCore, QtGui, QtWidgets, sip
+from color_effects import apply_color_effect
+from label_cache import labels
 from new_sprite_ui import Ui_Dialog as NewSpriteUI
+from sheet_cache import sheets
 from sprite import Sprite
 import numpy as np
 
@@ -13,7 +13,6 @@ class NewSpriteDialog(NewSpriteUI):
         self.parent = parent
         self.animator = animator
         parent.setWindowTitle("Add New Sprite")
-        sys.setrecursionlimit(10000)
 
         self.from_sprite = from_sprite
         self.__x_offset = 0
@@ -140,54 +139,24 @@ class NewSpriteDialog(NewSpriteUI):
 
     def __generate_x_y_w_h(self, point: tuple) -> None:
         """
-        This method will automatically slice the sprite
+        This method will automatically slice the sprite: the sprite is the bounding box of the opaque pixels
+        connected to the clicked one, diagonals included (see LabelCache)
 
         @param point: (x, y) based on where user clicked on the preview.
         """
         x, y = point
-        np_image = NewSpriteDialog.__pixmap_to_numpy(self.slicer_pixmap)
-
-        if x < 0 or y < 0 or x >= np_image.shape[1] or y >= np_image.shape[0]:
+        if not self.image_file: return
+        try:
+            bounds = labels.bounds_at(self.image_file, x, y)
+        except OSError:
             return
-
-        np_pixels_checked = np.zeros(np_image.shape[:-1], dtype=np.uint8)
-        self.min_x, self.max_x = None, None
-        self.min_y, self.max_y = None, None
-
-        if np_image[y, x, 3] == 0:  # clicked on transparent pixel (no sprite to be found)
+        if bounds is None:  # clicked outside the image or on a transparent pixel (no sprite to be found)
             return
 
-        self.__sprite_finder(x, y, np_image, np_pixels_checked, 0)
-
-        self.x = self.min_x
-        self.y = self.min_y
-        self.w = self.max_x - self.min_x + 1
-        self.h = self.max_y - self.min_y + 1
+        self.x, self.y, self.w, self.h = bounds
 
         self.__update_sprite_dimensions_textboxes()
 
-    def __sprite_finder(self, x: int, y: int, image: np.ndarray, pixels_checked: np.ndarray, count) -> None:
-        """
-        Recursive method to find the max and min x y coordinates of a clicked sprite
-        @param x: x coordinate
-        @param y: y coordinate
-        @param image: numpy array of the image
-        @param pixels_checked: numpy array of the pixels that have been checked (all zeros by default) (1 for checked) (same shape as image)0
-        """
-        if count > 1200: return
-        # get coordinates of all surrounding pixels, including diagonals
-        surrounding_pixels = [(x + 1, y), (x + 1, y + 1), (x, y + 1), (x - 1, y + 1), (x - 1, y), (x-1, y - 1), (x, y - 1), (x + 1, y - 1)]
-
-        for x, y in surrounding_pixels[count%len(surrounding_pixels):] + surrounding_pixels[:(count+1)%len(surrounding_pixels)]:
-            if x < 0 or y < 0 or x > image.shape[1]-1 or y > image.shape[0]-1 or pixels_checked[y, x] == 1 or image[y, x, 3] == 0:
-                continue
-            pixels_checked[y, x] = 1
-            if self.max_x is None or x > self.max_x: self.max_x = x
-            if self.min_x is None or x < self.min_x: self.min_x = x
-            if self.max_y is None or y > self.max_y: self.max_y = y
-            if self.min_y is None or y < self.min_y: self.min_y = y
-            self.__sprite_finder(x, y, image, pixels_checked, count + 1)
-
     def __init_vars(self):
         image = self.from_sprite.image if self.from_sprite else "SPRITES"
         self.image_combobox.lineEdit().setText(image)
@@ -281,7 +250,10 @@ class NewSpriteDialog(NewSpriteUI):
         return sprite
             
     def __draw_on_slicer(self) -> None:
-        self.slicer_pixmap = QtGui.QPixmap(self.image_file)
+        try:
+            self.slicer_pixmap = NewSpriteDialog.__sheet_to_pixmap(sheets.get(self.image_file)) if self.image_file else QtGui.QPixmap()
+        except OSError:
+            self.slicer_pixmap = QtGui.QPixmap()
         self.slicer.scene().clear()
         self.slicer.scene().addPixmap(self.slicer_pixmap)
         self.slicer.fitInView(self.slicer.scene().itemsBoundingRect(), QtCore.Qt.KeepAspectRatio)
@@ -322,8 +294,9 @@ class NewSpriteDialog(NewSpriteUI):
         self.height_textbox.setText(str(self.h))
 
     def add_sprite_to_animator(self, sprite: Sprite) -> None:
+        replaced_image_path = self.animator.file_path_map.get(sprite.index)
         self.animator.file_path_map[sprite.index] = self.image_file
-        self.animator.add_sprite_to_scroll_area(sprite)
+        self.animator.add_sprite_to_scroll_area(sprite, replaced_image_path)
 
     def __add_and_continue(self) -> None:
         if self.__ready_to_add():
@@ -347,145 +320,85 @@ class NewSpriteDialog(NewSpriteUI):
     static methods
     """
     @staticmethod
-    def pad_pixmap(pixmap: QtGui.QPixmap, padding_x: int, padding_y: int) -> QtGui.QPixmap:
+    def transform_pixmap(sprite: Sprite, pixmap: QtGui.QPixmap) -> tuple:
         """
-        returns a pixmap with padding around it
+        Rotates, stretches and zooms a pixmap about its center as one transform, drawn once into a pixmap just big
+        enough for the result
+        @param sprite: the sprite object
+        @param pixmap: the pixmap to transform
+        @return: the transformed pixmap, x_offset, y_offset (how far its top left corner is up and left of the one
+        of the pixmap, negative when it shrank)
         """
-        new_width, new_height = pixmap.width() + padding_x * 2, pixmap.height() + padding_y * 2
-        new_pixmap = QtGui.QPixmap(new_width, new_height)
-        new_pixmap.fill(QtCore.Qt.transparent)
-        painter = QtGui.QPainter(new_pixmap)
-        painter.drawPixmap(padding_x, padding_y, pixmap)
-        painter.end()
-        return new_pixmap
-
-    @staticmethod
-    def rotate_pixmap(sprite, pixmap):
-        if sprite.rotation != 0:
-            wh = max(pixmap.width(), pixmap.height()) * 2
-            if wh % 2 == 1: wh += 1
-            pixmap = NewSpriteDialog.pad_pixmap(pixmap, abs(pixmap.width() - wh) / 2, abs(pixmap.height() - wh) / 2)
-            x_diff, y_diff = NewSpriteDialog.calculate_diffs(pixmap, wh)
-            new_pixmap = QtGui.QPixmap(wh, wh)
-            new_pixmap.fill(QtCore.Qt.transparent)
-            painter = QtGui.QPainter(new_pixmap)
-            painter.translate(pixmap.width() / 2, pixmap.height() / 2)
-            painter.rotate(sprite.rotation)
-            painter.translate(-pixmap.width() / 2, -pixmap.height() / 2)
-            painter.drawPixmap(x_diff, y_diff, pixmap)
-            painter.end()
-            return new_pixmap
-        return pixmap
+        return NewSpriteDialog.__transform(sprite, pixmap)
 
     @staticmethod
-    def calculate_diffs(pixmap, wh):
-        x_diff, y_diff = (wh - pixmap.width()) / 2, (wh - pixmap.height()) / 2
-        return x_diff, y_diff
+    def transform_image(sprite: Sprite, image: QtGui.QImage) -> tuple:
+        """
+        transform_pixmap for a QImage, which unlike a QPixmap may be painted on outside of the GUI thread
+        @return: the transformed image (Format_ARGB32_Premultiplied), x_offset, y_offset
+        """
+        return NewSpriteDialog.__transform(sprite, image)
 
     @staticmethod
-    def stretch_pixmap(sprite: Sprite, pixmap: QtGui.QPixmap):
+    def __transform(sprite: Sprite, source) -> tuple:
         """
-        stretches a pixmap in the appropriate direction by the corresponding factor
-        @param sprite: the sprite object
-        @param pixmap: the pixmap to stretch
-        @return: the stretched pixmap, but with maintained 0, 0
+        @param source: QPixmap or QImage, the result is of the same kind
         """
-        if sprite.stretch_x != 1 or sprite.stretch_y != 1:
-            wh = max(pixmap.width(), pixmap.height()) * max(abs(sprite.stretch_x), abs(sprite.stretch_y)) * 2
-            if wh % 2 == 1: wh += 1
-            pixmap = NewSpriteDialog.pad_pixmap(pixmap, abs(pixmap.width() - wh) / 2, abs(pixmap.height() - wh) / 2)
-            x_diff, y_diff = NewSpriteDialog.calculate_diffs(pixmap, wh)
-            new_pixmap = QtGui.QPixmap(wh, wh)
-            new_pixmap.fill(QtCore.Qt.transparent)
-            painter = QtGui.QPainter(new_pixmap)
-            painter.translate(pixmap.width() / 2, pixmap.height() / 2)
-            painter.scale(sprite.stretch_x, sprite.stretch_y)
-            painter.translate(-pixmap.width() / 2, -pixmap.height() / 2)
-            painter.drawPixmap(x_diff, y_diff, pixmap)
-            painter.end()
-            return new_pixmap
-        return pixmap
+        if sprite.rotation == 0 and sprite.stretch_x == 1 and sprite.stretch_y == 1 and sprite.zoom == 1:
+            return source, 0, 0
+        # the last transformation added applies first
+        transform = QtGui.QTransform()
+        transform.scale(sprite.zoom, sprite.zoom)
+        transform.scale(sprite.stretch_x, sprite.stretch_y)
+        transform.rotate(sprite.rotation)
+        width, height = source.width(), source.height()
+        bounds = transform.mapRect(QtCore.QRectF(-width / 2, -height / 2, width, height))
+        # the same amount on both sides keeps the center in place and the offsets whole, at least a pixel is left
+        x_offset = max(math.ceil((bounds.width() - width) / 2), -((width - 1) // 2))
+        y_offset = max(math.ceil((bounds.height() - height) / 2), -((height - 1) // 2))
+        new_width, new_height = width + x_offset * 2, height + y_offset * 2
+
+        if isinstance(source, QtGui.QImage):
+            result = QtGui.QImage(new_width, new_height, QtGui.QImage.Format_ARGB32_Premultiplied)
+        else:
+            result = QtGui.QPixmap(new_width, new_height)
+        result.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(result)
+        painter.translate(new_width / 2, new_height / 2)
+        painter.setTransform(transform, True)
+        if isinstance(source, QtGui.QImage):
+            painter.drawImage(QtCore.QPointF(-width / 2, -height / 2), source)
+        else:
+            painter.drawPixmap(QtCore.QPointF(-width / 2, -height / 2), source)
+        painter.end()
+        return result, x_offset, y_offset
 
     @staticmethod
     def add_color_effects_to_pixmap(sprite: Sprite, pixmap: QtGui.QPixmap):
+        mode = NewSpriteDialog.__color_effect_mode(sprite)
+        if mode is None: return pixmap
+        return QtGui.QPixmap.fromImage(apply_color_effect(pixmap.toImage(), sprite.color_effect, mode))
+
+    @staticmethod
+    def add_color_effects_to_image(sprite: Sprite, image: QtGui.QImage) -> QtGui.QImage:
+        mode = NewSpriteDialog.__color_effect_mode(sprite)
+        if mode is None: return image
+        return apply_color_effect(image, sprite.color_effect, mode).copy()  # out of the buffer of the thread
+
+    @staticmethod
+    def __color_effect_mode(sprite: Sprite) -> int or None:
+        """
+        @return: the mode of apply_color_effect to use for the sprite, or None if its colors are left as they are
+        """
         if sprite.color_effect != [1, 1, 1, 1] or sprite.mode == 2:
             alpha = sprite.color_effect[3]
             if (alpha == 1 and sprite.mode != 2) or sprite.mode == 1:
-                pixmap = NewSpriteDialog.__add_color_mode_1(sprite, pixmap)
+                return 1
             elif alpha != 1 and sprite.mode == 0:
-                pixmap = NewSpriteDialog.__add_color_mode_0(sprite, pixmap)
+                return 0
             elif sprite.mode == 2:
-                pixmap = NewSpriteDialog.__add_color_mode_2(sprite, pixmap)
-        return pixmap
-
-    @staticmethod
-    def __add_color_mode_0(sprite: Sprite, pixmap: QtGui.QPixmap) -> QtGui.QPixmap:
-        grayscale = pixmap.toImage().convertToFormat(QtGui.QImage.Format_Grayscale8)
-        grayscale = QtGui.QPixmap.fromImage(grayscale)
-        np_pixmap = NewSpriteDialog.__pixmap_to_numpy(grayscale)  # remember! in BGRA format
-        red, green, blue, alpha = sprite.color_effect
-        np_pixmap[:, :, 3] = copy.deepcopy(np_pixmap[:, :, 0]) * alpha
-        np_pixmap[:, :, 0] = np_pixmap[:, :, 0] * blue
-        np_pixmap[:, :, 1] = np_pixmap[:, :, 1] * green
-        np_pixmap[:, :, 2] = np_pixmap[:, :, 2] * red
-        # convert back to RGBA
-        temp_blue, temp_red = copy.deepcopy(np_pixmap[:, :, 0]), np_pixmap[:, :, 2]
-        np_pixmap[:, :, 0] = temp_red
-        np_pixmap[:, :, 2] = temp_blue
-        return NewSpriteDialog.__numpy_to_pixmap(np_pixmap)
-
-    @staticmethod
-    def __add_color_mode_1(sprite: Sprite, pixmap: QtGui.QPixmap) -> QtGui.QPixmap:
-        red, green, blue, alpha = sprite.color_effect
-        np_pixmap = NewSpriteDialog.__pixmap_to_numpy(pixmap)  # remember! in BGRA format
-        np_pixmap[:, :, 0] = np_pixmap[:, :, 0] * blue
-        np_pixmap[:, :, 1] = np_pixmap[:, :, 1] * green
-        np_pixmap[:, :, 2] = np_pixmap[:, :, 2] * red
-        np_pixmap[:, :, 3] = np_pixmap[:, :, 3] * alpha
-        # convert back to RGBA
-        temp_blue, temp_red = copy.deepcopy(np_pixmap[:, :, 0]), np_pixmap[:, :, 2]
-        np_pixmap[:, :, 0] = temp_red
-        np_pixmap[:, :, 2] = temp_blue
-        return NewSpriteDialog.__numpy_to_pixmap(np_pixmap)
-
-    @staticmethod
-    def __add_color_mode_2(sprite: Sprite, pixmap: QtGui.QPixmap) -> QtGui.QPixmap:
-        grayscale = pixmap.toImage().convertToFormat(QtGui.QImage.Format_Grayscale8)
-        grayscale = QtGui.QPixmap.fromImage(grayscale)
-        red, green, blue, alpha = sprite.color_effect
-        np_pixmap = NewSpriteDialog.__pixmap_to_numpy(grayscale)  # remember! in BGRA format
-        np_pixmap[:, :, 3] = copy.deepcopy(np_pixmap[:, :, 0]) * alpha
-        np_pixmap[:, :, 0] = np_pixmap[:, :, 0] - np_pixmap[:, :, 0] * blue
-        np_pixmap[:, :, 1] = np_pixmap[:, :, 1] - np_pixmap[:, :, 1] * green
-        np_pixmap[:, :, 2] = np_pixmap[:, :, 2] - np_pixmap[:, :, 2] * red
-        # convert back to RGBA
-        temp_blue, temp_red = copy.deepcopy(np_pixmap[:, :, 0]), np_pixmap[:, :, 2]
-        np_pixmap[:, :, 0] = temp_red
-        np_pixmap[:, :, 2] = temp_blue
-        return NewSpriteDialog.__numpy_to_pixmap(np_pixmap)
-
-
-
-    @staticmethod
-    def zoom_pixmap(sprite: Sprite, pixmap: QtGui.QPixmap):
-        if sprite.zoom != 1:
-            if abs(sprite.zoom) > 1:
-                wh = max(pixmap.width(), pixmap.height()) * abs(sprite.zoom) * 2
-                if wh % 2 == 1: wh += 1
-            else:
-                wh = max(pixmap.width(), pixmap.height())
-            pixmap = NewSpriteDialog.pad_pixmap(pixmap, abs(pixmap.width() - wh) / 2, abs(pixmap.height() - wh) / 2)
-            x_diff, y_diff = NewSpriteDialog.calculate_diffs(pixmap, wh)
-            new_pixmap = QtGui.QPixmap(wh, wh)
-            new_pixmap.fill(QtCore.Qt.transparent)
-            painter = QtGui.QPainter(new_pixmap)
-            painter.translate(pixmap.width() / 2, pixmap.height() / 2)
-            painter.scale(sprite.zoom, sprite.zoom)
-            painter.translate(-pixmap.width() / 2, -pixmap.height() / 2)
-            painter.drawPixmap(x_diff, y_diff, pixmap)
-            painter.end()
-            return new_pixmap
-        return pixmap
+                return 2
+        return None
 
     @staticmethod
     def fix_sprite_xy_and_get_excess_dimensions(im_height, im_width, sprite) -> tuple:
@@ -498,19 +411,6 @@ class NewSpriteDialog(NewSpriteUI):
             sprite.height = im_height - sprite.y
         return x_to_increase, y_to_increase
 
-    @staticmethod
-    def expand_pixmap_if_needed(pixmap, x_to_increase=0, y_to_increase=0) -> QtGui.QPixmap:
-        if x_to_increase > 0 or y_to_increase > 0:
-            new_x = pixmap.width() + x_to_increase
-            new_y = pixmap.height() + y_to_increase
-            new_pixmap = QtGui.QPixmap(new_x, new_y)
-            new_pixmap.fill(QtCore.Qt.transparent)
-            painter = QtGui.QPainter(new_pixmap)
-            painter.drawPixmap(0, 0, pixmap)
-            painter.end()
-            return new_pixmap
-        return pixmap
-    
     @staticmethod
     def load_and_crop_sprite(image_path, sprite) -> tuple:
         """
@@ -520,58 +420,66 @@ class NewSpriteDialog(NewSpriteUI):
         @return: the final pixmap, x_offset, y_offset
         """
         if image_path:
-            im = Image.open(image_path, mode="r")
-            im_width, im_height = im.size
-            x_to_increase, y_to_increase = NewSpriteDialog.fix_sprite_xy_and_get_excess_dimensions(im_height, im_width, sprite)
-            im = im.crop((sprite.x, sprite.y, sprite.x + sprite.width, sprite.y + sprite.height))
-            im = ImageQt.ImageQt(im.convert("RGBA"))
-            original_pixmap = QtGui.QPixmap.fromImage(im)
-            original_pixmap = NewSpriteDialog.expand_pixmap_if_needed(original_pixmap, x_to_increase, y_to_increase)
-            pixmap = NewSpriteDialog.rotate_pixmap(sprite, original_pixmap)
-            pixmap = NewSpriteDialog.stretch_pixmap(sprite, pixmap)
-            pixmap = NewSpriteDialog.zoom_pixmap(sprite, pixmap)
-            pixmap = NewSpriteDialog.add_color_effects_to_pixmap(sprite, pixmap)
-            x_offset, y_offset = NewSpriteDialog.__generate_offsets(original_pixmap, pixmap)
-            return pixmap, x_offset, y_offset
+            image, x_offset, y_offset = NewSpriteDialog.crop_sprite_image(image_path, sprite)
+            return QtGui.QPixmap.fromImage(image), x_offset, y_offset
         return NewSpriteDialog.__make_default_sprite_img(sprite), 0, 0
 
     @staticmethod
-    def __make_default_sprite_img(sprite: Sprite) -> QtGui.QPixmap:
-        return QtGui.QPixmap(sprite.width, sprite.height)
+    def crop_sprite_image(image_path: str, sprite: Sprite) -> tuple:
+        """
+        The work of load_and_crop_sprite that does not need the GUI thread: only QImages and numpy, no QPixmaps.
+        Like it, clamps the width and height of the sprite to the image.
+        @param image_path: the path to the image to load
+        @return: the final image (Format_ARGB32_Premultiplied), x_offset, y_offset
+        @raise OSError: if the image cannot be read
+        """
+        sheet = sheets.get(image_path)  # decoded once for all sprites of the sheet
+        im_height, im_width = sheet.shape[:2]
+        x_to_increase, y_to_increase = NewSpriteDialog.fix_sprite_xy_and_get_excess_dimensions(im_height, im_width, sprite)
+        # the part of the sprite past the edge of the sheet is cropped too, __crop fills it with transparent pixels
+        image = NewSpriteDialog.__sheet_to_image(NewSpriteDialog.__crop(sheet, sprite.x, sprite.y, sprite.width + x_to_increase, sprite.height + y_to_increase))
+        image, x_offset, y_offset = NewSpriteDialog.transform_image(sprite, image)
+        image = NewSpriteDialog.add_color_effects_to_image(sprite, image)
+        return image, x_offset, y_offset
 
     @staticmethod
-    def __generate_offsets(original_pixmap: QtGui.QPixmap, pixmap: QtGui.QPixmap) -> tuple:
+    def __crop(sheet: np.ndarray, x: int, y: int, width: int, height: int) -> np.ndarray:
         """
-        This method is called after modifying the sprite pixmap...
-        Such as, rotating, zooming, stretching, or anything else that changes the size of the pixmap.
-        @param sprite: Sprite object of the corresponding pixmap. Needed for its attributes (specifically index).
-        @param original_pixmap: The original pixmap before any modifications.
-        @param pixmap: The pixmap after modifications.
-        @return: The x and y offsets of the pixmap.
+        @param sheet: (height, width, 4) RGBA array
+        @return: the pixels of the rectangle, a view of the sheet when the rectangle lies within it,
+        otherwise a copy where the pixels outside of the sheet are transparent
         """
-        return (abs(original_pixmap.width() / 2 - pixmap.width() / 2), abs(original_pixmap.height() / 2 - pixmap.height() / 2))
+        width, height = max(0, width), max(0, height)
+        if 0 <= x and 0 <= y and x + width <= sheet.shape[1] and y + height <= sheet.shape[0]:
+            return sheet[y:y + height, x:x + width]
+        cropped = np.zeros((height, width, 4), dtype=np.uint8)
+        left, top = max(x, 0), max(y, 0)
+        right, bottom = min(x + width, sheet.shape[1]), min(y + height, sheet.shape[0])
+        if left < right and top < bottom:
+            cropped[top - y:bottom - y, left - x:right - x] = sheet[top:bottom, left:right]
+        return cropped
 
     @staticmethod
-    def __pixmap_to_numpy(pixmap: QtGui.QPixmap) -> np.ndarray:
+    def __sheet_to_pixmap(pixels: np.ndarray) -> QtGui.QPixmap:
         """
-        returns a numpy array of the pixmap in RGBA format.
-        All that matters is that the alpha is the fourth value.
-        @param pixmap: QtGui.QPixmap to be turned into a numpy array
-        @return: numpy array of the pixmap in RGBA format. (shape: (height, width, 4))
+        @param pixels: (height, width, 4) RGBA array, its rows may be apart in memory (a slice of a sheet)
         """
-        channels_count = 4
-        image = pixmap.toImage()
-        s = image.bits().asstring(pixmap.width() * pixmap.height() * channels_count)
-        arr = np.fromstring(s, dtype=np.uint8).reshape((pixmap.height(), pixmap.width(), channels_count))
-        return arr
+        if not pixels.size: return QtGui.QPixmap()
+        image = QtGui.QImage(sip.voidptr(pixels.ctypes.data), pixels.shape[1], pixels.shape[0], pixels.strides[0], QtGui.QImage.Format_RGBA8888)
+        return QtGui.QPixmap.fromImage(image)  # copies the pixels while they are still there
 
     @staticmethod
-    def __numpy_to_pixmap(np_image: np.ndarray) -> QtGui.QPixmap:
+    def __sheet_to_image(pixels: np.ndarray) -> QtGui.QImage:
         """
-        returns a QPixmap from a numpy array.
+        @param pixels: (height, width, 4) RGBA array, its rows may be apart in memory (a slice of a sheet)
+        @return: a copy of the pixels in Format_ARGB32_Premultiplied, the format images are painted in
         """
-        image = QtGui.QImage(np_image.data, np_image.shape[1], np_image.shape[0], QtGui.QImage.Format_RGBA8888)
-        pixmap = QtGui.QPixmap.fromImage(image)
-        return pixmap
+        if not pixels.size: return QtGui.QImage()
+        image = QtGui.QImage(sip.voidptr(pixels.ctypes.data), pixels.shape[1], pixels.shape[0], pixels.strides[0], QtGui.QImage.Format_RGBA8888)
+        return image.convertToFormat(QtGui.QImage.Format_ARGB32_Premultiplied)  # copies the pixels while they are still there
+
+    @staticmethod
+    def __make_default_sprite_img(sprite: Sprite) -> QtGui.QPixmap:
+        return QtGui.QPixmap(sprite.width, sprite.height)
 
 
@@ -0,0 +1,89 @@
+import hashlib
+import marshal
+import os
+import disk_cache
+from animation import Animation
+
+
+class AniCache:
+    """
+    On-disk cache of parsed animations, so that reopening a gani does not have to parse its text again.
+
+    Every gani gets one entry, named after the hash of its absolute path. An entry holds the
+    (mtime, size) of the gani it was made from and is ignored once the gani changes.
+    Entries are the marshalled Animation.to_data of the animation.
+    When the cache directory grows over max_bytes, the least recently used entries are deleted.
+    """
+    VERSION = 1
+    SUFFIX = ".ani"
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024) -> None:
+        """
+        @param cache_dir: directory to store the entries in, created when needed
+        @param max_bytes: size limit of all entries together
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def open(self, file_name: str) -> Animation:
+        """
+        @param file_name: path to a gani
+        @return: the animation from the cache if the entry is still valid, otherwise the parsed gani (which is then cached)
+        """
+        animation = self.load(file_name)
+        if animation is None:
+            key = AniCache.__key(file_name)  # taken before parsing in case the gani changes meanwhile
+            animation = Animation(from_file=file_name)
+            self.store(file_name, animation, key)
+        return animation
+
+    def load(self, file_name: str) -> Animation:
+        """
+        @return: the cached animation, or None if there is no valid entry for the gani
+        """
+        entry = self.__entry_path(file_name)
+        try:
+            with open(entry, "rb") as f:
+                version, key, data = marshal.loads(f.read())
+            if version != AniCache.VERSION or key != AniCache.__key(file_name):
+                self.misses += 1
+                return None
+            animation = Animation.from_data(data)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, EOFError, ValueError, TypeError):
+            # unreadable or corrupt entry
+            self.misses += 1
+            disk_cache.remove(entry)
+            return None
+        disk_cache.mark_used(entry)
+        self.hits += 1
+        return animation
+
+    def store(self, file_name: str, animation: Animation, key: tuple = None) -> None:
+        """
+        Caches the animation parsed from file_name. Failing to write the cache is not an error.
+        @param key: the key of the gani as it was when it was parsed, taken now if not given
+        """
+        try:
+            key = key or AniCache.__key(file_name)
+        except OSError:
+            return
+        data = (AniCache.VERSION, key, animation.to_data())
+        if disk_cache.write(self.__entry_path(file_name), lambda f: marshal.dump(data, f)):
+            disk_cache.evict(self.cache_dir, AniCache.SUFFIX, self.max_bytes)
+
+    def clear(self) -> None:
+        disk_cache.clear(self.cache_dir, AniCache.SUFFIX)
+
+    def __entry_path(self, file_name: str) -> str:
+        name = hashlib.sha1(os.path.abspath(file_name).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, name + AniCache.SUFFIX)
+
+    @staticmethod
+    def __key(file_name: str) -> tuple:
+        stat = os.stat(file_name)
+        return os.path.abspath(file_name), stat.st_mtime_ns, stat.st_size
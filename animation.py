@@ -1,14 +1,31 @@
-from frame import Frame
+from frame import Frame, FramePart, FrameStub, LazyFrameList
 from sprite import Sprite
-import copy
+from sprite_registry import SpriteRegistry
+import gc
+import locale
 import math
+import mmap
+import os
+import re
+import shutil
+import tempfile
+
+# the umask can only be read by setting it, which is done once here rather than on the thread that saves
+UMASK = os.umask(0)
+os.umask(UMASK)
 
 class Animation:
     """
     Animation is the "parent" class that holds all the frames, which hold all the frame parts, which holds all the sprites.
     The order of the frames in the list is the order that they wil be displayed.
     """
-    def __init__(self, from_file=None) -> None:
+    SAVE_BUFFER_SIZE = 1 << 16
+
+    def __init__(self, from_file=None, lazy=False) -> None:
+        """
+        @param from_file: gani to open, a new animation with one empty frame is made when None
+        @param lazy: only index the frames of from_file and build each of them when it is first accessed
+        """
         self.__script = []
         self.__rotate_effects = {} # ex. [index: int, angle: float (in degrees)]
         self.__stretch_x_effects = {}  # ex. {index: int, stretch: float}
@@ -16,8 +33,13 @@ class Animation:
         self.__color_effects = {}  # ex. {index: int, [R,G,B,A]}
         self.__zoom_effects = {}  # ex. (index: int, zoom: float)
         self.__mode_effects = {}  # ex. {index: int, mode: int0-2}
-        self.__frames = []
-        self.__sprites_list = []
+        self.__frames = LazyFrameList(self.__build_frame, self.__release_ani_map)
+        self.__sprites = SpriteRegistry()
+        self.__ani_map = None  # mmap of a lazily opened gani, closed once all of its frames are built
+        self.__ani_encoding = None
+        self.__stub_sprite_indices = set()  # sprites frames that are built later may draw: those of the gani minus deleted ones
+        self.__stub_deletions = {}  # {index: (deletion number, removed layers)} of the deleted sprites of the gani, see restore_sprite
+        self.__deletion_count = 0
 
         self.is_loop = False
         self.is_continuous = False
@@ -38,9 +60,12 @@ class Animation:
         self.__setbackto = ""
 
         if not from_file:
-            self.__frames.append(Frame())
+            self.__insert_frame(0, Frame())
         if from_file:
-            self.__set_attrs_from_existing_ani(from_file)
+            if lazy and os.path.getsize(from_file):
+                self.__index_existing_ani(from_file)
+            else:
+                self.__set_attrs_from_existing_ani(from_file)
 
     @property
     def script(self) -> str:
@@ -50,12 +75,35 @@ class Animation:
         self.__script = script.split("\n")
     
     @property
-    def frames(self) -> list:
+    def frames(self) -> LazyFrameList:
         return self.__frames
+
+    @property
+    def duration(self) -> float:
+        """
+        @return: the sum of the lengths of all frames (does not build the frames of a lazily opened gani)
+        """
+        return self.__frames.duration
     
     @property
     def sprites(self) -> list:
-        return self.__sprites_list
+        return list(self.__sprites)
+
+    def get_sprite(self, index: int) -> Sprite:
+        """
+        @param index: the index of the sprite
+        @return: the sprite with the given index, or None if the animation has no such sprite
+        """
+        return self.__sprites.get(index)
+
+    def sprite_uses(self, index: int) -> list:
+        """
+        @param index: the index of the sprite
+        @return: [(Frame, direction)] for every frame part that draws the sprite
+        Builds every frame of a lazily opened gani.
+        """
+        for _ in self.__frames: pass
+        return [(frame, direction) for frame in self.__sprites.uses(index) for direction in frame.directions_using(index)]
 
     @property
     def attrs(self) -> dict:
@@ -68,9 +116,20 @@ class Animation:
     def set_setbackto(self, value: str) -> None:
         self.__setbackto = value
 
-    def add_sprite(self, sprite: Sprite) -> None:
-        self.__sprites_list = [tmp_sprite for tmp_sprite in self.sprites if tmp_sprite.index != sprite.index]
-        self.__sprites_list.append(sprite)
+    def add_sprite(self, sprite: Sprite, position: int = None) -> None:
+        """
+        Adds a sprite to the animation.
+        If a sprite with the same index already exists, it is replaced in every frame that uses it
+        (frame parts look their sprites up by index).
+        @param position: place of the sprite in the order of the sprites as given by sprite_position, the end when None
+        """
+        self.__sprites.add(sprite, position)
+
+    def sprite_position(self, index: int) -> int:
+        """
+        @return: the place of the sprite with the given index in the order of the sprites, or None
+        """
+        return self.__sprites.position(index)
 
     def add_new_frame(self, index: int, direction="right", frame_from_clipboard=None) -> None:
         """
@@ -79,168 +138,262 @@ class Animation:
         @param frame_from_clipboard: Frame object to insert
         """
         offset = 1 if direction == "right" else 0
-        if not frame_from_clipboard:
-            self.__frames.insert(index+offset, Frame())
-        else:
-            self.__frames.insert(index+offset, copy.deepcopy(frame_from_clipboard))
+        self.insert_frame(index+offset, frame_from_clipboard.copy() if frame_from_clipboard else Frame())
 
-    def remove_frame(self, index: int) -> None:
-        self.__frames.pop(index)
+    def insert_frame(self, index: int, frame: Frame) -> None:
+        """
+        Inserts the frame itself (not a copy).
+        Layers drawing sprites the animation no longer has are dropped, the frame may have been taken out of the
+        animation (copied to the clipboard, removed) before one of its sprites was deleted.
+        """
+        self.__insert_frame(index, frame)
+        frame.drop_missing_sprites()
 
-    def __set_attrs_from_existing_ani(self, file):
-        # set some default values for parsing flags
-        self.__record_ani = False # instance variable because used in helper method
-        record_script = False
+    def remove_frame(self, index: int) -> Frame:
+        """
+        @return: the removed frame
+        """
+        frame = self.__frames.pop(index)
+        frame.set_registry(None)
+        return frame
 
+    def __insert_frame(self, index: int, frame: Frame) -> None:
+        """
+        Every frame of the animation must go through here so that the sprite registry knows about its sprites.
+        """
+        frame.set_registry(self.__sprites)
+        self.__frames.insert(index, frame)
+
+    # DEFAULT<ATTR> keyword: (attr, value used when the line has no value)
+    __DEFAULT_ATTR_KEYWORDS = {
+        "DEFAULTHEAD": ("head", "head19.png"),
+        "DEFAULTBODY": ("body", "body.png"),
+        "DEFAULTSHIELD": ("shield", "shield1.png"),
+        "DEFAULTATTR1": ("attr1", "hat0.png"),
+        "DEFAULTATTR2": ("attr2", ""),
+        "DEFAULTATTR3": ("attr3", ""),
+        "DEFAULTATTR12": ("attr12", ""),
+        "DEFAULTPARAM1": ("param1", ""),
+        "DEFAULTPARAM2": ("param2", ""),
+        "DEFAULTPARAM3": ("param3", ""),
+    }
+
+    __NUM_DIR_MAP = {0: "up", 1: "left", 2: "down", 3: "right"}
+
+    def __set_attrs_from_existing_ani(self, file):
+        """
+        Single pass parser for gani files.
+        Every line is tokenized once and dispatched on its (upper cased) keyword.
+        Lines that are not keywords are either frame parts (inside of the ANI block) or sprite definitions.
+        """
+        self.__start_parsing()
         with open(file, 'r') as f:
             for line in f:
-                line_split = line.strip().split()
-                if len(line_split) == 0:
-                    continue
-                    # lines in file are tab delimited
-                    # ex. ['SPRITE', '-1000', 'ATTR12', '0', '0', '64', '64', 'backpack']
-                if record_script:
-                    if line_split[0].upper() == "SCRIPTEND": 
-                        record_script = False
-                        continue
-                    self.__script.append(line)
-                elif line_split[0].upper() == "PLAYSOUND":
-                    self.__frames[-1].add_sfx(line_split[1:])
-                elif line_split[0].upper() == "WAIT":
-                    self.__frames[-1].set_length((int(line_split[1])+1) * 0.05)
-                    # wait times in ganis are weird....
-                    # WAIT = wait as it appears on the gani file (an integer)
-                    # length = (WAIT+1) * 0.05
-                elif line_split[0].upper() == "SCRIPT":
-                    record_script = True
-                elif line_split[0].upper() == "SETBACKTO":
-                    self.__setbackto = line_split[1] if len(line_split) > 1 else ""
-                elif line_split[0].upper() == "DEFAULTATTR1":
-                    self.__attrs["attr1"] = line_split[1] if len(line_split) > 1 else "hat0.png"
-                elif line_split[0].upper() == "DEFAULTHEAD":
-                    self.__attrs["head"] = line_split[1] if len(line_split) > 1 else "head19.png"
-                elif line_split[0].upper() == "DEFAULTBODY":
-                    self.__attrs["body"] = line_split[1] if len(line_split) > 1 else "body.png"
-                elif line_split[0].upper() == "DEFAULTSHIELD":
-                    self.__attrs["shield"] = line_split[1] if len(line_split) > 1 else "shield1.png"
-                elif line_split[0].upper() == "DEFAULTATTR2":
-                    self.__attrs["attr2"] = line_split[1] if len(line_split) > 1 else ""
-                elif line_split[0].upper() == "DEFAULTATTR3":
-                    self.__attrs["attr3"] = line_split[1] if len(line_split) > 1 else ""
-                elif line_split[0].upper() == "DEFAULTATTR12":
-                    self.__attrs["attr12"] = line_split[1] if len(line_split) > 1 else ""
-                elif line_split[0].upper() == "DEFAULTPARAM1":
-                    self.__attrs["param1"] = line_split[1] if len(line_split) > 1 else ""
-                elif line_split[0].upper() == "DEFAULTPARAM2":
-                    self.__attrs["param2"] = line_split[1] if len(line_split) > 1 else ""
-                elif line_split[0].upper() == "DEFAULTPARAM3":
-                    self.__attrs["param3"] = line_split[1] if len(line_split) > 1 else ""
-                elif line_split[0].upper() == "ANI":
-                    self.__record_ani = True
-                    self.__ani_dir = 0
-                elif line_split[0].upper() == "ANIEND":
-                    self.__record_ani = False
-                elif line_split[0].upper() == "SINGLEDIRECTION":
-                    self.is_single_dir = True
-                elif line_split[0].upper() == "CONTINUOUS":
-                    self.is_continuous = True
-                elif line_split[0].upper() == "LOOP":
-                    self.is_loop = True
-                elif line_split[0].upper() == "ROTATEEFFECT":
-                    self.__rotate_effects[int(line_split[1])] = Animation.radians_to_degrees(float(line_split[2]))
-                elif line_split[0].upper() == "STRETCHXEFFECT":
-                    self.__stretch_x_effects[int(line_split[1])] = float(line_split[2]) if len(line_split) > 1 else 1
-                elif line_split[0].upper() == "STRETCHYEFFECT":
-                    self.__stretch_y_effects[int(line_split[1])] = float(line_split[2]) if len(line_split) > 1 else 1
-                elif line_split[0].upper() == "COLOREFFECT":
-                    self.__color_effects[int(line_split[1])] = [float(x) for x in line_split[2:]]
-                elif line_split[0].upper() == "ZOOMEFFECT":
-                    self.__zoom_effects[int(line_split[1])] = float(line_split[2]) if len(line_split) > 1 else 1
-                elif line_split[0].upper() == "EFFECTMODE":
-                    self.__mode_effects[int(line_split[1])] = int(line_split[2]) if len(line_split) > 1 else 0
-                elif self.__record_ani and not self.is_single_dir:
-                    self.__generate_frames(line_split)
-                elif self.__record_ani and self.is_single_dir:
-                    self.__generate_frames_for_single_dir(line_split)
-                elif record_script:
-                    self.__script.append(line_split)
-                elif self.__is_line_valid_sprite(line_split):
-                    self.__interpret_sprite_line(line_split[1:])
-
-        if self.__rotate_effects: self.__apply_rotate_effects()
-        if self.__stretch_x_effects or self.__stretch_y_effects: self.__apply_stretch_effects()
-        if self.__color_effects: self.__apply_color_effects()
-        if self.__zoom_effects: self.__apply_zoom_effects()
-        if self.__mode_effects: self.__apply_mode_effects()
-
-    def __apply_zoom_effects(self):
-        for sprite in self.sprites:
-            if sprite.index in self.__zoom_effects:
-                sprite.zoom = self.__zoom_effects[sprite.index]
+                self.__parse_line(line)
+        self.__end_parsing()
 
-    def __apply_stretch_effects(self) -> None:
-        for sprite in self.sprites:
-            if sprite.index in self.__stretch_x_effects.keys():
-                sprite.stretch_x = self.__stretch_x_effects[sprite.index]
-            if sprite.index in self.__stretch_y_effects.keys():
-                sprite.stretch_y = self.__stretch_y_effects[sprite.index]
+    # lines of the ANI block that hold frame parts, they start with a sprite index
+    __FRAME_LINE = re.compile(rb"\s*[-+0-9]")
 
-    def __apply_color_effects(self) -> None:
-        for sprite in self.sprites:
-            if sprite.index in self.__color_effects.keys():
-                sprite.color_effect = self.__color_effects[sprite.index]
+    def __index_existing_ani(self, file):
+        """
+        Lazy version of __set_attrs_from_existing_ani.
+        The file is memory mapped and only the byte ranges of the frame part lines are recorded (in FrameStubs),
+        everything else (sprites, effects, flags, lengths, sounds, script) is parsed as usual.
+        """
+        with open(file, 'rb') as f:
+            ani_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__ani_map, self.__ani_encoding = ani_map, locale.getpreferredencoding(False)
+        self.__start_parsing()
+        is_frame_line = Animation.__FRAME_LINE.match
+        pos, size = 0, len(ani_map)
+        while pos < size:
+            end = ani_map.find(b"\n", pos)
+            start, end, pos = pos, (end if end >= 0 else size), (end + 1 if end >= 0 else size)
+            if self.__record_ani and not self.__record_script and is_frame_line(ani_map, start, end):
+                self.__index_frame_line(start, end)
+            else:
+                line = ani_map[start:end].decode(self.__ani_encoding)
+                if line.endswith("\r"): line = line[:-1]
+                self.__parse_line(line + "\n" if pos > end else line)
+        self.__end_parsing()
+        self.__stub_sprite_indices = set(self.__sprites.keys())
+        if not self.__frames.unbuilt_count:
+            self.__release_ani_map()
+
+    def __start_parsing(self) -> None:
+        # set some default values for parsing flags
+        self.__record_ani = False # instance variable because used in helper method
+        self.__record_script = False
+        self.__ani_dir = 0
+        self.__effects = []  # (attr, {index: value}) applied to the sprites once the file is read
+        self.__handlers = self.__keyword_handlers()
+
+    def __end_parsing(self) -> None:
+        self.__apply_effects()
+        del self.__effects, self.__handlers
+
+    def __parse_line(self, line: str) -> None:
+        # lines in file are tab delimited
+        # ex. ['SPRITE', '-1000', 'ATTR12', '0', '0', '64', '64', 'backpack']
+        line_split = line.split()
+        if not line_split:
+            return
+        keyword = line_split[0].upper()
+        if self.__record_script:
+            if keyword == "SCRIPTEND":
+                self.__record_script = False
+                return
+            self.__script.append(line)
+        elif keyword == "SCRIPT":
+            self.__record_script = True
+        elif keyword in self.__handlers:
+            self.__handlers[keyword](line_split)
+        elif self.__record_ani:
+            self.__generate_frame_part(line_split)
+        elif self.__is_line_valid_sprite(line_split):
+            self.__interpret_sprite_line(line_split[1:])
+
+    def __keyword_handlers(self) -> dict:
+        """
+        @return: {KEYWORD: handler} where every handler takes the tokenized line
+        """
+        def record_effect(effects: dict, value_of):
+            def handler(line: list) -> None:
+                effects[int(line[1])] = value_of(line)
+            return handler
+
+        rotate, stretch_x, stretch_y, color, zoom, mode = {}, {}, {}, {}, {}, {}
+        self.__effects = [
+            ("rotation", rotate), ("stretch_x", stretch_x), ("stretch_y", stretch_y),
+            ("color_effect", color), ("zoom", zoom), ("mode", mode),
+        ]
+        # wait times in ganis are weird....
+        # WAIT = wait as it appears on the gani file (an integer)
+        # length = (WAIT+1) * 0.05
+        handlers = {
+            "PLAYSOUND": lambda line: self.__frames.entry(-1).add_sfx(line[1:]),
+            "WAIT": lambda line: self.__frames.set_length(-1, (int(line[1])+1) * 0.05),
+            "SETBACKTO": lambda line: self.set_setbackto(line[1] if len(line) > 1 else ""),
+            "ANI": self.__start_ani,
+            "ANIEND": self.__end_ani,
+            "SINGLEDIRECTION": lambda line: setattr(self, "is_single_dir", True),
+            "CONTINUOUS": lambda line: setattr(self, "is_continuous", True),
+            "LOOP": lambda line: setattr(self, "is_loop", True),
+            "ROTATEEFFECT": record_effect(rotate, lambda line: Animation.radians_to_degrees(float(line[2]))),
+            "STRETCHXEFFECT": record_effect(stretch_x, lambda line: float(line[2]) if len(line) > 1 else 1),
+            "STRETCHYEFFECT": record_effect(stretch_y, lambda line: float(line[2]) if len(line) > 1 else 1),
+            "COLOREFFECT": record_effect(color, lambda line: [float(x) for x in line[2:]]),
+            "ZOOMEFFECT": record_effect(zoom, lambda line: float(line[2]) if len(line) > 1 else 1),
+            "EFFECTMODE": record_effect(mode, lambda line: int(line[2]) if len(line) > 1 else 0),
+        }
+        for keyword, (attr, default) in Animation.__DEFAULT_ATTR_KEYWORDS.items():
+            handlers[keyword] = lambda line, attr=attr, default=default: \
+                self.set_attr(attr, line[1] if len(line) > 1 else default)
+        return handlers
 
-    def __apply_rotate_effects(self) -> None:
-        for sprite in self.sprites:
-            if sprite.index in self.__rotate_effects.keys():
-                sprite.rotation = self.__rotate_effects[sprite.index]
+    def __start_ani(self, line: list) -> None:
+        self.__record_ani = True
+        self.__ani_dir = 0
 
-    def __apply_mode_effects(self) -> None:
+    def __end_ani(self, line: list) -> None:
+        self.__record_ani = False
+
+    def __apply_effects(self) -> None:
+        """
+        Applies the effects collected while parsing to every sprite with a matching index
+        """
+        effects = [(attr, values) for attr, values in self.__effects if values]
+        if not effects: return
         for sprite in self.sprites:
-            if sprite.index in self.__mode_effects.keys():
-                sprite.mode = self.__mode_effects[sprite.index]
+            for attr, values in effects:
+                if sprite.index in values:
+                    setattr(sprite, attr, values[sprite.index])
 
-    def __generate_frames_for_single_dir(self, line: list) -> None:
+    def __generate_frame_part(self, line: list) -> None:
         """
+        Interprets a line of the ANI block.
+        Single direction animations have one line per frame, otherwise each frame has one line per direction.
         @param line: a list containing the contents for a frame part
         """
-        self.__frames.append(Frame())
+        if self.is_single_dir:
+            frame = Frame()
+            self.__fill_frame_part(frame, frame.frame_parts["up"], line, True)
+            self.__insert_frame(len(self.__frames), frame)  # attached once filled, so the uses are counted at once
+            return
+        else:
+            if self.__ani_dir == 0:
+                self.__insert_frame(len(self.__frames), Frame())
+            frame = self.__frames[-1]
+            frame_part = frame.frame_parts[Animation.__NUM_DIR_MAP[self.__ani_dir]]
+            self.__ani_dir = self.__ani_dir + 1 if self.__ani_dir < 3 else 0
+        self.__fill_frame_part(frame, frame_part, line, self.is_single_dir)
+
+    def __index_frame_line(self, start: int, end: int) -> None:
+        """
+        Lazy version of __generate_frame_part, records where the line is instead of interpreting it.
+        """
+        if self.is_single_dir:
+            self.__frames.append(FrameStub(start, end, True))
+        else:
+            if self.__ani_dir == 0:
+                self.__frames.append(FrameStub(start, end, False))
+            self.__frames.entry(-1).end = end
+            self.__ani_dir = self.__ani_dir + 1 if self.__ani_dir < 3 else 0
+
+    def __build_frame(self, stub: FrameStub) -> Frame:
+        """
+        Builds a frame of a lazily opened gani from the lines recorded in its stub
+        """
+        frame = Frame()
+        lines = [line.decode(self.__ani_encoding).split() for line in self.__ani_map[stub.start:stub.end].split(b"\n")
+                 if Animation.__FRAME_LINE.match(line)]
+        for direction, line in zip(Animation.__DIRECTIONS, lines):
+            self.__fill_frame_part(frame, frame.frame_parts[direction], line, stub.single_dir, self.__stub_sprite_indices, self.__stub_deletions)
+        frame.set_length(stub.length)
+        frame.sfxs.extend(stub.sfxs)
+        frame.set_registry(self.__sprites)
+        return frame
+
+    def __release_ani_map(self) -> None:
+        self.__ani_map.close()
+        self.__ani_map = None
+
+    def __fill_frame_part(self, frame: Frame, frame_part: FramePart, line: list, single_dir: bool, allowed: set = None,
+                          deletions: dict = None) -> None:
+        """
+        Adds the sprites of a tokenized frame part line to frame_part, which belongs to frame
+        @param allowed: indices of the sprites that may be drawn, any sprite of the animation when None
+        @param deletions: the layers of deleted sprites are added to the layers removed by their deletion,
+        at the layer they would have had when the sprite was deleted, so that restore_sprite puts them back
+        """
+        sprites = self.__sprites
+        frame_part.set_sprites(sprites)
+        deleted_before = []  # deletion numbers of the deleted sprites on the layers below
         for i in range(0, len(line), 3):
             sprite_index, x, y = line[i:i+3]
             if y[-1] == ',': y = y[:-1]  # drop comma
-            frame = self.__frames[-1]
-            frame_part = frame.frame_parts["up"]  # TODO fix
-            sprite = None
-            for tmp_sprite in self.__sprites_list:
-                if tmp_sprite.index == int(sprite_index):
-                    sprite = tmp_sprite
+            sprite_index = int(sprite_index)
+            sprite = sprites.get(sprite_index)
+            if allowed is not None and sprite_index not in allowed:
+                if deletions and sprite_index in deletions:
+                    number, removed_layers = deletions[sprite_index]
+                    # sprites deleted after this one still had their layers when it was deleted,
+                    # and the layers of this one below are put back first
+                    layer = len(frame_part.indices) + sum(1 for other in deleted_before if other >= number)
+                    removed_layers.append((frame_part, layer, int(x), int(y)))
+                    deleted_before.append(number)
+                continue
             if not sprite: continue
             frame_part.add_sprite_xs_ys((sprite, int(x), int(y)))
+
+        if single_dir and (frame_part.indices or deleted_before):
             frame.set_frame_parts({
                 "up": frame_part,
                 "left": frame_part,
                 "down": frame_part,
                 "right": frame_part,
             })
-            
-    def __generate_frames(self, line: list) -> None:
-        """
-        @param line: a list containing the contents for a frame part
-        """
-        num_dir_map = {0: "up", 1: "left", 2: "down", 3: "right"}
-        if self.__ani_dir == 0:
-            self.__frames.append(Frame())
-        for i in range(0, len(line), 3):
-            sprite_index, x, y = line[i:i+3]
-            if y[-1] == ',': y = y[:-1]  # drop comma
-            frame_part = self.__frames[-1].frame_parts[(num_dir_map[self.__ani_dir])]
-            sprite = None
-            for tmp_sprite in self.__sprites_list:
-                if tmp_sprite.index == int(sprite_index):
-                    sprite = tmp_sprite
-            if not sprite: continue
-            frame_part.add_sprite_xs_ys((sprite, int(x), int(y)))
-        self.__ani_dir = self.__ani_dir + 1 if self.__ani_dir < 3 else 0
 
     def  __interpret_sprite_line(self, line: list) -> None:
         """
@@ -249,9 +402,9 @@ class Animation:
         @param lines: list containing sprite data
         """
         if len(line) == 6:
-            self.__sprites_list.append(Sprite(*line))
+            self.add_sprite(Sprite(*line))
         else:
-            self.__sprites_list.append(Sprite(*line[:6], description=' '.join(line[6:])))
+            self.add_sprite(Sprite(*line[:6], description=' '.join(line[6:])))
 
     def __is_line_valid_sprite(self, line: list) -> bool:
         """
@@ -265,10 +418,38 @@ class Animation:
             return False
         return True
 
-    def delete_sprite(self, sprite) -> None:
-        self.__sprites_list.remove(sprite)
-        for frame in self.__frames:
+    def delete_sprite(self, sprite) -> tuple:
+        """
+        Removes the sprite from the animation and from every frame that uses it
+        @return: what restore_sprite needs to undo the deletion
+        """
+        removed_layers = []  # (frame part, layer, x, y)
+        for frame in self.__sprites.uses(sprite.index):
+            for frame_part in frame.distinct_frame_parts():
+                removed_layers.extend((frame_part, layer, x, y) for layer, x, y in frame_part.layers_of(sprite.index))
             frame.delete_sprite(sprite)
+        position = self.__sprites.position(sprite.index)
+        self.__sprites.remove(sprite.index)
+        in_stubs = sprite.index in self.__stub_sprite_indices
+        if in_stubs:
+            # frames built from now on leave the sprite out, but add its layers to removed_layers
+            self.__stub_sprite_indices.discard(sprite.index)
+            self.__deletion_count += 1
+            self.__stub_deletions[sprite.index] = (self.__deletion_count, removed_layers)
+        return position, removed_layers, in_stubs
+
+    def restore_sprite(self, sprite: Sprite, deletion: tuple) -> None:
+        """
+        Puts a deleted sprite back where it was, in the order of the sprites and on every layer it was drawn on
+        @param deletion: the return value of delete_sprite
+        """
+        position, removed_layers, in_stubs = deletion
+        self.__sprites.add(sprite, position)
+        for frame_part, layer, x, y in removed_layers:  # in increasing layer order per frame part
+            frame_part.insert_sprite_xs_ys(layer, (sprite, x, y))
+        if in_stubs:
+            self.__stub_sprite_indices.add(sprite.index)
+            del self.__stub_deletions[sprite.index]
 
     @staticmethod
     def __is_pos_or_neg_int(value: str) -> bool:
@@ -295,44 +476,60 @@ class Animation:
     def set_setbackto(self, setbackto: str) -> None:
         self.__setbackto = setbackto
 
-    def toggle_single_dir(self) -> None:
+    def toggle_single_dir(self) -> list:
+        """
+        Converts the frames between single direction and four directions
+        @return: the frames before the conversion
+        """
         def i_plus_one(j):
             return j+1 if j+1 < len(self.__frames) else j
         # up, down, left, right
         if self.is_single_dir:
             new_frames = []
             for i in range(0, len(self.frames), 4):
-                new_frame = copy.deepcopy(self.frames[i])
-                new_frame.set_frame_parts({
+                new_frame = self.frames[i].copy({
                     # does not matter which direction we grab because they should all be pointing to the same frame.
-                    "up": copy.deepcopy(self.frames[i].frame_parts["up"]), 
-                    "left": copy.deepcopy(self.frames[i_plus_one(i)].frame_parts["left"]), 
-                    "down": copy.deepcopy(self.frames[i_plus_one(i_plus_one(i))].frame_parts["down"]), 
-                    "right": copy.deepcopy(self.frames[i_plus_one(i_plus_one(i_plus_one(i)))].frame_parts["right"])
+                    "up": FramePart(self.frames[i].frame_parts["up"]),
+                    "left": FramePart(self.frames[i_plus_one(i)].frame_parts["left"]),
+                    "down": FramePart(self.frames[i_plus_one(i_plus_one(i))].frame_parts["down"]),
+                    "right": FramePart(self.frames[i_plus_one(i_plus_one(i_plus_one(i)))].frame_parts["right"])
                 })
                 new_frames.append(new_frame)
-            self.__frames = new_frames
         else:
             new_frames = []
             for frame in self.frames:
                 for key in ("up", "left", "down", "right"):
-                    frame_part = frame.frame_parts[key]
-                    new_frame = copy.deepcopy(frame)
-                    new_frame.set_frame_parts({
+                    frame_part = FramePart(frame.frame_parts[key])
+                    new_frame = frame.copy({
                         "up": frame_part,
                         "down": frame_part,
                         "left": frame_part,
                         "right": frame_part
                     })
                     new_frames.append(new_frame)
-            self.__frames = new_frames
-        self.is_single_dir = not self.is_single_dir
+        return self.replace_frames(new_frames, not self.is_single_dir)
+
+    def replace_frames(self, frames: list, is_single_dir: bool) -> list:
+        """
+        Replaces every frame of the animation
+        @param frames: the new frames
+        @param is_single_dir: whether the new frames are single direction frames
+        @return: the frames that were replaced
+        """
+        old_frames = list(self.__frames)
+        for frame in old_frames:
+            frame.set_registry(None)
+        self.__frames = LazyFrameList()
+        for frame in frames:
+            self.__insert_frame(len(self.__frames), frame)
+        self.is_single_dir = is_single_dir
+        return old_frames
 
     def reverse_frames(self) -> None:
         """
         Reverses the frames in the animation
         """
-        self.__frames = self.__frames[::-1]
+        self.__frames.reverse()
 
     @staticmethod
     def radians_to_degrees(radians: float) -> float:
@@ -342,73 +539,205 @@ class Animation:
     def degrees_to_radians(degrees: float) -> float:
         return degrees * math.pi / 180
 
+    def snapshot(self):
+        """
+        Frames are copied, sprites are shared (they are replaced rather than changed when edited).
+        @return: a copy of the animation that can be saved on another thread while this one keeps being edited
+        """
+        snapshot = Animation()
+        snapshot.remove_frame(0)
+        for sprite in self.__sprites:
+            snapshot.__sprites.add(sprite)
+        for frame in self.__frames:
+            snapshot.__insert_frame(len(snapshot.__frames), frame.copy())
+        snapshot.__script = list(self.__script)
+        snapshot.__attrs = dict(self.__attrs)
+        snapshot.__setbackto = self.__setbackto
+        snapshot.is_loop = self.is_loop
+        snapshot.is_continuous = self.is_continuous
+        snapshot.is_single_dir = self.is_single_dir
+        return snapshot
+
+    __DIRECTIONS = ("up", "left", "down", "right")
+
+    def to_data(self) -> tuple:
+        """
+        Flattens the animation into tuples and lists of builtins (ints, floats, strings) that marshal can store.
+        Frame parts are stored as flat (sprite_index, x, y, ...) tuples.
+        @return: data that Animation.from_data turns back into an equal animation
+        """
+        sprites = [(sprite.index, sprite.image, sprite.x, sprite.y, sprite.width, sprite.height, sprite.desc,
+                    sprite.rotation, sprite.stretch_x, sprite.stretch_y, sprite.zoom, sprite.color_effect, sprite.mode)
+                   for sprite in self.__sprites]
+        frames = []
+        for frame in self.__frames:
+            frame_parts = frame.distinct_frame_parts()
+            part_numbers = {id(frame_part): i for i, frame_part in enumerate(frame_parts)}
+            frames.append((
+                frame.length,
+                list(frame.sfxs),
+                [frame_part.flat() for frame_part in frame_parts],
+                # single direction frames point every direction at the same frame part
+                tuple(part_numbers[id(frame.frame_parts[direction])] for direction in Animation.__DIRECTIONS),
+            ))
+        return (sprites, frames, list(self.__script), dict(self.__attrs), self.__setbackto,
+                self.is_loop, self.is_continuous, self.is_single_dir)
+
+    @staticmethod
+    def from_data(data: tuple):
+        """
+        @param data: the result of Animation.to_data
+        @return: the animation described by data
+        """
+        # building tens of thousands of frame parts at once triggers many pointless garbage collections
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return Animation.__from_data(data)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    @staticmethod
+    def __from_data(data: tuple):
+        sprites, frames, script, attrs, setbackto, is_loop, is_continuous, is_single_dir = data
+        animation = Animation()
+        animation.remove_frame(0)
+        for index, image, x, y, width, height, desc, rotation, stretch_x, stretch_y, zoom, color_effect, mode in sprites:
+            sprite = Sprite(index, image, x, y, width, height, desc)
+            sprite.rotation, sprite.stretch_x, sprite.stretch_y, sprite.zoom = rotation, stretch_x, stretch_y, zoom
+            sprite.color_effect, sprite.mode = color_effect, mode
+            animation.__sprites.add(sprite)
+
+        for length, sfxs, flat_frame_parts, part_numbers in frames:
+            frame_parts = []
+            for flat in flat_frame_parts:
+                frame_part = FramePart()
+                frame_part.set_flat(flat)
+                frame_parts.append(frame_part)
+            frame = Frame({direction: frame_parts[i] for direction, i in zip(Animation.__DIRECTIONS, part_numbers)})
+            frame.set_length(length)
+            frame.sfxs.extend(sfxs)
+            animation.__insert_frame(len(animation.__frames), frame)
+
+        animation.__script = list(script)
+        animation.__attrs = dict(attrs)
+        animation.__setbackto = setbackto
+        animation.is_loop, animation.is_continuous, animation.is_single_dir = is_loop, is_continuous, is_single_dir
+        return animation
+
     def save(self, file_name: str) -> None:
         """
+        The animation is written to a temporary file in the same directory, flushed to disk, and then renamed over
+        file_name. A crash or a full disk while saving leaves the previous file untouched instead of truncated.
         @param file_name: The name of the file to be saved
         """
-        with open(file_name, "w") as f:
-            f.write(self.to_string())
+        directory = os.path.dirname(os.path.abspath(file_name))
+        fd, temp_file_name = tempfile.mkstemp(prefix=".", suffix=".gani.tmp", dir=directory)
+        try:
+            try:
+                f = os.fdopen(fd, "w")
+            except BaseException:
+                os.close(fd)
+                raise
+            with f:
+                self.write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.isfile(file_name):
+                shutil.copymode(file_name, temp_file_name)
+            else:
+                # mkstemp creates the file readable by its owner only, open would have applied the umask
+                os.chmod(temp_file_name, 0o666 & ~UMASK)
+            os.replace(temp_file_name, file_name)
+        except BaseException:
+            if os.path.exists(temp_file_name):
+                os.remove(temp_file_name)
+            raise
+
+    def write(self, f) -> None:
+        """
+        Streams the animation into a text file handle section by section,
+        so the whole file never has to be held in memory as one string.
+        @param f: a writable text file handle
+        """
+        batch, batch_size = [], 0
+        for chunk in self.iter_chunks():
+            batch.append(chunk)
+            batch_size += len(chunk)
+            if batch_size >= Animation.SAVE_BUFFER_SIZE:
+                f.write("".join(batch))
+                batch, batch_size = [], 0
+        f.write("".join(batch))
 
     def to_string(self) -> str:
         """
         @return the string representation of the animation
         """
-        string = ""
-        string += "Animator by PK Vici\n"
-        for sprite in self.__sprites_list:
-            string += sprite.to_string() + "\n"
-        string += "\n"
+        return "".join(self.iter_chunks())
 
+    def iter_chunks(self):
+        """
+        Generator over the text of the gani file.
+        Joining every chunk gives the same text as to_string.
+        """
+        yield from self.__sprites_section()
+        yield from self.__flags_section()
+        yield from self.__effects_section()
+        yield from self.__ani_section()
+        yield from self.__script_section()
+
+    def __sprites_section(self):
+        yield "Animator by PK Vici\n"
+        for sprite in self.__sprites:
+            yield sprite.to_string() + "\n"
+        yield "\n"
+
+    def __flags_section(self):
         if self.__setbackto:
-            string += f"SETBACKTO {self.__setbackto}\n"
+            yield f"SETBACKTO {self.__setbackto}\n"
 
-        if self.is_loop: string += "LOOP\n"
-        if self.is_continuous: string += "CONTINUOUS\n"
-        if self.is_single_dir: string += "SINGLEDIRECTION\n"
+        if self.is_loop: yield "LOOP\n"
+        if self.is_continuous: yield "CONTINUOUS\n"
+        if self.is_single_dir: yield "SINGLEDIRECTION\n"
 
         for attr, value in self.__attrs.items():
-            string += f"DEFAULT{attr.upper()} {value}\n" if value else ""
+            if value:
+                yield f"DEFAULT{attr.upper()} {value}\n"
 
-        for sprite in self.sprites:
+    def __effects_section(self):
+        for sprite in self.__sprites:
             if sprite.mode != 0:
-                string += f"EFFECTMODE {sprite.index} {sprite.mode}\n"
+                yield f"EFFECTMODE {sprite.index} {sprite.mode}\n"
             #color effects
             if sprite.color_effect != [1,1,1,1]:
-                string += f"COLOREFFECT {sprite.index} {sprite.color_effect[0]} {sprite.color_effect[1]} {sprite.color_effect[2]} {sprite.color_effect[3]}\n"
+                yield f"COLOREFFECT {sprite.index} {sprite.color_effect[0]} {sprite.color_effect[1]} {sprite.color_effect[2]} {sprite.color_effect[3]}\n"
             #rotate effects
             if sprite.rotation != 0:
-                string+= f"ROTATEEFFECT {sprite.index} {Animation.degrees_to_radians(sprite.rotation)}\n"
+                yield f"ROTATEEFFECT {sprite.index} {Animation.degrees_to_radians(sprite.rotation)}\n"
             #zoom effects
             if sprite.zoom != 1:
-                string += f"ZOOMEFFECT {sprite.index} {sprite.zoom}\n"
+                yield f"ZOOMEFFECT {sprite.index} {sprite.zoom}\n"
             #stretchxeffects
             if sprite.stretch_x != 1:
-                string += f"STRETCHXEFFECT {sprite.index} {sprite.stretch_x}\n"
+                yield f"STRETCHXEFFECT {sprite.index} {sprite.stretch_x}\n"
             #stretchyeffects
             if sprite.stretch_y != 1:
-                string += f"STRETCHYEFFECT {sprite.index} {sprite.stretch_y}\n"
-
-        string += "\n"
-
-        string += "ANI\n"
-        for frame in self.__frames:
-            for frame_part in frame.frame_parts.values():
-                string += frame_part.to_string() + "\n"
-                if self.is_single_dir:
-                    break
-            for sfx in frame.sfxs:
-                if sfx[0]:
-                    string += f"PLAYSOUND {sfx[0]} {sfx[1]/16.} {sfx[2]/16.}\n"
-            string += f"WAIT {int((frame.length / 0.05)-1)}\n" if frame.length > 0.05 else "\n"
-            string += "\n"
-        string = string[:-1]
-        string += "ANIEND\n"
-
+                yield f"STRETCHYEFFECT {sprite.index} {sprite.stretch_y}\n"
+        yield "\n"
+
+    def __ani_section(self):
+        # frames are separated by a blank line, but there is none between the last frame and ANIEND
+        # (nor a newline after ANI if there are no frames at all)
+        yield "ANI\n" if self.__frames else "ANI"
+        for i, frame in enumerate(self.__frames):
+            if i > 0:
+                yield "\n"
+            yield frame.to_string(self.is_single_dir)
+        yield "ANIEND\n"
+
+    def __script_section(self):
         if self.__script:
-            string += "\nSCRIPT\n"
-            for line in self.__script:
-                string += line + "\n"
-            string = string[:-1]
-            string += "SCRIPTEND\n"
-
-        return string
+            yield "\nSCRIPT\n"
+            yield "\n".join(self.__script)
+            yield "SCRIPTEND\n"
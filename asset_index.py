@@ -0,0 +1,211 @@
+import hashlib
+import marshal
+import os
+import tempfile
+import time
+
+IMAGE_EXTENSIONS = (".png", ".gif", ".mng")  # tried in this order for an image named without extension
+SOUND_EXTENSIONS = (".wav",)
+
+
+class AssetIndex:
+    """
+    Index of the files of the game folder by name, so that finding an image or a sound is a dict lookup instead of
+    a walk of the whole folder.
+
+    Names are looked up case-insensitively. When a name is in several directories, the one found first by a walk
+    of the folder (parents before their subdirectories, subdirectories in alphabetical order) wins, and within a
+    directory the extension tried first.
+
+    The index keeps the listing and mtime of every directory and is stored on disk (marshalled) in cache_dir.
+    refresh brings it up to date by only listing the directories whose mtime changed, as adding, removing or
+    renaming a file changes the mtime of its directory. Directories are followed through symbolic links.
+
+    lookup refreshes the index when a name is missing, but at most once every miss_ttl seconds: in between, misses
+    are answered from a negative cache, which is emptied as soon as a refresh finds the folder changed.
+    """
+    VERSION = 1
+    RECENT_NS = 2 * 10 ** 9  # a directory changed this recently may change again within the same mtime, it is listed again next time
+
+    def __init__(self, root: str, cache_dir: str = None, miss_ttl: float = 10.0) -> None:
+        """
+        @param root: the game folder
+        @param cache_dir: directory to store the index in, created when needed, None to keep it in memory only
+        @param miss_ttl: seconds a refresh is trusted for names that are not in the index
+        """
+        self.root = os.path.abspath(root)
+        self.cache_dir = cache_dir
+        self.miss_ttl = miss_ttl
+        self.listed = 0  # directories listed by the last refresh
+        self.refreshes = 0
+        self.__refreshed_at = None  # time.monotonic() of the last refresh
+        self.__misses = set()  # (lowercase file name, extensions) missing from the folder as of the last refresh
+        self.__dirs = {}  # {relative path: (mtime or None, file names, subdirectory names, names of those that are links)}
+        self.__names = {}  # {lowercase file name: [(relative path of its directory, file name)]}
+        self.__loaded = False
+
+    def find(self, file_name: str, extensions: tuple = IMAGE_EXTENSIONS) -> str or None:
+        """
+        @param file_name: file name, with or without extension
+        @param extensions: extensions tried for a name without one
+        @return: path to the file, or None if the index has no such file
+        """
+        self.__load()
+        file_name = file_name.lower()
+        candidates = (file_name,) if "." in file_name else tuple(file_name + extension for extension in extensions)
+        best = None
+        for rank, candidate in enumerate(candidates):
+            for directory, name in self.__names.get(candidate, ()):
+                key = (AssetIndex.__walk_order(directory), rank)
+                if best is None or key < best[0]:
+                    best = (key, directory, name)
+        return os.path.join(self.root, best[1], best[2]) if best else None
+
+    def lookup(self, file_name: str, extensions: tuple = IMAGE_EXTENSIONS) -> str or None:
+        """
+        find, for a file that should exist: a name that is not in the index, or whose file is gone, is looked up
+        again after a refresh, unless the index was refreshed less than miss_ttl seconds ago
+        @return: path to the file, or None if there is no such file
+        """
+        self.__load()
+        key = (file_name.lower(), extensions)
+        fresh = self.__refreshed_at is not None and time.monotonic() - self.__refreshed_at < self.miss_ttl
+        if fresh and key in self.__misses: return None
+        path = self.find(file_name, extensions)
+        if path is not None and os.path.isfile(path): return path
+        if not fresh:
+            self.refresh()
+            path = self.find(file_name, extensions)
+            if path is not None and os.path.isfile(path): return path
+        self.__misses.add(key)
+        return None
+
+    def forget_misses(self) -> None:
+        """
+        Lets the next lookup of a missing name refresh the index, however recently it was refreshed
+        """
+        self.__misses.clear()
+        self.__refreshed_at = None
+
+    def refresh(self) -> bool:
+        """
+        Brings the index up to date with the folder and stores it if anything changed
+        @return: whether anything changed
+        """
+        self.__load()
+        dirs = {}
+        changed = False
+        self.listed = 0
+        now = time.time_ns()
+        stack = [""]
+        linked = set()  # real paths of the directories reached through links, so that a loop of links ends
+        while stack:
+            directory = stack.pop()
+            path = os.path.join(self.root, directory)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                changed = True
+                continue
+            entry = self.__dirs.get(directory)
+            if entry is None or entry[0] != mtime:
+                files, subdirs, links = AssetIndex.__list(path)
+                changed = changed or entry is None or (files, subdirs, links) != entry[1:]
+                self.listed += 1
+                entry = (mtime if now - mtime > AssetIndex.RECENT_NS else None, files, subdirs, links)
+            dirs[directory] = entry
+            for subdir in entry[2]:
+                if subdir in entry[3]:
+                    real_path = os.path.realpath(os.path.join(path, subdir))
+                    if real_path in linked: continue
+                    linked.add(real_path)
+                stack.append(os.path.join(directory, subdir))
+        changed = changed or dirs.keys() != self.__dirs.keys()
+        self.__dirs = dirs
+        self.refreshes += 1
+        self.__refreshed_at = time.monotonic()
+        if changed:
+            self.__misses.clear()
+            self.__index_names()
+            self.__store()
+        return changed
+
+    def __len__(self) -> int:
+        self.__load()
+        return sum(len(paths) for paths in self.__names.values())
+
+    def __load(self) -> None:
+        """
+        Reads the stored index the first time it is needed, or builds it if there is none
+        """
+        if self.__loaded: return
+        self.__loaded = True
+        if self.cache_dir:
+            try:
+                with open(self.__index_path(), "rb") as f:
+                    version, root, dirs = marshal.loads(f.read())
+                if version == AssetIndex.VERSION and root == self.root:
+                    self.__dirs = dirs
+                    self.__index_names()
+                    return
+            except (TypeError, OSError, EOFError, ValueError):
+                pass  # no index yet, or an unreadable one
+        self.refresh()
+
+    def __store(self) -> None:
+        """
+        Failing to write the index is not an error, it is built again next time
+        """
+        if not self.cache_dir: return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_file_name = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(marshal.dumps((AssetIndex.VERSION, self.root, self.__dirs)))
+            os.replace(temp_file_name, self.__index_path())
+        except (OSError, ValueError):
+            try:
+                os.remove(temp_file_name)
+            except OSError:
+                pass
+
+    def __index_names(self) -> None:
+        names = {}
+        for directory, (_, files, _, _) in self.__dirs.items():
+            for name in files:
+                names.setdefault(name.lower(), []).append((directory, name))
+        self.__names = names
+
+    def __index_path(self) -> str:
+        name = hashlib.sha1(self.root.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, name + ".index")
+
+    @staticmethod
+    def __list(path: str) -> tuple:
+        """
+        @return: (file names, subdirectory names, names of the subdirectories that are links), an unreadable
+        directory is empty
+        """
+        files, subdirs, links = [], [], []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            subdirs.append(entry.name)
+                            if entry.is_symlink(): links.append(entry.name)
+                        elif entry.is_file():
+                            files.append(entry.name)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+        return tuple(sorted(files)), tuple(sorted(subdirs)), tuple(links)
+
+    @staticmethod
+    def __walk_order(directory: str) -> tuple:
+        # a walk visiting subdirectories in alphabetical order reaches directories in the order of their components
+        return tuple(directory.split(os.sep)) if directory else ()
@@ -0,0 +1,123 @@
+"""
+Finding the images of a gani in a big game folder: walking the folder for every name (as find_file used to) against
+AssetIndex, built once, then read back from disk and brought up to date by the directory mtimes.
+Then names that are not in the folder, such as a name being typed in the sprite dialog one key at a time: a refresh
+of the index for every miss, against the negative cache of AssetIndex.lookup.
+
+The folder is a synthetic tree of empty files, --files of them in directories of --per-dir files. Before
+measuring, both ways are checked to find the same files.
+
+usage: python benchmarks/bench_assets.py [--files 100000] [--per-dir 100] [--names 30] [--missing 30]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asset_index import AssetIndex
+
+
+def make_tree(root: str, num_files: int, per_dir: int) -> list:
+    """
+    @return: the names (without extension) of the images, in a two-level tree of directories
+    """
+    names = []
+    extensions = (".png", ".gif", ".mng", ".wav", ".gani", ".txt")
+    num_dirs = max(1, num_files // per_dir)
+    for number in range(num_dirs):
+        directory = os.path.join(root, f"group{number % 20}", f"dir{number}")
+        os.makedirs(directory, exist_ok=True)
+        for index in range(per_dir):
+            name = f"file{number}_{index}"
+            extension = extensions[index % len(extensions)]
+            open(os.path.join(directory, name + extension), "w").close()
+            if extension in (".png", ".gif", ".mng"):
+                names.append(name)
+    for directory, _, _ in os.walk(root):
+        os.utime(directory, ns=(0, 0))  # a folder that has not changed for a while, see AssetIndex.RECENT_NS
+    return names
+
+
+def walk_find(root: str, file_name: str) -> str or None:
+    """
+    The removed fallback of find_file: a walk of the folder, trying every possible name in every directory
+    """
+    if '.' not in file_name:
+        possible_file_names = [f"{file_name.lower()}" + ext for ext in ('.png', '.gif', '.mng')]
+    else:
+        possible_file_names = (file_name.lower(),)
+    for directory, _, _ in os.walk(root, followlinks=True):
+        for possible_file_name in possible_file_names:
+            if os.path.isfile(os.path.join(directory, possible_file_name)):
+                return os.path.join(directory, possible_file_name)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument("--per-dir", type=int, default=100)
+    parser.add_argument("--names", type=int, default=30)
+    parser.add_argument("--missing", type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root, cache_dir = os.path.join(tmp, "game"), os.path.join(tmp, "cache")
+        start = time.perf_counter()
+        images = make_tree(root, args.files, args.per_dir)
+        print(f"{args.files} files in {args.files // args.per_dir} directories, made in {time.perf_counter() - start:.1f} s")
+        names = random.Random(0).sample(images, args.names)
+
+        start = time.perf_counter()
+        walked = [walk_find(root, name) for name in names]
+        walk = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = AssetIndex(root, cache_dir)
+        index.find(names[0])  # built on first use
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        found = [index.find(name) for name in names]
+        lookups = time.perf_counter() - start
+        assert found == walked, "the index and the walk found different files"
+
+        start = time.perf_counter()
+        index = AssetIndex(root, cache_dir)
+        index.refresh()  # read from disk, then every directory is stat'ed and none listed
+        reopen = time.perf_counter() - start
+        unchanged = index.listed
+
+        open(os.path.join(root, "group3", "dir3", "added.png"), "w").close()
+        os.utime(os.path.join(root, "group3", "dir3"), ns=(1, 1))
+        start = time.perf_counter()
+        index.refresh()
+        added = time.perf_counter() - start
+        assert index.find("ADDED") == os.path.join(root, "group3", "dir3", "added.png")
+
+        typed = "new_character_sheet.png"
+        missing = [f"missing{number}" for number in range(args.missing)] + [typed[:end] for end in range(1, len(typed) + 1)]
+        index.miss_ttl = 0  # every miss refreshes the index
+        start = time.perf_counter()
+        assert not any(index.lookup(name) for name in missing)
+        refreshing = time.perf_counter() - start
+        index.miss_ttl, index.refreshes = 10, 0
+        start = time.perf_counter()
+        assert not any(index.lookup(name) for name in missing + missing)
+        negative = time.perf_counter() - start
+
+    print(f"{args.names} names")
+    print(f"  walk per name:        {walk * 1000:9.1f} ms")
+    print(f"  index, first build:   {build * 1000:9.1f} ms")
+    print(f"  index, lookups:       {lookups * 1000:9.3f} ms")
+    print(f"  index, reopened:      {reopen * 1000:9.1f} ms ({unchanged} directories listed)")
+    print(f"  index, file added:    {added * 1000:9.1f} ms (1 directory listed)")
+    print(f"{len(missing)} missing names")
+    print(f"  refresh per miss:     {refreshing * 1000:9.1f} ms")
+    print(f"  negative cache, x2:   {negative * 1000:9.1f} ms ({index.refreshes} refresh)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Color effects (COLOREFFECT) on a batch of sprites: apply_color_effect against the previous way of applying them,
+which copied every pixmap into numpy through toImage().bits() and swapped BGRA to RGBA by hand.
+
+The correctness of every mode is checked by tests/test_color_effects.py.
+
+usage: python benchmarks/bench_color.py [--sprites 200] [--size 64]
+"""
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PyQt5 import QtGui, QtWidgets
+from color_effects import apply_color_effect
+
+MODES = (0, 1, 2)
+
+
+def random_image(rng: random.Random, width: int, height: int) -> QtGui.QImage:
+    image = QtGui.QImage(width, height, QtGui.QImage.Format_ARGB32)
+    for y in range(height):
+        for x in range(width):
+            alpha = rng.choice((0, 255, 255, rng.randrange(256)))
+            image.setPixel(x, y, QtGui.qRgba(rng.randrange(256), rng.randrange(256), rng.randrange(256), alpha))
+    return image.convertToFormat(QtGui.QImage.Format_ARGB32_Premultiplied)
+
+
+def previous(pixmap: QtGui.QPixmap, color_effect, mode: int) -> QtGui.QPixmap:
+    """
+    The removed __add_color_mode_0/1/2, with np.frombuffer(...).copy() for the np.fromstring numpy no longer has
+    """
+    def to_numpy(pixmap):
+        image = pixmap.toImage()
+        s = image.bits().asstring(pixmap.width() * pixmap.height() * 4)
+        return np.frombuffer(s, dtype=np.uint8).copy().reshape((pixmap.height(), pixmap.width(), 4))
+
+    red, green, blue, alpha = color_effect
+    if mode == 1:
+        np_pixmap = to_numpy(pixmap)
+        np_pixmap[:, :, 3] = np_pixmap[:, :, 3] * alpha
+    else:
+        grayscale = QtGui.QPixmap.fromImage(pixmap.toImage().convertToFormat(QtGui.QImage.Format_Grayscale8))
+        np_pixmap = to_numpy(grayscale)
+        np_pixmap[:, :, 3] = copy.deepcopy(np_pixmap[:, :, 0]) * alpha
+        if mode == 2:
+            red, green, blue = 1 - red, 1 - green, 1 - blue
+    np_pixmap[:, :, 0] = np_pixmap[:, :, 0] * blue
+    np_pixmap[:, :, 1] = np_pixmap[:, :, 1] * green
+    np_pixmap[:, :, 2] = np_pixmap[:, :, 2] * red
+    temp_blue, temp_red = copy.deepcopy(np_pixmap[:, :, 0]), np_pixmap[:, :, 2]
+    np_pixmap[:, :, 0] = temp_red
+    np_pixmap[:, :, 2] = temp_blue
+    image = QtGui.QImage(np_pixmap.data, np_pixmap.shape[1], np_pixmap.shape[0], QtGui.QImage.Format_RGBA8888)
+    return QtGui.QPixmap.fromImage(image)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sprites", type=int, default=200)
+    parser.add_argument("--size", type=int, default=64)
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv[:1])  # kept until the end of main, the pixmaps need it
+    rng = random.Random(0)
+
+    pixmaps = [QtGui.QPixmap.fromImage(random_image(rng, args.size, args.size)) for _ in range(8)]
+    color_effect = (1.0, 0.5, 0.5, 0.75)
+    print(f"{args.sprites} sprites of {args.size}x{args.size}")
+    for mode in MODES:
+        start = time.perf_counter()
+        for index in range(args.sprites):
+            previous(pixmaps[index % len(pixmaps)], color_effect, mode)
+        before = time.perf_counter() - start
+        start = time.perf_counter()
+        for index in range(args.sprites):
+            QtGui.QPixmap.fromImage(apply_color_effect(pixmaps[index % len(pixmaps)].toImage(), color_effect, mode))
+        after = time.perf_counter() - start
+        print(f"  mode {mode}: previous {before * 1000:8.1f} ms, now {after * 1000:8.1f} ms "
+              f"({args.sprites / after:8.0f} sprites/s)")
+    del app
+
+
+if __name__ == "__main__":
+    main()
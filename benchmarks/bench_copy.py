@@ -0,0 +1,77 @@
+"""
+Time and memory of copying frames, which share their layers until they are changed (copy on write):
+converting between single and four direction, and pasting the same frame many times.
+
+usage: python benchmarks/bench_copy.py [--frames 1000] [--pastes 1000] [--sprites 300] [--layers 12]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from animation import Animation
+from synthetic import write_gani
+
+
+def measure(function) -> tuple:
+    """
+    Runs function twice, once timed and once traced.
+    @return: (seconds, bytes still allocated after a run)
+    """
+    start = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    function()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, allocated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--pastes", type=int, default=1000)
+    parser.add_argument("--sprites", type=int, default=300)
+    parser.add_argument("--layers", type=int, default=12)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_gani(tmp, num_frames=args.frames, num_sprites=args.sprites, layers=args.layers, single_dir=True)
+        animation = Animation(from_file=path)
+        start = time.perf_counter()
+        animation.toggle_single_dir()
+        to_four_seconds, four_dir_frames = time.perf_counter() - start, len(animation.frames)
+        start = time.perf_counter()
+        animation.toggle_single_dir()
+        to_single_seconds = time.perf_counter() - start
+
+        clipboard = animation.frames[0]
+
+        def paste() -> None:
+            for _ in range(args.pastes):
+                animation.add_new_frame(0, "right", clipboard)
+        paste_seconds, paste_bytes = measure(paste)
+
+        # both runs of measure edit a different half of the pasted frames, so every edit is the first one
+        pasted = iter(range(1, 2 * args.pastes + 1))
+
+        def nudge() -> None:
+            for _ in range(args.pastes):
+                animation.frames[next(pasted)].frame_parts["up"].shift(0, "horizontal", 1)
+        nudge_seconds, nudge_bytes = measure(nudge)
+
+        print(f"{args.frames} frames, {args.layers} layers")
+        print(f"  single to four direction: {to_four_seconds * 1000:8.1f} ms ({four_dir_frames} frames)")
+        print(f"  four to single direction: {to_single_seconds * 1000:8.1f} ms")
+        print(f"  {args.pastes} pastes:            {paste_seconds * 1000:8.1f} ms, {paste_bytes / args.pastes:6.0f} bytes per pasted frame")
+        print(f"  first edit of each paste: {nudge_seconds * 1000:8.1f} ms, {nudge_bytes / args.pastes:6.0f} bytes per frame"
+              " (the layers are copied on first write)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Latency of redrawing the canvas of the editor: nudging a sprite with the arrow keys and switching frames with the
+frame slider, on frames with many layers, and showing the next frame during playback (one cached image per
+frame part). Runs the editor offscreen, the time includes painting the canvas.
+
+If there is no config.json yet, one pointing at an empty game folder is written for the run and removed afterwards.
+
+usage: python benchmarks/bench_display.py [--layers 50] [--frames 20] [--repeat 200]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtWidgets
+import sprite_animator
+from synthetic import write_gani
+
+
+def timed(app, action, repeat: int) -> float:
+    """
+    @return: average milliseconds of action, including processing the events (painting) it causes
+    """
+    start = time.perf_counter()
+    for i in range(repeat):
+        action(i)
+        app.processEvents()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--layers", type=int, default=50)
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    config_path = os.path.join(sprite_animator.BASE_DIR, "config.json")
+    with tempfile.TemporaryDirectory() as tmp:
+        write_config = not os.path.isfile(config_path)
+        if write_config:
+            with open(config_path, "w") as f:
+                json.dump({"game_folder_path": tmp, "ani_cache_max_mb": 0}, f)
+        try:
+            path = write_gani(tmp, num_frames=args.frames, num_sprites=args.layers, layers=args.layers)
+            # no update check over the network while measuring
+            setattr(sprite_animator.Animator_GUI, "_Animator_GUI__check_for_update", lambda self: None)
+            app = QtWidgets.QApplication(sys.argv[:1])
+            window = QtWidgets.QMainWindow()
+            editor = sprite_animator.Animator_GUI(window)
+            window.show()
+            editor._Animator_GUI__new_animation(from_file=True, from_associated_file=path)
+            editor.wait_for_sprites()
+            app.processEvents()
+
+            nudge_ms = timed(app, lambda i: editor.shift_sprite("horizontal", 1 if i % 2 else -1), args.repeat)
+            frames = len(editor.curr_animation.frames)
+            switch_ms = timed(app, lambda i: editor.frame_slider.setValue((i + 1) % frames), args.repeat)
+
+            # hand frames over as the playback thread would, without starting it
+            worker = sprite_animator.RunAniWorker(editor.curr_animation)
+            editor._Animator_GUI__play_thread = worker
+            editor.play = True
+            play_ms = timed(app, lambda i: editor._Animator_GUI__display_playing_frame(worker, (i + 1) % frames, time.monotonic()), args.repeat)
+            editor.play = False
+            editor._Animator_GUI__play_thread = None
+        finally:
+            if write_config:
+                os.remove(config_path)
+
+    print(f"{args.layers} layers per frame part, {frames} frames")
+    print(f"  nudge:        {nudge_ms:7.2f} ms")
+    print(f"  frame switch: {switch_ms:7.2f} ms")
+    print(f"  play frame:   {play_ms:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
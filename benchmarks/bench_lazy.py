@@ -0,0 +1,61 @@
+"""
+Open time and memory of full parsing against lazy opening (Animation(lazy=True)) for growing ganis,
+and the cost of building a frame of a lazily opened gani when it is first viewed.
+
+usage: python benchmarks/bench_lazy.py [--frames 1000 10000 50000] [--sprites 300] [--layers 12]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from animation import Animation
+from synthetic import write_gani
+
+
+def measure(open_animation) -> tuple:
+    """
+    @return: (seconds, bytes still allocated by the opened animation)
+    """
+    start = time.perf_counter()
+    open_animation()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    animation = open_animation()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del animation
+    return seconds, current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--sprites", type=int, default=300)
+    parser.add_argument("--layers", type=int, default=12)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for num_frames in args.frames:
+            path = write_gani(tmp, f"{num_frames}.gani", num_frames=num_frames, num_sprites=args.sprites, layers=args.layers)
+            eager_seconds, eager_bytes = measure(lambda: Animation(from_file=path))
+            lazy_seconds, lazy_bytes = measure(lambda: Animation(from_file=path, lazy=True))
+
+            animation = Animation(from_file=path, lazy=True)
+            start = time.perf_counter()
+            animation.frames[num_frames // 2]
+            view_seconds = time.perf_counter() - start
+            assert animation.to_string() == Animation(from_file=path).to_string()
+
+            print(f"{num_frames} frames, {os.path.getsize(path) / 1e6:.2f} MB gani")
+            print(f"  full parse: {eager_seconds * 1000:8.1f} ms, {eager_bytes / 1e6:7.2f} MB")
+            print(f"  lazy open:  {lazy_seconds * 1000:8.1f} ms, {lazy_bytes / 1e6:7.2f} MB"
+                  f" (first view of a frame {view_seconds * 1e6:.0f} us)")
+
+
+if __name__ == "__main__":
+    main()
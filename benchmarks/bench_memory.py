@@ -0,0 +1,65 @@
+"""
+Memory held by a parsed animation, measured with tracemalloc.
+The frame parts are compared against the list of (Sprite, x, y) tuples they were stored as before
+(rebuilt from the same animation as the baseline).
+
+usage: python benchmarks/bench_memory.py [--frames 4000] [--sprites 300] [--layers 12]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from animation import Animation
+from frame import FramePart
+from synthetic import write_gani
+
+
+def traced(build) -> tuple:
+    """
+    @return: (result of build, bytes it still holds)
+    """
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = build()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, after - before
+
+
+def tuple_lists(animation: Animation) -> list:
+    """
+    The previous frame part storage: one list of (Sprite, x, y) tuples per frame part.
+    x and y are copied through int() so that they are not shared with the arrays.
+    """
+    return [[(sprite, int(str(x)), int(str(y))) for sprite, x, y in frame_part.list_of_sprites]
+            for frame in animation.frames for frame_part in frame.distinct_frame_parts()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=4000)
+    parser.add_argument("--sprites", type=int, default=300)
+    parser.add_argument("--layers", type=int, default=12)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_gani(tmp, num_frames=args.frames, num_sprites=args.sprites, layers=args.layers)
+        animation, animation_bytes = traced(lambda: Animation(from_file=path))
+        frame_parts = [frame_part for frame in animation.frames for frame_part in frame.distinct_frame_parts()]
+        layers = sum(len(frame_part.indices) for frame_part in frame_parts)
+        # copies of the frame parts, holding the same layers in arrays
+        _, array_bytes = traced(lambda: [FramePart(frame_part) for frame_part in frame_parts])
+        _, list_bytes = traced(lambda: tuple_lists(animation))
+
+        print(f"{args.frames} frames, {len(frame_parts)} frame parts, {layers} layers")
+        print(f"  whole animation:            {animation_bytes / 1e6:8.2f} MB")
+        print(f"  frame parts, arrays:        {array_bytes / 1e6:8.2f} MB ({array_bytes / layers:5.1f} bytes per layer)")
+        print(f"  frame parts, tuple lists:   {list_bytes / 1e6:8.2f} MB ({list_bytes / layers:5.1f} bytes per layer)")
+
+
+if __name__ == "__main__":
+    main()
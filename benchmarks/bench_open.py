@@ -0,0 +1,58 @@
+"""
+Cold and warm opens of a large synthetic gani through the parsed-animation cache (AniCache).
+
+usage: python benchmarks/bench_open.py [--frames 2000] [--sprites 300] [--layers 12] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ani_cache import AniCache
+from animation import Animation
+from synthetic import write_gani
+
+
+def best_of(repeat: int, function) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--sprites", type=int, default=300)
+    parser.add_argument("--layers", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_gani(tmp, num_frames=args.frames, num_sprites=args.sprites, layers=args.layers)
+        cache = AniCache(os.path.join(tmp, "cache"))
+
+        parse = best_of(args.repeat, lambda: Animation(from_file=path))
+
+        def cold_open():
+            cache.clear()
+            cache.open(path)
+        cold = best_of(args.repeat, cold_open)
+        warm = best_of(args.repeat, lambda: cache.open(path))
+
+        assert cache.open(path).to_string() == Animation(from_file=path).to_string()
+        entry_mb = sum(entry.stat().st_size for entry in os.scandir(cache.cache_dir)) / 1e6
+        print(f"{args.frames} frames, {args.sprites} sprites, gani {os.path.getsize(path) / 1e6:.2f} MB, "
+              f"cache entry {entry_mb:.2f} MB")
+        print(f"  parse only:               {parse * 1000:8.1f} ms")
+        print(f"  cold open (parse + store): {cold * 1000:8.1f} ms")
+        print(f"  warm open (cache hit):     {warm * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
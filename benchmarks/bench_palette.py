@@ -0,0 +1,126 @@
+"""
+The sprite palette of the editor with many sprites: filling it when an animation is opened and updating it when one
+sprite is added, as the editor used to (a QGraphicsView with its own scene per sprite, all rebuilt on every change)
+against SpritePalette (a list model whose visible rows are painted from cached thumbnails, updated one row at a time).
+Runs the editor offscreen, the times include painting the palette.
+
+Before measuring, clicking a row of the palette is checked to add its sprite to the frame, and deleting a sprite to
+remove its row.
+
+If there is no config.json yet, one pointing at an empty game folder is written for the run and removed afterwards.
+
+usage: python benchmarks/bench_palette.py [--sprites 500] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtCore, QtGui, QtTest, QtWidgets
+import sprite_animator
+from synthetic import write_gani
+
+
+def rebuild_views(editor, scroll_area: QtWidgets.QScrollArea) -> None:
+    """
+    The removed palette: a new QGraphicsView and QGraphicsScene for every sprite, laid out in the scroll area
+    """
+    scroll_area.setWidget(QtWidgets.QWidget())
+    scroll_area.widget().setLayout(QtWidgets.QVBoxLayout())
+    for index, image in sorted(editor.sprite_images.items(), key=lambda x: x[0]):
+        view = QtWidgets.QGraphicsView(scroll_area.widget())
+        view.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        view.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        view.setDragMode(QtWidgets.QGraphicsView.ScrollHandDrag)
+        view.setScene(QtWidgets.QGraphicsScene())
+        view.scene().addPixmap(image)
+        view.setToolTip(f"Sprite({index}) " + editor.curr_animation.get_sprite(index).desc)
+        scroll_area.widget().layout().addWidget(view)
+
+
+def timed(app, action, repeat: int) -> float:
+    """
+    @return: average milliseconds of action, including processing the events (painting) it causes
+    """
+    start = time.perf_counter()
+    for i in range(repeat):
+        action(i)
+        app.processEvents()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sprites", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    config_path = os.path.join(sprite_animator.BASE_DIR, "config.json")
+    with tempfile.TemporaryDirectory() as tmp:
+        write_config = not os.path.isfile(config_path)
+        if write_config:
+            with open(config_path, "w") as f:
+                json.dump({"game_folder_path": tmp, "ani_cache_max_mb": 0, "render_cache_mb": 0}, f)
+        try:
+            path = write_gani(tmp, num_frames=10, num_sprites=args.sprites, layers=4)
+            # no update check over the network while measuring
+            setattr(sprite_animator.Animator_GUI, "_Animator_GUI__check_for_update", lambda self: None)
+            app = QtWidgets.QApplication(sys.argv[:1])
+            window = QtWidgets.QMainWindow()
+            window.resize(1280, 800)
+            editor = sprite_animator.Animator_GUI(window)
+            window.show()
+            editor._Animator_GUI__new_animation(from_file=True, from_associated_file=path)
+            editor.wait_for_sprites()
+            app.processEvents()
+
+            palette = editor.sprite_scroll_area.widget()
+            model = palette.model()
+            assert model.rowCount() == len(editor.sprite_images) == args.sprites
+            first = model.index(0)
+            layers = len(editor.get_current_frame_part().list_of_sprites)
+            center = palette.visualRect(first).center()
+            QtTest.QTest.mouseClick(palette.viewport(), QtCore.Qt.LeftButton, QtCore.Qt.NoModifier, center)
+            assert len(editor.get_current_frame_part().list_of_sprites) == layers + 1, "clicking a row adds its sprite"
+            editor.delete_sprite(editor.curr_animation.get_sprite(first.data(QtCore.Qt.UserRole)))
+            assert model.rowCount() == args.sprites - 1, "deleting a sprite removes its row"
+
+            # an added sprite, as add_sprite_to_scroll_area leaves it before the palette is updated
+            added_index = max(editor.sprite_images) + 1
+            added_image = QtGui.QPixmap(32, 32)
+            added_image.fill(QtCore.Qt.red)
+
+            def add_row(i: int) -> None:
+                editor.sprite_images[added_index] = added_image
+                model.update_sprite(added_index)
+                del editor.sprite_images[added_index]
+                model.update_sprite(added_index)
+
+            fill_new = timed(app, lambda i: model.reset(), args.repeat)
+            add_new = timed(app, add_row, args.repeat)
+            widgets_new = len(editor.sprite_scroll_area.findChildren(QtWidgets.QWidget))
+
+            old_area = QtWidgets.QScrollArea()
+            old_area.setWidgetResizable(True)
+            old_area.resize(editor.sprite_scroll_area.size())
+            old_area.show()
+            fill_old = timed(app, lambda i: rebuild_views(editor, old_area), args.repeat)
+            widgets_old = len(old_area.findChildren(QtWidgets.QWidget))
+        finally:
+            if write_config:
+                os.remove(config_path)
+
+    print(f"{args.sprites} sprites")
+    print(f"  graphics view per sprite: fill or any change {fill_old:8.1f} ms, {widgets_old} widgets")
+    print(f"  palette model:            fill               {fill_new:8.1f} ms, {widgets_new} widgets")
+    print(f"                            add and remove one {add_new:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
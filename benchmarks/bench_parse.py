@@ -0,0 +1,50 @@
+"""
+Parse throughput of Animation(from_file=...) over large synthetic ganis.
+
+usage: python benchmarks/bench_parse.py [--frames 2000] [--sprites 300] [--layers 12] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from animation import Animation
+from synthetic import write_gani
+
+
+def bench(path: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Animation(from_file=path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--sprites", type=int, default=300)
+    parser.add_argument("--layers", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for single_dir in (False, True):
+            name = "single_dir.gani" if single_dir else "four_dir.gani"
+            path = write_gani(tmp, name, num_frames=args.frames,
+                              num_sprites=args.sprites, layers=args.layers, single_dir=single_dir)
+            with open(path) as f:
+                num_lines = sum(1 for _ in f)
+            size_mb = os.path.getsize(path) / 1e6
+            seconds = bench(path, args.repeat)
+            print(f"{name}: {args.frames} frames, {args.sprites} sprites, {num_lines} lines, {size_mb:.2f} MB")
+            print(f"  best of {args.repeat}: {seconds * 1000:.1f} ms  "
+                  f"({num_lines / seconds:,.0f} lines/s, {size_mb / seconds:.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
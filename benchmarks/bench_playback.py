@@ -0,0 +1,67 @@
+"""
+Timing of playback in the editor: plays a synthetic animation once from start to end (offscreen) and compares how
+long that took with the duration of the animation, then prints the statistics of the playback.
+
+If there is no config.json yet, one pointing at an empty game folder is written for the run and removed afterwards.
+
+usage: python benchmarks/bench_playback.py [--layers 50] [--frames 100]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtWidgets
+import sprite_animator
+from synthetic import write_gani
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--layers", type=int, default=50)
+    parser.add_argument("--frames", type=int, default=100)
+    args = parser.parse_args()
+
+    config_path = os.path.join(sprite_animator.BASE_DIR, "config.json")
+    with tempfile.TemporaryDirectory() as tmp:
+        write_config = not os.path.isfile(config_path)
+        if write_config:
+            with open(config_path, "w") as f:
+                json.dump({"game_folder_path": tmp, "ani_cache_max_mb": 0}, f)
+        try:
+            path = write_gani(tmp, num_frames=args.frames, num_sprites=args.layers, layers=args.layers)
+            # no update check over the network while measuring
+            setattr(sprite_animator.Animator_GUI, "_Animator_GUI__check_for_update", lambda self: None)
+            app = QtWidgets.QApplication(sys.argv[:1])
+            window = QtWidgets.QMainWindow()
+            editor = sprite_animator.Animator_GUI(window)
+            window.show()
+            editor._Animator_GUI__new_animation(from_file=True, from_associated_file=path)
+            editor.wait_for_sprites()
+            editor.curr_animation.is_loop = False
+            app.processEvents()
+
+            duration = editor.curr_animation.duration
+            start = time.monotonic()
+            editor._Animator_GUI__play_animation()
+            while editor.play:
+                app.processEvents()
+                time.sleep(0.001)
+            played = time.monotonic() - start
+        finally:
+            if write_config:
+                os.remove(config_path)
+
+    print(f"{args.layers} layers per frame part, {args.frames} frames, {duration:.2f} s long")
+    print(f"  played in:   {played:7.3f} s ({(played - duration) * 1000:+.1f} ms)")
+    print(f"  {editor.playback_stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Save time and peak memory of the streaming serializer (Animation.save)
+against the previous string concatenating serializer,
+and of saving again after a single edit when the unchanged frames are cached.
+
+usage: python benchmarks/bench_save.py [--frames 4000] [--sprites 300] [--layers 12]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from animation import Animation
+from synthetic import write_gani
+
+
+def concatenating_to_string(animation: Animation) -> str:
+    """
+    The serializer Animation.to_string used before it was streamed, kept as the baseline.
+    """
+    string = ""
+    string += "Animator by PK Vici\n"
+    for sprite in animation.sprites:
+        string += sprite.to_string() + "\n"
+    string += "\n"
+    if animation.setbackto:
+        string += f"SETBACKTO {animation.setbackto}\n"
+    if animation.is_loop: string += "LOOP\n"
+    if animation.is_continuous: string += "CONTINUOUS\n"
+    if animation.is_single_dir: string += "SINGLEDIRECTION\n"
+    for attr, value in animation.attrs.items():
+        string += f"DEFAULT{attr.upper()} {value}\n" if value else ""
+    for sprite in animation.sprites:
+        if sprite.mode != 0:
+            string += f"EFFECTMODE {sprite.index} {sprite.mode}\n"
+        if sprite.color_effect != [1,1,1,1]:
+            string += f"COLOREFFECT {sprite.index} {sprite.color_effect[0]} {sprite.color_effect[1]} {sprite.color_effect[2]} {sprite.color_effect[3]}\n"
+        if sprite.rotation != 0:
+            string += f"ROTATEEFFECT {sprite.index} {Animation.degrees_to_radians(sprite.rotation)}\n"
+        if sprite.zoom != 1:
+            string += f"ZOOMEFFECT {sprite.index} {sprite.zoom}\n"
+        if sprite.stretch_x != 1:
+            string += f"STRETCHXEFFECT {sprite.index} {sprite.stretch_x}\n"
+        if sprite.stretch_y != 1:
+            string += f"STRETCHYEFFECT {sprite.index} {sprite.stretch_y}\n"
+    string += "\n"
+    string += "ANI\n"
+    for frame in animation.frames:
+        for frame_part in frame.frame_parts.values():
+            out = ""
+            for sprite, x, y in frame_part.list_of_sprites:
+                out += f" {sprite.index} {x} {y},"
+            string += out[:-1] + "\n"
+            if animation.is_single_dir:
+                break
+        for sfx in frame.sfxs:
+            if sfx[0]:
+                string += f"PLAYSOUND {sfx[0]} {sfx[1]/16.} {sfx[2]/16.}\n"
+        string += f"WAIT {int((frame.length / 0.05)-1)}\n" if frame.length > 0.05 else "\n"
+        string += "\n"
+    string = string[:-1]
+    string += "ANIEND\n"
+    if animation.script:
+        string += "\nSCRIPT\n"
+        for line in animation.script.split("\n"):
+            string += line + "\n"
+        string = string[:-1]
+        string += "SCRIPTEND\n"
+    return string
+
+
+def concatenating_save(animation: Animation, file_name: str) -> None:
+    with open(file_name, "w") as f:
+        f.write(concatenating_to_string(animation))
+
+
+def measure(save, animation: Animation, file_name: str) -> tuple:
+    """
+    @return: (seconds, peak traced bytes) of a single save
+    """
+    start = time.perf_counter()
+    save(animation, file_name)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    save(animation, file_name)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=4000)
+    parser.add_argument("--sprites", type=int, default=300)
+    parser.add_argument("--layers", type=int, default=12)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_gani(tmp, num_frames=args.frames, num_sprites=args.sprites, layers=args.layers)
+        animation = Animation(from_file=path)
+        old_file, new_file = os.path.join(tmp, "old.gani"), os.path.join(tmp, "new.gani")
+
+        old_seconds, old_peak = measure(concatenating_save, animation, old_file)
+        new_seconds, new_peak = measure(lambda ani, file_name: ani.save(file_name), animation, new_file)
+
+        def nudge_and_save(ani: Animation, file_name: str) -> None:
+            ani.frames[len(ani.frames) // 2].frame_parts["down"].shift(0, "horizontal", 1)
+            ani.save(file_name)
+        cached_seconds, cached_peak = measure(nudge_and_save, animation, new_file)
+        concatenating_save(animation, old_file)
+
+        with open(old_file, "rb") as old, open(new_file, "rb") as new:
+            identical = old.read() == new.read()
+        size_mb = os.path.getsize(new_file) / 1e6
+        print(f"{args.frames} frames, {size_mb:.2f} MB gani, byte identical: {identical}")
+        print(f"  concatenating save: {old_seconds * 1000:8.1f} ms, peak {old_peak / 1e6:7.2f} MB")
+        print(f"  streaming save:     {new_seconds * 1000:8.1f} ms, peak {new_peak / 1e6:7.2f} MB")
+        print(f"  save after a nudge: {cached_seconds * 1000:8.1f} ms, peak {cached_peak / 1e6:7.2f} MB"
+              " (unchanged frames come from the per-frame cache)")
+
+
+if __name__ == "__main__":
+    main()
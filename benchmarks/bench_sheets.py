@@ -0,0 +1,80 @@
+"""
+Loading many sprites cut from the same sheets, decoding every sheet again for each sprite (as without SheetCache)
+and with the shared cache of decoded sheets. Then the first sprite of a huge sheet, as after reopening the editor:
+decoding the sheet, and memory-mapping it from the raw cache (RawSheetCache).
+
+usage: python benchmarks/bench_sheets.py [--sprites 80] [--sheets 2] [--size 1024] [--huge 4096]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+from PyQt5 import QtWidgets
+from NewSpriteDialog import NewSpriteDialog
+from sheet_cache import RawSheetCache, SheetCache, sheets
+from sprite import Sprite
+
+
+def load_all(paths: list, num_sprites: int) -> float:
+    start = time.perf_counter()
+    for index in range(num_sprites):
+        sprite = Sprite(index, "SPRITES", (index * 32) % 992, (index * 96) % 992, 32, 32)
+        NewSpriteDialog.load_and_crop_sprite(paths[index % len(paths)], sprite)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sprites", type=int, default=80)
+    parser.add_argument("--sheets", type=int, default=2)
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--huge", type=int, default=4096)
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv[:1])  # kept until the end of main, the pixmaps need it
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for number in range(args.sheets):
+            path = os.path.join(tmp, f"sheet{number}.png")
+            Image.effect_noise((args.size, args.size), 64).convert("RGBA").save(path)
+            paths.append(path)
+
+        # no sheet stays cached between the sprites
+        sheets.max_bytes = 0
+        uncached = load_all(paths, args.sprites)
+        sheets.max_bytes = 256 * 1024 * 1024
+        sheets.hits = sheets.misses = 0
+        cached = load_all(paths, args.sprites)
+
+        huge = os.path.join(tmp, "huge.png")
+        Image.effect_noise((args.huge, args.huge), 64).convert("RGBA").save(huge)
+        raw_cache = RawSheetCache(os.path.join(tmp, "raw"))
+        SheetCache(raw_cache=raw_cache).get(huge)  # writes the raw entry
+        start = time.perf_counter()
+        sheet = SheetCache().get(huge)
+        decoded = sheet[:32, :32].copy()
+        decode = time.perf_counter() - start
+        start = time.perf_counter()
+        sheet = SheetCache(raw_cache=raw_cache).get(huge)
+        mapped = sheet[:32, :32].copy()
+        memory_map = time.perf_counter() - start
+        assert (decoded == mapped).all()
+        del sheet  # unmaps the entry before the directory is removed
+
+    print(f"{args.sprites} sprites from {args.sheets} sheets of {args.size}x{args.size}")
+    print(f"  decoding every time: {uncached * 1000:8.1f} ms")
+    print(f"  shared sheets:       {cached * 1000:8.1f} ms ({sheets.misses} decodes, {sheets.hits} hits)")
+    print(f"first sprite of a {args.huge}x{args.huge} sheet")
+    print(f"  decoding the sheet:  {decode * 1000:8.1f} ms")
+    print(f"  raw cache (mmap):    {memory_map * 1000:8.1f} ms")
+    del app
+
+
+if __name__ == "__main__":
+    main()
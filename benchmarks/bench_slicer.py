@@ -0,0 +1,145 @@
+"""
+Clicking sprites in the slicer of the sprite dialog to cut them out: the recursive flood fill the dialog used to run
+on every click against LabelCache, which labels the connected components of the sheet once, then answers every
+click with a lookup.
+
+The sheet is a grid of --sprites small sprites of random sizes (with holes, some pixels only joined diagonally) and
+one --big by --big sprite. LabelCache is checked to cut every sprite as a plain breadth-first search does. The flood
+fill stopped 1200 levels deep and skipped some neighbours on every eighth level, so it cut many sprites short; how
+many is printed.
+
+usage: python benchmarks/bench_slicer.py [--sprites 400] [--big 600] [--clicks 200]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+from label_cache import LabelCache
+from sheet_cache import sheets
+
+
+def flood_fill_bounds(image: np.ndarray, x: int, y: int) -> tuple or None:
+    """
+    The removed __sprite_finder, with its bounds kept in a list instead of on the dialog
+    """
+    if image[y, x, 3] == 0: return None
+    bounds = [None, None, None, None]  # min x, max x, min y, max y
+    pixels_checked = np.zeros(image.shape[:-1], dtype=np.uint8)
+
+    def sprite_finder(x, y, count):
+        if count > 1200: return
+        surrounding_pixels = [(x + 1, y), (x + 1, y + 1), (x, y + 1), (x - 1, y + 1), (x - 1, y), (x-1, y - 1), (x, y - 1), (x + 1, y - 1)]
+        for x, y in surrounding_pixels[count%len(surrounding_pixels):] + surrounding_pixels[:(count+1)%len(surrounding_pixels)]:
+            if x < 0 or y < 0 or x > image.shape[1]-1 or y > image.shape[0]-1 or pixels_checked[y, x] == 1 or image[y, x, 3] == 0:
+                continue
+            pixels_checked[y, x] = 1
+            if bounds[1] is None or x > bounds[1]: bounds[1] = x
+            if bounds[0] is None or x < bounds[0]: bounds[0] = x
+            if bounds[3] is None or y > bounds[3]: bounds[3] = y
+            if bounds[2] is None or y < bounds[2]: bounds[2] = y
+            sprite_finder(x, y, count + 1)
+
+    sprite_finder(x, y, 0)
+    if bounds[0] is None: return None
+    return bounds[0], bounds[2], bounds[1] - bounds[0] + 1, bounds[3] - bounds[2] + 1
+
+
+def search_bounds(image: np.ndarray, x: int, y: int) -> tuple or None:
+    """
+    Bounds of the 8-connected opaque pixels around x, y by a breadth-first search, to check the labels against
+    """
+    if image[y, x, 3] == 0: return None
+    height, width = image.shape[:2]
+    seen = {(x, y)}
+    queue = deque(seen)
+    while queue:
+        x, y = queue.popleft()
+        for nx in (x - 1, x, x + 1):
+            for ny in (y - 1, y, y + 1):
+                if 0 <= nx < width and 0 <= ny < height and (nx, ny) not in seen and image[ny, nx, 3]:
+                    seen.add((nx, ny))
+                    queue.append((nx, ny))
+    xs, ys = [x for x, _ in seen], [y for _, y in seen]
+    return min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1
+
+
+def make_sheet(path: str, num_sprites: int, big: int) -> tuple:
+    """
+    @return: ([(x, y) of a pixel of each small sprite], (x, y, width, height) of the big sprite)
+    """
+    rng = random.Random(0)
+    columns = int(num_sprites ** 0.5) + 1
+    cell = 24
+    width = max(columns * cell, big)
+    pixels = np.zeros((columns * cell + 4 + big, width, 4), dtype=np.uint8)
+    clicks = []
+    for number in range(num_sprites):
+        left, top = (number % columns) * cell + 4, (number // columns) * cell + 4
+        w, h = rng.randint(4, 20), rng.randint(4, 20)
+        sprite = pixels[top:top + h, left:left + w]
+        sprite[:, :, :3] = rng.randrange(256)
+        sprite[:, :, 3] = 255
+        sprite[1:-1:3, 1:-1:2, 3] = 0  # holes, some opaque pixels only touch diagonally
+        clicks.append((left, top))
+    top = columns * cell + 4
+    pixels[top:top + big, :big, 3] = 255
+    pixels[top + 1:top + big - 1:2, 1:big - 1, 3] = 0  # rows joined at alternating ends: one long snake
+    pixels[top + 1:top + big - 1:4, big - 2, 3] = 255
+    pixels[top + 3:top + big - 1:4, 1, 3] = 255
+    pixels[top:top + big, 0, 3] = 0
+    pixels[top:top + big, big - 1, 3] = 0
+    Image.fromarray(pixels, "RGBA").save(path)
+    return clicks, (1, top, big - 2, big)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sprites", type=int, default=400)
+    parser.add_argument("--big", type=int, default=600)
+    parser.add_argument("--clicks", type=int, default=200)
+    args = parser.parse_args()
+
+    sys.setrecursionlimit(10000)  # as the dialog used to
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sheet.png")
+        clicks, big_bounds = make_sheet(path, args.sprites, args.big)
+        clicks = [clicks[index % len(clicks)] for index in range(args.clicks)]
+        image = sheets.get(path)
+
+        start = time.perf_counter()
+        old = [flood_fill_bounds(image, x, y) for x, y in clicks]
+        flood_fill = time.perf_counter() - start
+        old_big = flood_fill_bounds(image, big_bounds[0], big_bounds[1])
+
+        labels = LabelCache()
+        start = time.perf_counter()
+        labels.get(path)
+        labelling = time.perf_counter() - start
+        start = time.perf_counter()
+        new = [labels.bounds_at(path, x, y) for x, y in clicks]
+        lookups = time.perf_counter() - start
+        new_big = labels.bounds_at(path, big_bounds[0], big_bounds[1])
+
+        assert new == [search_bounds(image, x, y) for x, y in clicks], "the labels cut sprites wrong"
+        assert new_big == big_bounds == search_bounds(image, big_bounds[0], big_bounds[1]), f"the big sprite was cut to {new_big}"
+        cut_short = sum(old_bounds != new_bounds for old_bounds, new_bounds in zip(old, new))
+        height, width = image.shape[:2]
+        num_labelled = len(labels.get(path)[1]) - 1
+
+    print(f"{args.clicks} clicks on {args.sprites} sprites of a {width}x{height} sheet")
+    print(f"  flood fill per click: {flood_fill * 1000:8.1f} ms, {cut_short} clicks cut short")
+    print(f"  label sheet once:     {labelling * 1000:8.1f} ms ({num_labelled} sprites)")
+    print(f"  lookups:              {lookups * 1000:8.3f} ms")
+    print(f"{args.big}x{args.big} sprite: flood fill cut {old_big}, labels cut {new_big}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Loading the images of all sprites of an animation: one QThread per sprite, each making its QPixmap off the GUI
+thread (as the editor used to), against SpriteLoader, which cuts QImages on a fixed pool with one task per sheet
+and makes the QPixmaps on the GUI thread. Every sheet is decoded again for each run.
+Then SpriteLoader with the render cache (RenderCache), filling it and reading from it as when reopening.
+
+The images of all runs are checked to be the same.
+
+usage: python benchmarks/bench_sprite_loading.py [--sprites 400] [--sheets 4] [--size 1024]
+"""
+import argparse
+import copy
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+from PyQt5 import QtCore, QtGui, QtWidgets
+import sprite_loader
+from NewSpriteDialog import NewSpriteDialog
+from render_cache import renders
+from sheet_cache import sheets
+from sprite import Sprite
+
+
+def thread_per_sprite(sprites_by_path: dict) -> dict:
+    images = {}
+
+    def load(path, sprite):
+        images[sprite.index] = NewSpriteDialog.load_and_crop_sprite(path, sprite)[0]
+
+    threads = []
+    for path, sprites in sprites_by_path.items():
+        for sprite in sprites:
+            thread = QtCore.QThread(None)
+            thread.run = lambda p=path, s=sprite: load(p, s)
+            threads.append(thread)
+            thread.start()
+    [thread.wait() for thread in threads]
+    return images
+
+
+def pool(sprites_by_path: dict) -> dict:
+    images = {}
+    loader = sprite_loader.SpriteLoader()
+    loader.sprite_loaded.connect(lambda sprite, image, *_: images.__setitem__(sprite.index, QtGui.QPixmap.fromImage(image)))
+    loop = QtCore.QEventLoop()
+    loader.finished.connect(loop.quit)
+    loader.load(sprites_by_path)
+    loop.exec_()
+    return images
+
+
+def timed(load, sprites_by_path: dict) -> tuple:
+    sheets.clear()
+    sheets.hits = sheets.misses = 0
+    sprites_by_path = {path: [copy.copy(sprite) for sprite in sprites] for path, sprites in sprites_by_path.items()}
+    start = time.perf_counter()
+    images = load(sprites_by_path)
+    return time.perf_counter() - start, images
+
+
+def pixels(pixmap: QtGui.QPixmap) -> bytes:
+    image = pixmap.toImage().convertToFormat(QtGui.QImage.Format_ARGB32)
+    return bytes(image.constBits().asarray(image.sizeInBytes()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sprites", type=int, default=400)
+    parser.add_argument("--sheets", type=int, default=4)
+    parser.add_argument("--size", type=int, default=1024)
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv[:1])  # kept until the end of main, the pixmaps need it
+    sheets.raw_cache = None
+    with tempfile.TemporaryDirectory() as tmp:
+        sprites_by_path = {}
+        for number in range(args.sheets):
+            path = os.path.join(tmp, f"sheet{number}.png")
+            Image.effect_noise((args.size, args.size), 64).convert("RGBA").save(path)
+            sprites_by_path[path] = []
+        paths = list(sprites_by_path)
+        for index in range(args.sprites):
+            sprite = Sprite(index, "SPRITES", (index * 32) % (args.size - 32), (index * 96) % (args.size - 32), 32, 32)
+            sprite.rotation = 15 * (index % 3)
+            sprites_by_path[paths[index % len(paths)]].append(sprite)
+
+        before, old_images = timed(thread_per_sprite, sprites_by_path)
+        after, new_images = timed(pool, sprites_by_path)
+        assert old_images.keys() == new_images.keys()
+        assert all(pixels(old_images[index]) == pixels(new_images[index]) for index in old_images)
+
+        renders.cache_dir = os.path.join(tmp, "renders")
+        filling, _ = timed(pool, sprites_by_path)
+        renders.hits = 0
+        reopened, cached_images = timed(pool, sprites_by_path)
+        assert all(pixels(old_images[index]) == pixels(cached_images[index]) for index in old_images)
+        hits = renders.hits
+
+    print(f"{args.sprites} sprites from {args.sheets} sheets of {args.size}x{args.size}")
+    print(f"  thread per sprite:     {before * 1000:8.1f} ms, {args.sprites} threads")
+    print(f"  pool:                  {after * 1000:8.1f} ms, {sprite_loader.THREADS} threads")
+    print(f"  pool, filling renders: {filling * 1000:8.1f} ms")
+    print(f"  pool, cached renders:  {reopened * 1000:8.1f} ms ({hits} hits, {sheets.misses} sheets decoded)")
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Startup of the editor, headless: the time to import sprite_animator, and the time from then until the main window
+is first painted (the editor built and shown). Every run is a new process and the median of the runs is printed.
+--eager imports numpy, PIL, pygame and requests up front as the editor used to, for comparison.
+
+If there is no config.json yet, one pointing at an empty game folder is written for the run and removed afterwards.
+
+usage: python benchmarks/bench_startup.py [--runs 5] [--eager]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import os, sys, time
+start = time.perf_counter()
+os.environ["QT_QPA_PLATFORM"] = "offscreen"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, sys.argv[1])
+if sys.argv[2] == "eager":
+    import numpy, PIL.Image, pygame, requests
+import sprite_animator
+from PyQt5 import QtCore, QtWidgets
+imported = time.perf_counter()
+
+class FirstPaint(QtCore.QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Paint and not hasattr(self, "at"):
+            self.at = time.perf_counter()
+            QtCore.QTimer.singleShot(0, app.quit)
+        return False
+
+app = QtWidgets.QApplication(sys.argv[:1])
+first_paint = FirstPaint()
+app.installEventFilter(first_paint)
+window = QtWidgets.QMainWindow()
+editor = sprite_animator.Animator_GUI(window)
+window.show()
+app.exec_()
+heavy = [name for name in ("numpy", "PIL", "pygame", "requests") if name in sys.modules]
+print(imported - start, first_paint.at - imported, ",".join(heavy) or "-")
+os._exit(0)  # without waiting for the update check
+"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--eager", action="store_true")
+    args = parser.parse_args()
+
+    config_path = os.path.join(ROOT, "config.json")
+    with tempfile.TemporaryDirectory() as tmp:
+        write_config = not os.path.isfile(config_path)
+        if write_config:
+            with open(config_path, "w") as f:
+                json.dump({"game_folder_path": tmp}, f)
+        try:
+            runs = []
+            for _ in range(args.runs):
+                output = subprocess.run([sys.executable, "-c", CHILD, ROOT, "eager" if args.eager else "lazy"],
+                                        check=True, capture_output=True, text=True).stdout.split()
+                runs.append((float(output[0]), float(output[1]), output[2]))
+        finally:
+            if write_config:
+                os.remove(config_path)
+
+    import_ms = statistics.median(run[0] for run in runs) * 1000
+    paint_ms = statistics.median(run[1] for run in runs) * 1000
+    print(f"startup ({'eager' if args.eager else 'lazy'} imports), median of {args.runs} runs")
+    print(f"  import sprite_animator: {import_ms:7.1f} ms")
+    print(f"  until first paint:      {paint_ms:7.1f} ms after that, {import_ms + paint_ms:7.1f} ms in all")
+    print(f"  heavy modules loaded:   {runs[-1][2]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Rotating, stretching and zooming sprites: the chain of rotate_pixmap, stretch_pixmap and zoom_pixmap the editor
+used to run, which pads and paints into a new pixmap for every effect, against NewSpriteDialog.transform_pixmap,
+which draws all of them at once.
+Memory is the size of all pixmaps painted into per sprite (4 bytes per pixel), and of the one that is kept.
+
+usage: python benchmarks/bench_transform.py [--size 32] [--rotation 30] [--stretch 1.5] [--zoom 2] [--repeat 200]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+from NewSpriteDialog import NewSpriteDialog
+from sprite import Sprite
+
+
+# the removed chain, as it was last in NewSpriteDialog
+def pad_pixmap(pixmap: QtGui.QPixmap, padding_x: int, padding_y: int) -> QtGui.QPixmap:
+    """
+    returns a pixmap with padding around it
+    """
+    padding_x, padding_y = int(padding_x), int(padding_y)
+    new_width, new_height = pixmap.width() + padding_x * 2, pixmap.height() + padding_y * 2
+    new_pixmap = QtGui.QPixmap(new_width, new_height)
+    new_pixmap.fill(QtCore.Qt.transparent)
+    painter = QtGui.QPainter(new_pixmap)
+    painter.drawPixmap(padding_x, padding_y, pixmap)
+    painter.end()
+    return new_pixmap
+
+
+def rotate_pixmap(sprite, pixmap):
+    if sprite.rotation != 0:
+        wh = max(pixmap.width(), pixmap.height()) * 2
+        if wh % 2 == 1: wh += 1
+        pixmap = pad_pixmap(pixmap, abs(pixmap.width() - wh) / 2, abs(pixmap.height() - wh) / 2)
+        x_diff, y_diff = calculate_diffs(pixmap, wh)
+        new_pixmap = QtGui.QPixmap(wh, wh)
+        new_pixmap.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(new_pixmap)
+        painter.translate(pixmap.width() / 2, pixmap.height() / 2)
+        painter.rotate(sprite.rotation)
+        painter.translate(-pixmap.width() / 2, -pixmap.height() / 2)
+        painter.drawPixmap(QtCore.QPointF(x_diff, y_diff), pixmap)
+        painter.end()
+        return new_pixmap
+    return pixmap
+
+
+def calculate_diffs(pixmap, wh):
+    x_diff, y_diff = (wh - pixmap.width()) / 2, (wh - pixmap.height()) / 2
+    return x_diff, y_diff
+
+
+def stretch_pixmap(sprite: Sprite, pixmap: QtGui.QPixmap):
+    """
+    stretches a pixmap in the appropriate direction by the corresponding factor
+    @param sprite: the sprite object
+    @param pixmap: the pixmap to stretch
+    @return: the stretched pixmap, but with maintained 0, 0
+    """
+    if sprite.stretch_x != 1 or sprite.stretch_y != 1:
+        wh = math.ceil(max(pixmap.width(), pixmap.height()) * max(abs(sprite.stretch_x), abs(sprite.stretch_y)) * 2)
+        if wh % 2 == 1: wh += 1
+        pixmap = pad_pixmap(pixmap, abs(pixmap.width() - wh) / 2, abs(pixmap.height() - wh) / 2)
+        x_diff, y_diff = calculate_diffs(pixmap, wh)
+        new_pixmap = QtGui.QPixmap(wh, wh)
+        new_pixmap.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(new_pixmap)
+        painter.translate(pixmap.width() / 2, pixmap.height() / 2)
+        painter.scale(sprite.stretch_x, sprite.stretch_y)
+        painter.translate(-pixmap.width() / 2, -pixmap.height() / 2)
+        painter.drawPixmap(QtCore.QPointF(x_diff, y_diff), pixmap)
+        painter.end()
+        return new_pixmap
+    return pixmap
+
+
+def zoom_pixmap(sprite: Sprite, pixmap: QtGui.QPixmap):
+    if sprite.zoom != 1:
+        if abs(sprite.zoom) > 1:
+            wh = math.ceil(max(pixmap.width(), pixmap.height()) * abs(sprite.zoom) * 2)
+            if wh % 2 == 1: wh += 1
+        else:
+            wh = max(pixmap.width(), pixmap.height())
+        pixmap = pad_pixmap(pixmap, abs(pixmap.width() - wh) / 2, abs(pixmap.height() - wh) / 2)
+        x_diff, y_diff = calculate_diffs(pixmap, wh)
+        new_pixmap = QtGui.QPixmap(wh, wh)
+        new_pixmap.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(new_pixmap)
+        painter.translate(pixmap.width() / 2, pixmap.height() / 2)
+        painter.scale(sprite.zoom, sprite.zoom)
+        painter.translate(-pixmap.width() / 2, -pixmap.height() / 2)
+        painter.drawPixmap(QtCore.QPointF(x_diff, y_diff), pixmap)
+        painter.end()
+        return new_pixmap
+    return pixmap
+
+
+def pixmap_bytes(*pixmaps) -> int:
+    return sum(pixmap.width() * pixmap.height() * 4 for pixmap in pixmaps)
+
+
+def chain(sprite: Sprite, pixmap: QtGui.QPixmap) -> tuple:
+    """
+    @return: the final pixmap, and the bytes of all pixmaps painted into on the way (the pads included)
+    """
+    painted = []
+    for effect in (rotate_pixmap, stretch_pixmap, zoom_pixmap):
+        transformed = effect(sprite, pixmap)
+        if transformed is not pixmap:
+            # the pixmap was padded to the size of the new one first
+            painted += [transformed, transformed]
+        pixmap = transformed
+    return pixmap, pixmap_bytes(*painted)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=32)
+    parser.add_argument("--rotation", type=float, default=30)
+    parser.add_argument("--stretch", type=float, default=1.5)
+    parser.add_argument("--zoom", type=float, default=2)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv[:1])  # kept until the end of main, the pixmaps need it
+    sprite = Sprite(0, "SPRITES", 0, 0, args.size, args.size)
+    sprite.rotation, sprite.stretch_x, sprite.zoom = args.rotation, args.stretch, args.zoom
+    pixmap = QtGui.QPixmap(args.size, args.size)
+    pixmap.fill(QtGui.QColor(200, 40, 40))
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        chained, chain_painted = chain(sprite, pixmap)
+    chain_ms = (time.perf_counter() - start) / args.repeat * 1000
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        fused, _, _ = NewSpriteDialog.transform_pixmap(sprite, pixmap)
+    fused_ms = (time.perf_counter() - start) / args.repeat * 1000
+
+    print(f"{args.size}x{args.size} sprite, rotation {args.rotation}, stretch {args.stretch}, zoom {args.zoom}")
+    print(f"  chain: {chain_ms:7.3f} ms, {chain_painted / 1024:9.1f} KiB painted, "
+          f"{chained.width()}x{chained.height()} kept ({pixmap_bytes(chained) / 1024:.1f} KiB)")
+    print(f"  fused: {fused_ms:7.3f} ms, {pixmap_bytes(fused) / 1024:9.1f} KiB painted, "
+          f"{fused.width()}x{fused.height()} kept ({pixmap_bytes(fused) / 1024:.1f} KiB)")
+    del app
+
+
+if __name__ == "__main__":
+    main()
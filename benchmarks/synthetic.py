@@ -0,0 +1,62 @@
+import os
+import random
+
+IMAGES = ("SPRITES", "BODY", "HEAD", "ATTR1", "sprites.png", "body.png")
+SFX = ("steps.wav", "sword.wav", "arrow.wav")
+
+
+def make_gani(num_frames=2000, num_sprites=300, layers=12, single_dir=False, seed=0) -> str:
+    """
+    Builds the text of a large synthetic gani.
+    @param num_frames: the number of frames in the ANI block
+    @param num_sprites: the number of SPRITE definitions
+    @param layers: the number of sprites drawn on each frame part
+    @param single_dir: whether the animation is SINGLEDIRECTION
+    @return: the gani file contents
+    """
+    rng = random.Random(seed)
+    lines = ["Animator by PK Vici"]
+    for index in range(num_sprites):
+        image = IMAGES[index % len(IMAGES)]
+        lines.append(f"SPRITE {index} {image} {rng.randint(0, 512)} {rng.randint(0, 512)} "
+                     f"{rng.randint(8, 64)} {rng.randint(8, 64)} sprite {index}")
+    lines.append("")
+    lines.append("LOOP")
+    if single_dir:
+        lines.append("SINGLEDIRECTION")
+    lines.append("DEFAULTHEAD head19.png")
+    lines.append("DEFAULTBODY body.png")
+    for index in range(0, num_sprites, 25):
+        lines.append(f"ROTATEEFFECT {index} 0.5")
+        lines.append(f"ZOOMEFFECT {index} 1.5")
+        lines.append(f"COLOREFFECT {index} 1.0 0.5 0.5 0.75")
+    lines.append("")
+    lines.append("ANI")
+    parts = 1 if single_dir else 4
+    for frame in range(num_frames):
+        for _ in range(parts):
+            line = ",".join(f" {rng.randrange(num_sprites)} {rng.randint(-64, 64)} {rng.randint(-64, 64)}"
+                            for _ in range(layers))
+            lines.append(line)
+        if frame % 10 == 0:
+            lines.append(f"PLAYSOUND {SFX[frame % len(SFX)]} 1.5 2.0")
+        lines.append(f"WAIT {rng.randint(0, 4)}" if frame % 3 else "")
+        lines.append("")
+    lines.append("ANIEND")
+    lines.append("")
+    lines.append("SCRIPT")
+    lines.append("function onCreated() {")
+    lines.append("  echo(\"synthetic\");")
+    lines.append("}")
+    lines.append("SCRIPTEND")
+    return "\n".join(lines) + "\n"
+
+
+def write_gani(directory, name="synthetic.gani", **kwargs) -> str:
+    """
+    Writes a synthetic gani into the given directory and returns its path.
+    """
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write(make_gani(**kwargs))
+    return path
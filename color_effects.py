@@ -0,0 +1,154 @@
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+from PyQt5 import QtGui, sip
+
+FORMAT = QtGui.QImage.Format_ARGB32_Premultiplied
+# byte of each channel in a pixel of FORMAT, which is stored as a native 32 bit 0xAARRGGBB
+B, G, R, A = (0, 1, 2, 3) if sys.byteorder == "little" else (3, 2, 1, 0)
+# weights of qGray, the gray Qt converts colors to (red * 11 + green * 16 + blue * 5) / 32
+GRAY_WEIGHTS = np.zeros(4, dtype=np.float32)
+GRAY_WEIGHTS[[R, G, B]] = (11 / 32, 16 / 32, 5 / 32)
+
+MAX_GRAY_SUM = 255 * 32  # largest red * 11 + green * 16 + blue * 5
+TABLES = 64  # tables kept for the effects used last
+
+_scratch = threading.local()  # output buffer of each thread, reused from call to call
+_tables = OrderedDict()  # {(mode, color_effect): table}
+_tables_lock = threading.Lock()
+
+
+def apply_color_effect(image: QtGui.QImage, color_effect, mode: int) -> QtGui.QImage:
+    """
+    Applies a COLOREFFECT to an image, reading its pixels in place.
+
+    mode 1 multiplies the channels by the factors of color_effect, clamping them to 255.
+    mode 0 (additive) and mode 2 (subtractive) turn the image gray and use the gray as alpha too (scaled by the
+    alpha factor), so that dark pixels fade out. The color is the gray multiplied by the factors (mode 0) or by
+    1 - the factors (mode 2).
+    Pixels stay premultiplied throughout: a pixel that is half transparent is tinted like an opaque one and keeps
+    its coverage.
+
+    In mode 1, unless a factor is above 1 (and a channel may have to be clamped), every channel is only scaled,
+    which is a single float32 multiplication over all bytes. In modes 0 and 2 the result only depends on the gray,
+    so it is worked out once per possible gray into a table and applying it is one lookup per pixel.
+    Otherwise it is computed with whole-array float32 arithmetic.
+
+    @param image: the sprite, converted to Format_ARGB32_Premultiplied if it is not in it
+    @param color_effect: (red, green, blue, alpha) factors
+    @param mode: 0, 1 or 2
+    @return: the image with the effect in Format_ARGB32_Premultiplied. Its pixels live in a buffer that the next call
+    from the same thread reuses, so they must be copied (e.g. with QPixmap.fromImage) before then
+    """
+    if image.format() != FORMAT:
+        image = image.convertToFormat(FORMAT)
+    width, height = image.width(), image.height()
+    if not width or not height: return QtGui.QImage(width, height, FORMAT)
+    pixels = _view(image)
+    output = _output(width, height)
+    color_effect = tuple(float(factor) for factor in color_effect)
+
+    if mode == 1 and 0 <= min(color_effect) and max(color_effect) <= 1:
+        # premultiplied, min(color / a * factor, 1) * a * alpha is color * factor * alpha: a scale per channel
+        scaled = np.multiply(pixels.reshape(-1), _channel_factors(color_effect, width * height * 4), dtype=np.float32)
+        np.rint(scaled, out=scaled)
+        np.copyto(output.reshape(-1), scaled, casting="unsafe")
+    elif mode == 1:
+        _saturated(pixels, color_effect, output)
+    else:
+        gray_sum = np.multiply(pixels[..., R], 11, dtype=np.uint16)
+        gray_sum += np.multiply(pixels[..., G], 16, dtype=np.uint16)
+        gray_sum += np.multiply(pixels[..., B], 5, dtype=np.uint16)
+        np.take(_table(mode, color_effect, _gray_table), gray_sum, axis=0, out=output)
+    return QtGui.QImage(sip.voidptr(output.ctypes.data), width, height, width * 4, FORMAT)
+
+
+def _channel_factors(color_effect: tuple, size: int) -> np.ndarray:
+    """
+    @return: float32 array of size, the factor of each byte of the pixels in a row (one per channel, repeated),
+    so that they are scaled in a single multiplication. Kept per thread for the last effect.
+    """
+    factors = getattr(_scratch, "factors", None)
+    if getattr(_scratch, "factors_of", None) != color_effect or factors.size < size:
+        red, green, blue, alpha = color_effect
+        pixel = np.empty(4, dtype=np.float32)
+        pixel[[R, G, B, A]] = (red * alpha, green * alpha, blue * alpha, alpha)
+        factors = _scratch.factors = np.tile(pixel, size // 4)
+        _scratch.factors_of = color_effect
+    return factors[:size]
+
+
+def _gray_table(mode: int, color_effect: tuple) -> np.ndarray:
+    """
+    @return: (MAX_GRAY_SUM + 1, 4) uint8, the pixel of each red * 11 + green * 16 + blue * 5 of a premultiplied pixel
+    (transparent pixels are black and so stay invisible)
+    """
+    red, green, blue, alpha = color_effect
+    gray = np.arange(MAX_GRAY_SUM + 1, dtype=np.float32)[:, None] / 32
+    factors = np.empty(4, dtype=np.float32)
+    factors[[R, G, B, A]] = (red, green, blue, 0)
+    if mode == 2: factors = 1 - factors
+    new_alpha = np.minimum(gray * alpha, 255)
+    table = np.clip(gray * factors, 0, 255) * (new_alpha / 255)
+    table[:, A] = new_alpha[:, 0]
+    return _to_bytes(table)
+
+
+def _saturated(pixels: np.ndarray, color_effect: tuple, output: np.ndarray) -> None:
+    """
+    mode 1 with factors above 1, where whether a channel reaches 255 depends on the alpha of its pixel too
+    """
+    red, green, blue, alpha = color_effect
+    factors = np.empty(4, dtype=np.float32)
+    factors[[R, G, B, A]] = (red, green, blue, 1)
+    pixels = pixels.astype(np.float32)
+    # unpremultiply, tint, clamp and premultiply by the new alpha at once:
+    # min(color / a * factor, 1) * new_a == min(color * factor * (new_a / a), new_a)
+    old_alpha = pixels[..., A]
+    new_alpha = np.minimum(old_alpha * alpha, 255)
+    scale = np.divide(new_alpha, old_alpha, out=np.zeros_like(old_alpha), where=old_alpha > 0)
+    pixels *= factors
+    pixels *= scale[..., None]
+    np.minimum(pixels, new_alpha[..., None], out=pixels)
+    np.copyto(output, _to_bytes(pixels))
+
+
+def _table(mode: int, color_effect: tuple, make) -> np.ndarray:
+    key = (mode, color_effect)
+    with _tables_lock:
+        table = _tables.get(key)
+        if table is not None:
+            _tables.move_to_end(key)
+            return table
+    table = make(mode, color_effect)
+    with _tables_lock:
+        _tables[key] = table
+        while len(_tables) > TABLES:
+            _tables.popitem(last=False)
+    return table
+
+
+def _to_bytes(values: np.ndarray) -> np.ndarray:
+    return np.rint(np.clip(values, 0, 255)).astype(np.uint8)
+
+
+def _view(image: QtGui.QImage) -> np.ndarray:
+    """
+    @return: (height, width, 4) uint8 array over the pixels of the image, without copying them
+    """
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    rows = np.frombuffer(bits, dtype=np.uint8).reshape(image.height(), image.bytesPerLine())
+    return rows[:, :image.width() * 4].reshape(image.height(), image.width(), 4)
+
+
+def _output(width: int, height: int) -> np.ndarray:
+    """
+    @return: (height, width, 4) uint8 array in the scratch buffer of the thread, grown when too small
+    """
+    size = width * height * 4
+    buffer = getattr(_scratch, "buffer", None)
+    if buffer is None or buffer.size < size:
+        buffer = _scratch.buffer = np.empty(size, dtype=np.uint8)
+    return buffer[:size].reshape(height, width, 4)
@@ -0,0 +1,100 @@
+import math
+from collections import OrderedDict
+from PyQt5 import QtCore, QtGui
+
+
+class CompositeCache:
+    """
+    Frame parts drawn into a single QImage each, so that playback only has to show one image per frame.
+
+    Entries are keyed by the text of the frame part (its sprite indices and positions, see FramePart.to_string),
+    which changes whenever the frame part does, so an edited frame part simply misses and frame parts with the
+    same layers share an entry. An entry also remembers the pixmap and offsets it drew for each sprite and is
+    drawn again once one of them was replaced in sprite_images or sprite_offsets.
+    When the images take more than max_bytes, the least recently used ones are dropped.
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """
+        @param max_bytes: size limit of all images together
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()  # {frame part text: (QImage, x, y, ((sprite index, pixmap, offsets), ...))}
+        self.__bytes = 0
+
+    def get(self, frame_part, sprite_images: dict, sprite_offsets: dict) -> tuple:
+        """
+        @param sprite_images: {sprite index: QPixmap} as shown by the editor
+        @param sprite_offsets: {sprite index: (x_offset, y_offset)} of the pixmaps that are not the size of their sprite
+        @return: (QImage, x, y) the frame part drawn into one image, and where the image's top left corner goes
+        """
+        key = frame_part.to_string()
+        entry = self.__entries.get(key)
+        if entry is not None:
+            if CompositeCache.__is_current(entry[3], sprite_images, sprite_offsets):
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return entry[:3]
+            self.__remove(key)
+        self.misses += 1
+        entry = CompositeCache.__composite(frame_part, sprite_images, sprite_offsets)
+        size = entry[0].sizeInBytes()
+        if size <= self.max_bytes:
+            self.__entries[key] = entry
+            self.__bytes += size
+            while self.__bytes > self.max_bytes:
+                self.__remove(next(iter(self.__entries)))
+        return entry[:3]
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.__bytes = 0
+
+    @property
+    def size_in_bytes(self) -> int:
+        return self.__bytes
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __remove(self, key: str) -> None:
+        self.__bytes -= self.__entries.pop(key)[0].sizeInBytes()
+
+    @staticmethod
+    def __is_current(drawn: tuple, sprite_images: dict, sprite_offsets: dict) -> bool:
+        for index, pixmap, offsets in drawn:
+            if sprite_images.get(index) is not pixmap or sprite_offsets.get(index) != offsets:
+                return False
+        return True
+
+    @staticmethod
+    def __composite(frame_part, sprite_images: dict, sprite_offsets: dict) -> tuple:
+        """
+        Draws the layers of the frame part from the bottom up, where the canvas would put them (see DragImage)
+        @return: an entry
+        """
+        layers = []  # (pixmap, left, top)
+        drawn = {}
+        for sprite, x, y in frame_part.list_of_sprites:
+            pixmap = sprite_images.get(sprite.index)
+            if pixmap is None: continue
+            offsets = sprite_offsets.get(sprite.index)
+            x_offset, y_offset = offsets if offsets else (0, 0)
+            layers.append((pixmap, x - x_offset, y - y_offset))
+            drawn[sprite.index] = (sprite.index, pixmap, offsets)
+        if not layers:
+            return QtGui.QImage(), 0, 0, ()
+
+        # positions may be fractional, the image covers whole pixels around them
+        left = math.floor(min(x for _, x, _ in layers))
+        top = math.floor(min(y for _, _, y in layers))
+        right = math.ceil(max(x + pixmap.width() for pixmap, x, _ in layers))
+        bottom = math.ceil(max(y + pixmap.height() for pixmap, _, y in layers))
+        image = QtGui.QImage(max(1, right - left), max(1, bottom - top), QtGui.QImage.Format_ARGB32_Premultiplied)
+        image.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(image)
+        for pixmap, x, y in layers:
+            painter.drawPixmap(QtCore.QPointF(x - left, y - top), pixmap)
+        painter.end()
+        return image, left, top, tuple(drawn.values())
@@ -0,0 +1,88 @@
+import os
+import tempfile
+
+# Helpers for the on-disk caches (AniCache, RawSheetCache, RenderCache). A cache is a directory of entries, files
+# with the same suffix. Entries are evicted least recently used first, by their modification time, which reading an
+# entry updates (see mark_used).
+
+
+def write(path: str, write_entry) -> bool:
+    """
+    Writes an entry through a temporary file in its directory, so that readers never see a partly written entry.
+    Failing to write the cache is not an error.
+    @param write_entry: called with the temporary file, opened for writing in binary mode
+    @return: whether the entry was written
+    """
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_file_name = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    except OSError:
+        return False
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write_entry(f)
+        os.replace(temp_file_name, path)
+    except (OSError, ValueError):
+        remove(temp_file_name)
+        return False
+    return True
+
+
+def mark_used(path: str) -> None:
+    """
+    Marks an entry as recently used, so that it is evicted last
+    """
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def entries(cache_dir: str, suffix: str) -> list:
+    """
+    @return: [(mtime, size, path)] of the entries in cache_dir
+    """
+    found = []
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(suffix):
+                    try:
+                        if not entry.is_file(): continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    found.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    except OSError:
+        pass
+    return found
+
+
+def evict(cache_dir: str, suffix: str, max_bytes: int, keep: str = None) -> int:
+    """
+    Deletes the least recently used entries until the entries take at most max_bytes
+    @param keep: path of an entry that is not deleted, such as the one just stored
+    @return: the size of the entries left
+    """
+    found = entries(cache_dir, suffix)
+    total = sum(size for _, size, _ in found)
+    for _, size, path in sorted(found):
+        if total <= max_bytes:
+            break
+        if path == keep: continue
+        remove(path)
+        total -= size
+    return total
+
+
+def clear(cache_dir: str, suffix: str) -> None:
+    for _, _, path in entries(cache_dir, suffix):
+        remove(path)
+
+
+def remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
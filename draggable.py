@@ -1,12 +1,15 @@
-import pygame.mixer
 import os
+import typing
 from PyQt5 import QtCore, QtGui, QtWidgets
+if typing.TYPE_CHECKING:
+    import pygame.mixer  # for annotations only, the editor imports pygame when it first plays a sound
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 class DragImage(QtWidgets.QGraphicsPixmapItem):
     """
-    Subclass of QGraphicsPixMapItem to allow for dragging of sprites on the canvas
+    Subclass of QGraphicsPixMapItem to allow for dragging of sprites on the canvas.
+    The canvas keeps one DragImage per layer and reuses it for whatever that layer draws in the frame shown (see set_sprite).
     """
     def __init__(self, parent, sprite, layer_index, x=0, y=0, x_offset=0, y_offset=0):
         """
@@ -16,16 +19,29 @@ class DragImage(QtWidgets.QGraphicsPixmapItem):
         @param x: The x position of the sprite on the screen
         @param y: The y position of the sprite on the screen
         """
-        super().__init__(parent.sprite_images[sprite.index])
+        super().__init__()
         self.parent = parent
+        self.setAcceptHoverEvents(True)
+        self.__pixmap = None
+        self.__x = self.__y = self.__x_offset = self.__y_offset = None
+        self.set_sprite(sprite, layer_index, x, y, x_offset, y_offset)
+
+    def set_sprite(self, sprite, layer_index, x=0, y=0, x_offset=0, y_offset=0) -> None:
+        """
+        Draws the given sprite instead, only updating the pixmap and position when they changed
+        (same parameters as the constructor)
+        """
+        pixmap = self.parent.sprite_images[sprite.index]
+        if pixmap is not self.__pixmap:
+            self.__pixmap = pixmap
+            self.setPixmap(pixmap)
         self.sprite = sprite
         self.layer_index = layer_index
-        self.setAcceptHoverEvents(True)
-        self.__x, self.__y = x, y
         self.__old_x, self.__old_y = x, y
-        self.__x_offset = x_offset
-        self.__y_offset = y_offset
-        self.__set_pos()
+        if (x, y, x_offset, y_offset) != (self.__x, self.__y, self.__x_offset, self.__y_offset):
+            self.__x, self.__y = x, y
+            self.__x_offset, self.__y_offset = x_offset, y_offset
+            self.__set_pos()
 
     @property
     def x(self):
@@ -86,16 +102,24 @@ class SfxImage(QtWidgets.QGraphicsPixmapItem):
     """
     Subclass of QGraphicsPixmapItem for displaying sfx on the frame view
     """
-    def __init__(self, parent, sfx_name: str, sfx_to_play: pygame.mixer.Sound, x=0, y=0, sfx_num=0):
+    def __init__(self, parent, sfx_name: str, sfx_to_play: "pygame.mixer.Sound", x=0, y=0, sfx_num=0):
         super().__init__(QtGui.QPixmap(os.path.join(BASE_DIR, "speaker-icon.png")))
         self.parent = parent
+        self.setAcceptHoverEvents(True)
+        self.__x = self.__y = None
+        self.set_sfx(sfx_name, sfx_to_play, x, y, sfx_num)
+
+    def set_sfx(self, sfx_name: str, sfx_to_play: "pygame.mixer.Sound", x=0, y=0, sfx_num=0) -> None:
+        """
+        Shows the given sfx instead (same parameters as the constructor)
+        """
         self.sfx_name = sfx_name
         self.sfx_to_play = sfx_to_play
-        self.__x, self.__y = x, y
-        self.__old_x, self.__old_y = x, y
         self.sfx_num = sfx_num
-        self.setAcceptHoverEvents(True)
-        self.setPos(self.__x, self.__y)
+        self.__old_x, self.__old_y = x, y
+        if (x, y) != (self.__x, self.__y):
+            self.__x, self.__y = x, y
+            self.setPos(self.__x, self.__y)
 
     @property
     def x(self):
@@ -135,58 +159,3 @@ class SfxImage(QtWidgets.QGraphicsPixmapItem):
 
     def __set_curr_sprite(self) -> None:
         self.parent.select_sfx(self.sfx_num)
-
-
-class DragSpriteView(QtWidgets.QGraphicsView):
-    """
-    Subclass of QGraphicsView for dragging sprites from side bar to canvas
-    """
-    def __init__(self, parent, image, index, all_sprites):
-        super().__init__(parent.sprite_scroll_area.widget())
-        self.parent = parent
-        self.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
-        self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
-        self.setDragMode(QtWidgets.QGraphicsView.ScrollHandDrag)
-        self.setScene(QtWidgets.QGraphicsScene())
-        self.scene().addPixmap(image)
-
-        self.sprite = None
-        for sprite in all_sprites:
-            if sprite.index == index:
-                self.sprite = sprite
-                break
-
-        self.setToolTip(f"Sprite({index}) " + sprite.desc)
-        parent.sprite_scroll_area.widget().layout().addWidget(self)
-        # forward wheel events to the scroll area
-        self.wheelEvent = parent.sprite_scroll_area.wheelEvent
-
-    def enterEvent(self, event):
-        self.setCursor(QtCore.Qt.OpenHandCursor)
-
-    def leaveEvent(self, event):
-        self.setCursor(QtCore.Qt.ArrowCursor)
-
-    def keyPressEvent(self, event):
-        """
-        Calls the keypressevent method of parent so that the sprite can still be moved by the arrow keys without having
-        to click on the main canvas window/sprite
-        """
-        self.parent.key_press_event(event)
-
-    # on right click, give the options to edit or delete
-    def contextMenuEvent(self, event):
-        menu = QtWidgets.QMenu()
-        edit_action = menu.addAction("Edit")
-        delete_action = menu.addAction("Delete")
-        action = menu.exec_(self.mapToGlobal(event.pos()))
-        if action == edit_action:
-            self.parent.edit_sprite(self.sprite)
-        elif action == delete_action:
-            self.parent.delete_sprite(self.sprite)
-
-
-
-
-
-
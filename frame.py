@@ -1,19 +1,31 @@
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from itertools import chain
 from sprite import Sprite
+import threading
 
 
 class Frame:
-    def __init__(self) -> None:
+    __slots__ = ("__registry", "__frame_parts", "__length", "__sfxs", "__text", "__text_single_dir")
+
+    def __init__(self, frame_parts: dict = None) -> None:
         """
         A frame can be instantiated as an empty frame or from another frame
+        @param frame_parts: {direction: FramePart} for the frame, empty frame parts when None
         """
-        self.__frame_parts = {
+        self.__registry = None  # SpriteRegistry of the animation this frame belongs to
+        self.__frame_parts = {}
+        self.__bind_frame_parts(frame_parts or {
             "up": FramePart(),
             "left": FramePart(),
             "down": FramePart(),
             "right": FramePart()
-        }
+        })
         self.__length = 0.05
         self.__sfxs = [] # (file, x, y)
+        self.__text = None  # cached ANI block text, None when the frame changed since it was last rendered
+        self.__text_single_dir = False  # whether the cached text was rendered for a single direction animation
 
     @property
     def length(self) -> float:
@@ -35,31 +47,156 @@ class Frame:
             self.frame_parts[key] = values[::-1]
     
     def add_sfx(self, sfx: list = None) -> None:
-        if sfx:
-            if len(sfx) != 3: sfx = (sfx[0], 1.5, 2)
-            self.__sfxs.append((sfx[0], float(sfx[1])*16, float(sfx[2])*16))
-        else:
-            self.__sfxs.append(("", 0, 0))
+        self.__sfxs.append(Frame.parse_sfx(sfx) if sfx else ("", 0, 0))
+        self.mark_dirty()
+
+    @staticmethod
+    def parse_sfx(sfx: list) -> tuple:
+        """
+        @param sfx: the tokens of a PLAYSOUND line after the keyword (file, x, y)
+        @return: (file, x, y) with x and y in pixels
+        """
+        if len(sfx) != 3: sfx = (sfx[0], 1.5, 2)
+        return sfx[0], float(sfx[1])*16, float(sfx[2])*16
 
     def set_sfx(self, sfx: str, sfx_index: int) -> None:
         self.__sfxs[sfx_index] = (sfx, self.__sfxs[sfx_index][1], self.__sfxs[sfx_index][2])
+        self.mark_dirty()
 
     def set_length(self, length: float) -> None:
         self.__length = length if length >= 0.05 else 0.05
+        self.mark_dirty()
 
     def set_frame_parts(self, frame_parts: dict) -> None:
         if isinstance(frame_parts, dict) and len(frame_parts) == 4 and set(frame_parts.keys()) == {"up", "left", "down", "right"}:
-            self.__frame_parts = frame_parts
+            registry = self.__registry
+            self.set_registry(None)
+            self.__bind_frame_parts(frame_parts)
+            self.set_registry(registry)
+            self.mark_dirty()
+
+    def __bind_frame_parts(self, frame_parts: dict) -> None:
+        self.__frame_parts = frame_parts
+        for frame_part in frame_parts.values():
+            frame_part.set_frame(self)
+
+    def distinct_frame_parts(self) -> list:
+        """
+        Single direction frames use the same frame part for every direction.
+        @return: the frame parts of this frame without duplicates
+        """
+        return list({id(frame_part): frame_part for frame_part in self.__frame_parts.values()}.values())
+
+    def set_registry(self, registry) -> None:
+        """
+        Attaches the frame to the SpriteRegistry of an animation (or detaches it when None)
+        and moves the uses of every sprite drawn on this frame over to it.
+        """
+        if registry is self.__registry: return
+        frame_parts = self.distinct_frame_parts()
+        if registry is not None:
+            for frame_part in frame_parts:
+                frame_part.set_sprites(registry)
+        counts = Counter(chain.from_iterable([frame_part.indices for frame_part in frame_parts]))
+        for sprite_index, count in counts.items():
+            if self.__registry is not None:
+                self.__registry.remove_use(sprite_index, self, count)
+            if registry is not None:
+                registry.add_use(sprite_index, self, count)
+        self.__registry = registry
+
+    def sprite_use_changed(self, sprite_index: int, count: int) -> None:
+        """
+        Called by the frame parts of this frame when sprites are added to or removed from them.
+        @param sprite_index: the index of the sprite that was added or removed
+        @param count: the number of layers added (positive) or removed (negative)
+        """
+        if self.__registry is None: return
+        if count > 0:
+            self.__registry.add_use(sprite_index, self, count)
+        elif count < 0:
+            self.__registry.remove_use(sprite_index, self, -count)
+
+    def directions_using(self, sprite_index: int) -> list:
+        """
+        @return: the directions of this frame that draw the sprite with the given index
+        """
+        return [direction for direction, frame_part in self.__frame_parts.items()
+                if sprite_index in frame_part.indices]
 
     def delete_sprite(self, sprite: Sprite) -> None:
-        for frame_part in self.frame_parts.values():
+        for frame_part in self.distinct_frame_parts():
             frame_part.delete_sprite(sprite)
 
+    def drop_missing_sprites(self) -> None:
+        for frame_part in self.distinct_frame_parts():
+            frame_part.drop_missing_sprites()
+
+    def copy(self, frame_parts: dict = None):
+        """
+        Copying is cheap: the frame part copies share their layers with this frame until one of them changes.
+        @param frame_parts: frame parts for the new frame, copies of the frame parts of this frame when None
+        @return: a new frame with the same contents.
+        Sprites are shared with this frame, frame parts shared between directions stay shared in the copy.
+        """
+        keep_text = frame_parts is None
+        if frame_parts is None:
+            frame_parts = {}
+            copies = {}
+            for direction, frame_part in self.__frame_parts.items():
+                if id(frame_part) not in copies:
+                    copies[id(frame_part)] = FramePart(frame_part)
+                frame_parts[direction] = copies[id(frame_part)]
+        new_frame = Frame(frame_parts)
+        if keep_text:
+            new_frame.__text, new_frame.__text_single_dir = self.__text, self.__text_single_dir
+        new_frame.__length = self.__length
+        new_frame.__sfxs.extend(self.__sfxs)
+        return new_frame
+
     def change_sfx_pos(self, sfx_index: int, x: int, y: int) -> None:
         self.__sfxs[sfx_index] = (self.__sfxs[sfx_index][0], x, y)
+        self.mark_dirty()
 
     def delete_sfx(self, sfx_index: int) -> None:
         self.__sfxs.pop(sfx_index)
+        self.mark_dirty()
+
+    def insert_sfx(self, sfx_index: int, sfx: tuple) -> None:
+        """
+        @param sfx: (file, x, y) as found in sfxs
+        """
+        self.__sfxs.insert(sfx_index, sfx)
+        self.mark_dirty()
+
+    @property
+    def is_dirty(self) -> bool:
+        return self.__text is None
+
+    def mark_dirty(self) -> None:
+        """
+        Drops the cached text of the frame. Called whenever the frame or one of its frame parts changes.
+        """
+        self.__text = None
+
+    def to_string(self, single_dir=False) -> str:
+        """
+        The text is cached until the frame changes, so saving only renders the frames edited since the last save.
+        @param single_dir: whether the animation is single direction (only the first frame part is written)
+        @return: the lines of the ANI block for this frame
+        """
+        if self.__text is None or self.__text_single_dir != single_dir:
+            lines = []
+            for frame_part in self.__frame_parts.values():
+                lines.append(frame_part.to_string())
+                if single_dir:
+                    break
+            for sfx in self.__sfxs:
+                if sfx[0]:
+                    lines.append(f"PLAYSOUND {sfx[0]} {sfx[1]/16.} {sfx[2]/16.}")
+            lines.append(f"WAIT {int((self.__length / 0.05)-1)}" if self.__length > 0.05 else "")
+            self.__text, self.__text_single_dir = "\n".join(lines) + "\n", single_dir
+        return self.__text
 
 
 class FramePart:
@@ -71,20 +208,103 @@ class FramePart:
     Four frame parts make up one frame (one for each dir)
 
     The order of the list is the order they are drawn onto the screen
+
+    The layers are stored as three parallel arrays (sprite index, x, y) instead of a list of (Sprite, x, y) tuples,
+    sprites are looked up by index in the SpriteRegistry of the animation when list_of_sprites is read.
     """
+    __slots__ = ("__frame", "__sprites", "__indices", "__xs", "__ys", "__shared", "__text")
+
     def __init__(self, frame_part=None) -> None:
         """
         A frame part can be instantiated as an empty frame part or from another frame part
         """
-        if not frame_part:
-            self.list_of_sprites_xs_ys = []
+        self.__frame = None  # the Frame this frame part belongs to
+        if frame_part is None:
+            self.__sprites = None  # index -> Sprite lookup, the SpriteRegistry of the animation once attached
+            self.__indices, self.__xs, self.__ys = array("i"), array("i"), array("i")
+            self.__shared = False  # whether the arrays are shared with a copy and must be copied before changing them
+            self.__text = None  # cached to_string, None when changed since it was last rendered
         else:
-            self.list_of_sprites_xs_ys = [x for x in frame_part.list_of_sprites_xs_ys]
+            self.__sprites = frame_part.__sprites
+            # copy on write, the arrays are only copied once either frame part changes
+            self.__indices, self.__xs, self.__ys = frame_part.__indices, frame_part.__xs, frame_part.__ys
+            self.__shared = frame_part.__shared = True
+            self.__text = frame_part.__text
+
+    def set_frame(self, frame: Frame) -> None:
+        self.__frame = frame
+
+    def set_sprites(self, sprites) -> None:
+        """
+        Sets where sprites are looked up by index (the SpriteRegistry of the animation)
+        """
+        self.__sprites = sprites
+
+    def drop_missing_sprites(self) -> None:
+        """
+        Removes the layers drawing sprites that can no longer be looked up
+        (deleted from the animation while this frame part was not part of it).
+        """
+        if self.__sprites is not None and not self.__sprites.keys() >= set(self.__indices):
+            self.__remove_indices(set(self.__indices) - self.__sprites.keys())
+
+    def __own(self) -> None:
+        """
+        Called before changing the arrays in place, copies them if they are shared with another frame part
+        """
+        if self.__shared:
+            self.__indices, self.__xs, self.__ys = array("i", self.__indices), array("i", self.__xs), array("i", self.__ys)
+            self.__shared = False
+
+    def __sprite_use_changed(self, sprite_index: int, count: int) -> None:
+        if self.__frame is not None:
+            self.__frame.sprite_use_changed(sprite_index, count)
+
+    def __changed(self) -> None:
+        self.__text = None
+        if self.__frame is not None:
+            self.__frame.mark_dirty()
+
+    @property
+    def list_of_sprites_xs_ys(self) -> list:
+        """
+        [(Sprite, x, y)] in drawing order, built on every access (changing the list does not change the frame part)
+        """
+        get_sprite = self.__sprites.get if self.__sprites is not None else lambda sprite_index: None
+        return list(zip(map(get_sprite, self.__indices), self.__xs, self.__ys))
 
     @property
     def list_of_sprites(self) -> list:
         return self.list_of_sprites_xs_ys
 
+    @property
+    def indices(self) -> array:
+        """
+        @return: the sprite index of every layer (must not be changed)
+        """
+        return self.__indices
+
+    def flat(self) -> tuple:
+        """
+        @return: (sprite_index, x, y, sprite_index, x, y, ...) for every layer
+        """
+        return tuple(value for layer in zip(self.__indices, self.__xs, self.__ys) for value in layer)
+
+    def set_flat(self, flat) -> None:
+        """
+        Replaces every layer
+        @param flat: layers in the format returned by flat
+        """
+        if self.__frame is not None:
+            for sprite_index, count in Counter(self.__indices).items():
+                self.__sprite_use_changed(sprite_index, -count)
+        self.__indices, self.__xs, self.__ys = array("i", flat[0::3]), array("i", flat[1::3]), array("i", flat[2::3])
+        self.__shared = False
+        if self.__frame is not None:
+            for sprite_index, count in Counter(self.__indices).items():
+                self.__sprite_use_changed(sprite_index, count)
+        self.__changed()
+
     def change_sprite_xs_ys(self, layer: int, x=None, y=None) -> None:
         """
         Changes the location of the sprite on the screen
@@ -92,10 +312,10 @@ class FramePart:
         @param x: The new x coordinate of the sprite
         @param y: The new y coordinate of the sprite
         """
-        sprite, old_x, old_y = self.list_of_sprites_xs_ys[layer]
-        if not isinstance(x, int): x = old_x
-        if not isinstance(y, int): y = old_y
-        self.list_of_sprites_xs_ys[layer] = (sprite, x, y)
+        self.__own()
+        if isinstance(x, int): self.__xs[layer] = x
+        if isinstance(y, int): self.__ys[layer] = y
+        self.__changed()
 
     def shift(self, layer: int, direction: str, amount=1) -> None:
         """
@@ -104,15 +324,39 @@ class FramePart:
         @param direction: The direction of the shift ("horizontal", "vertical")
         @param amount: The amount of pixels to shift the sprite
         """
-        sprite, x, y = self.list_of_sprites_xs_ys[layer]
+        self.__own()
         if direction.lower() == "horizontal":
-            x += amount
+            self.__xs[layer] += amount
         elif direction.lower() == "vertical":
-            y += amount
-        self.list_of_sprites_xs_ys[layer] = (sprite, x, y)
+            self.__ys[layer] += amount
+        self.__changed()
 
     def delete_sprite(self, sprite: Sprite) -> None:
-        self.list_of_sprites_xs_ys = [x for x in self.list_of_sprites_xs_ys if x[0] != sprite]
+        """
+        Removes every layer drawing the sprite (matched by index)
+        """
+        self.__remove_indices({sprite.index})
+
+    def __remove_indices(self, sprite_indices: set) -> None:
+        """
+        Removes every layer drawing a sprite with one of the given indices
+        """
+        kept = [layer for layer, sprite_index in enumerate(self.__indices) if sprite_index not in sprite_indices]
+        if len(kept) == len(self.__indices): return
+        for sprite_index in sprite_indices:
+            removed = self.__indices.count(sprite_index)
+            if removed:
+                self.__sprite_use_changed(sprite_index, -removed)
+        self.__indices = array("i", [self.__indices[layer] for layer in kept])
+        self.__xs = array("i", [self.__xs[layer] for layer in kept])
+        self.__ys = array("i", [self.__ys[layer] for layer in kept])
+        self.__shared = False
+        self.__changed()
+
+    def __swap(self, layer: int, other_layer: int) -> None:
+        self.__own()
+        for values in (self.__indices, self.__xs, self.__ys):
+            values[layer], values[other_layer] = values[other_layer], values[layer]
 
     def change_layer(self, layer_to_move: int, direction: str) -> bool:
         """
@@ -130,14 +374,14 @@ class FramePart:
         #     return False
 
         if direction.lower() == "up":
-            if len(self.list_of_sprites_xs_ys)-1 > layer_to_move >= 0:
-                self.list_of_sprites_xs_ys[layer_to_move], self.list_of_sprites_xs_ys[layer_to_move + 1] = \
-                    self.list_of_sprites_xs_ys[layer_to_move + 1], self.list_of_sprites_xs_ys[layer_to_move]
+            if len(self.__indices)-1 > layer_to_move >= 0:
+                self.__swap(layer_to_move, layer_to_move + 1)
+                self.__changed()
                 return True
         elif direction.lower() == "down":
-            if len(self.list_of_sprites_xs_ys) > layer_to_move > 0:
-                self.list_of_sprites_xs_ys[layer_to_move], self.list_of_sprites_xs_ys[layer_to_move - 1] = \
-                    self.list_of_sprites_xs_ys[layer_to_move - 1], self.list_of_sprites_xs_ys[layer_to_move]
+            if len(self.__indices) > layer_to_move > 0:
+                self.__swap(layer_to_move, layer_to_move - 1)
+                self.__changed()
                 return True
         return False
     
@@ -146,7 +390,32 @@ class FramePart:
         Adds a sprite to the list
         Format: (Sprite, x, y)
         """
-        self.list_of_sprites_xs_ys.append(sprite_x_y)
+        sprite, x, y = sprite_x_y
+        if self.__sprites is None:
+            self.__sprites = {}  # not attached to an animation yet, remember the sprites until it is
+        if isinstance(self.__sprites, dict):
+            self.__sprites[sprite.index] = sprite
+        self.__own()
+        self.__indices.append(sprite.index)
+        self.__xs.append(x)
+        self.__ys.append(y)
+        self.__sprite_use_changed(sprite.index, 1)
+        self.__changed()
+
+    def insert_sprite_xs_ys(self, layer: int, sprite_x_y: tuple) -> None:
+        """
+        Adds a sprite at the given layer, the layers above it move up by one
+        Format: (Sprite, x, y)
+        """
+        self.add_sprite_xs_ys(sprite_x_y)
+        if layer < len(self.__indices) - 1:
+            self.change_order(len(self.__indices) - 1, layer)
+
+    def layers_of(self, sprite_index: int) -> list:
+        """
+        @return: [(layer, x, y)] of every layer drawing the sprite with the given index, from the bottom up
+        """
+        return [(layer, self.__xs[layer], self.__ys[layer]) for layer, index in enumerate(self.__indices) if index == sprite_index]
 
     def change_order(self, orig_ind, new_ind) -> None:
         """
@@ -155,7 +424,10 @@ class FramePart:
         @param orig_ind: The index of the sprite to be moved
         @param new_ind: The index to move the sprite to
         """
-        self.list_of_sprites_xs_ys.insert(new_ind, self.list_of_sprites.pop(orig_ind))
+        self.__own()
+        for values in (self.__indices, self.__xs, self.__ys):
+            values.insert(new_ind, values.pop(orig_ind))
+        self.__changed()
 
     def remove_by_layer(self, layer) -> None:
         """
@@ -163,14 +435,181 @@ class FramePart:
 
         @param ind: The index of the sprite to be removed
         """
-        self.list_of_sprites_xs_ys.pop(layer)
+        self.__own()
+        sprite_index = self.__indices.pop(layer)
+        self.__xs.pop(layer)
+        self.__ys.pop(layer)
+        self.__sprite_use_changed(sprite_index, -1)
+        self.__changed()
 
     def to_string(self) -> str:
         """
         Returns a string representation of the frame part
         """
-        out = ""
-        for sprite, x, y in self.list_of_sprites_xs_ys:
-            out += f" {sprite.index} {x} {y},"
-        return out[:-1]
+        if self.__text is None:
+            self.__text = ",".join([f" {sprite_index} {x} {y}" for sprite_index, x, y in zip(self.__indices, self.__xs, self.__ys)])
+        return self.__text
+
+
+class FrameStub:
+    """
+    Stands in for a frame of a lazily opened gani until the frame is built.
+    Holds the byte range of the frame's lines in the ANI block and what is needed without building the frame
+    (its length and sounds).
+    """
+    __slots__ = ("start", "end", "single_dir", "length", "sfxs")
+
+    def __init__(self, start: int, end: int, single_dir: bool) -> None:
+        self.start = start  # offset of the first frame part line
+        self.end = end  # offset of the end of the last frame part line
+        self.single_dir = single_dir
+        self.length = 0.05
+        self.sfxs = ()
+
+    def add_sfx(self, sfx: list = None) -> None:
+        self.sfxs += (Frame.parse_sfx(sfx) if sfx else ("", 0, 0),)
+
+    def set_length(self, length: float) -> None:
+        self.length = length if length >= 0.05 else 0.05
+
+
+class LazyFrameList:
+    """
+    The list of frames of an animation.
+
+    Frames of a lazily opened gani are kept as FrameStubs and are built with build_frame the first time they are
+    accessed, so only the frames that are actually viewed cost memory.
+    Lengths and sounds of the frames can be read without building them.
+
+    The list also keeps the time at which each frame ends (the sum of the lengths up to it), so that the time of a
+    frame is found in O(1) and the frame playing at a time in O(log n). After an edit, only the end times from the
+    edited frame on are summed again, the next time one of them is needed.
+    Lengths of frames in the list must therefore be changed with set_length of the list.
+    """
+    def __init__(self, build_frame=None, on_all_built=None) -> None:
+        """
+        @param build_frame: function that turns a FrameStub into a Frame
+        @param on_all_built: called once the last FrameStub has been built
+        """
+        self.__entries = []  # Frame or FrameStub
+        self.__stubs = 0
+        self.__build_frame = build_frame
+        self.__on_all_built = on_all_built
+        self.__lock = threading.Lock()  # the playback thread builds frames too
+        self.__end_times = []  # end time of each frame, only the first __valid_end_times are up to date
+        self.__valid_end_times = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.__entries)))]
+        entry = self.__entries[index]
+        return self.__build(index) if isinstance(entry, FrameStub) else entry
+
+    def __iter__(self):
+        for i in range(len(self.__entries)):
+            yield self[i]
+
+    def entry(self, index: int):
+        """
+        @return: the frame at index, or its FrameStub if it has not been built yet
+        """
+        return self.__entries[index]
+
+    def length(self, index: int) -> float:
+        return self.__entries[index].length
+
+    def sfxs(self, index: int):
+        return self.__entries[index].sfxs
+
+    def set_length(self, index: int, length: float) -> None:
+        self.__entries[index].set_length(length)
+        self.__changed_from(index)
+
+    @property
+    def unbuilt_count(self) -> int:
+        return self.__stubs
+
+    @property
+    def duration(self) -> float:
+        """
+        @return: the sum of the lengths of all frames
+        """
+        return self.end_time(-1) if self.__entries else 0.0
+
+    def start_time(self, index: int) -> float:
+        """
+        @return: the time at which the frame at index starts playing
+        """
+        if index < 0: index += len(self.__entries)
+        return self.end_time(index - 1) if index > 0 else 0.0
+
+    def end_time(self, index: int) -> float:
+        """
+        @return: the time at which the frame at index stops playing (the sum of the lengths up to and including it)
+        """
+        if index < 0: index += len(self.__entries)
+        with self.__lock:  # the playback thread reads them while the editor changes frames
+            if index >= self.__valid_end_times:
+                self.__sum_end_times()
+            return self.__end_times[index]
+
+    def index_at(self, time: float) -> int:
+        """
+        @return: index of the frame playing at the given time (in seconds),
+        the first or last frame when the time is before or after the animation
+        """
+        if not self.__entries: return -1
+        with self.__lock:
+            if self.__valid_end_times < len(self.__entries):
+                self.__sum_end_times()
+            return min(bisect_right(self.__end_times, time), len(self.__end_times) - 1)
+
+    def insert(self, index: int, frame) -> None:
+        self.__changed_from(index)
+        self.__entries.insert(index, frame)
+        if isinstance(frame, FrameStub):
+            self.__stubs += 1
+
+    def append(self, frame) -> None:
+        self.insert(len(self.__entries), frame)
+
+    def pop(self, index: int = -1) -> Frame:
+        self[index]  # builds the frame if needed
+        self.__changed_from(index)
+        return self.__entries.pop(index)
+
+    def reverse(self) -> None:
+        self.__entries.reverse()
+        self.__changed_from(0)
+
+    def __changed_from(self, index: int) -> None:
+        """
+        Marks the end times from the frame at index on as outdated
+        """
+        if index < 0: index = max(0, index + len(self.__entries))
+        self.__valid_end_times = min(self.__valid_end_times, index)
+
+    def __sum_end_times(self) -> None:
+        """
+        Sums the outdated end times again, called with the lock held
+        """
+        entries, end_times, valid = self.__entries, self.__end_times, self.__valid_end_times
+        del end_times[valid:]
+        time = end_times[-1] if end_times else 0
+        for i in range(valid, len(entries)):
+            time += entries[i].length
+            end_times.append(time)
+        self.__valid_end_times = len(entries)
 
+    def __build(self, index: int) -> Frame:
+        with self.__lock:
+            entry = self.__entries[index]
+            if isinstance(entry, FrameStub):
+                entry = self.__entries[index] = self.__build_frame(entry)
+                self.__stubs -= 1
+                if not self.__stubs and self.__on_all_built:
+                    self.__on_all_built()
+            return entry
@@ -0,0 +1,454 @@
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from frame import Frame
+from sprite import Sprite
+
+
+class Command(ABC):
+    """
+    An edit of an animation that can be undone.
+
+    A command only keeps what it needs to reverse its own edit (a delta, the removed layer, the removed frame...)
+    instead of a copy of the animation, so undoing and redoing cost as much as the edit itself.
+    Frames are addressed by index, which stays valid because the history is undone and redone in order.
+    """
+    # where the edit happened, shown after undoing or redoing it (None: stay where we are)
+    frame_index = None
+    direction = None
+    layer = None
+    sprite_index = None  # the sprite whose image has to be reloaded after undoing or redoing, if any
+    size = 100  # rough number of bytes the command holds on to
+
+    @abstractmethod
+    def apply(self, animation) -> bool:
+        """
+        Makes the edit
+        @return: False if nothing changed, the command is then not recorded
+        """
+
+    @abstractmethod
+    def revert(self, animation) -> None:
+        """
+        Undoes the edit made by apply
+        """
+
+    def merge(self, command) -> bool:
+        """
+        Folds a command that was applied right after this one into this one, so both are undone at once
+        @return: whether the command was merged
+        """
+        return False
+
+    @staticmethod
+    def frame_size(frame: Frame) -> int:
+        """
+        @return: rough number of bytes held by a frame
+        """
+        return 200 + sum(12 * len(frame_part.indices) for frame_part in frame.distinct_frame_parts())
+
+
+class MoveSprite(Command):
+    def __init__(self, frame_index: int, direction: str, layer: int, dx: int, dy: int) -> None:
+        self.frame_index, self.direction, self.layer = frame_index, direction, layer
+        self.dx, self.dy = dx, dy
+
+    def apply(self, animation) -> bool:
+        self.__shift(animation, self.dx, self.dy)
+        return bool(self.dx or self.dy)
+
+    def revert(self, animation) -> None:
+        self.__shift(animation, -self.dx, -self.dy)
+
+    def __shift(self, animation, dx: int, dy: int) -> None:
+        frame_part = animation.frames[self.frame_index].frame_parts[self.direction]
+        if dx: frame_part.shift(self.layer, "horizontal", dx)
+        if dy: frame_part.shift(self.layer, "vertical", dy)
+
+    def merge(self, command) -> bool:
+        """
+        Consecutive nudges of the same sprite become one move
+        """
+        if not isinstance(command, MoveSprite) or (command.frame_index, command.direction, command.layer) != (self.frame_index, self.direction, self.layer):
+            return False
+        self.dx += command.dx
+        self.dy += command.dy
+        return True
+
+
+class ChangeLayer(Command):
+    def __init__(self, frame_index: int, direction: str, layer: int, layer_direction: str) -> None:
+        """
+        @param layer_direction: "up" or "down"
+        """
+        self.frame_index, self.direction, self.layer = frame_index, direction, layer
+        self.__from_layer = layer
+        self.__layer_direction = layer_direction.lower()
+
+    def apply(self, animation) -> bool:
+        if not animation.frames[self.frame_index].frame_parts[self.direction].change_layer(self.__from_layer, self.__layer_direction):
+            return False
+        self.layer = self.__from_layer + (1 if self.__layer_direction == "up" else -1)
+        return True
+
+    def revert(self, animation) -> None:
+        animation.frames[self.frame_index].frame_parts[self.direction].change_layer(self.layer, "down" if self.__layer_direction == "up" else "up")
+        self.layer = self.__from_layer
+
+
+class AddLayer(Command):
+    def __init__(self, frame_index: int, direction: str, sprite: Sprite, x: int, y: int) -> None:
+        self.frame_index, self.direction = frame_index, direction
+        self.__sprite_index, self.__x, self.__y = sprite.index, x, y
+
+    def apply(self, animation) -> bool:
+        frame_part = animation.frames[self.frame_index].frame_parts[self.direction]
+        frame_part.add_sprite_xs_ys((animation.get_sprite(self.__sprite_index), self.__x, self.__y))
+        self.layer = len(frame_part.indices) - 1
+        return True
+
+    def revert(self, animation) -> None:
+        animation.frames[self.frame_index].frame_parts[self.direction].remove_by_layer(self.layer)
+
+
+class RemoveLayer(Command):
+    def __init__(self, frame_index: int, direction: str, layer: int) -> None:
+        self.frame_index, self.direction, self.layer = frame_index, direction, layer
+        self.__removed = None  # (Sprite, x, y)
+
+    def apply(self, animation) -> bool:
+        frame_part = animation.frames[self.frame_index].frame_parts[self.direction]
+        self.layer %= len(frame_part.indices)
+        self.__removed = frame_part.list_of_sprites_xs_ys[self.layer]
+        frame_part.remove_by_layer(self.layer)
+        return True
+
+    def revert(self, animation) -> None:
+        animation.frames[self.frame_index].frame_parts[self.direction].insert_sprite_xs_ys(self.layer, self.__removed)
+
+
+class InsertFrame(Command):
+    def __init__(self, frame_index: int, frame: Frame) -> None:
+        self.frame_index = frame_index
+        self.__frame = frame
+        self.size = Command.frame_size(frame)
+
+    def apply(self, animation) -> bool:
+        animation.insert_frame(self.frame_index, self.__frame)
+        return True
+
+    def revert(self, animation) -> None:
+        animation.remove_frame(self.frame_index)
+
+
+class RemoveFrame(Command):
+    def __init__(self, frame_index: int) -> None:
+        self.frame_index = frame_index
+        self.__frame = None
+
+    def apply(self, animation) -> bool:
+        self.__frame = animation.remove_frame(self.frame_index)
+        self.size = Command.frame_size(self.__frame)
+        return True
+
+    def revert(self, animation) -> None:
+        animation.insert_frame(self.frame_index, self.__frame)
+
+
+class AddSfx(Command):
+    def __init__(self, frame_index: int) -> None:
+        self.frame_index = frame_index
+
+    def apply(self, animation) -> bool:
+        animation.frames[self.frame_index].add_sfx()
+        return True
+
+    def revert(self, animation) -> None:
+        frame = animation.frames[self.frame_index]
+        frame.delete_sfx(len(frame.sfxs) - 1)
+
+
+class SetSfx(Command):
+    def __init__(self, frame_index: int, sfx_index: int, sfx: str) -> None:
+        self.frame_index = frame_index
+        self.__sfx_index, self.__sfx = sfx_index, sfx
+        self.__old_sfx = None
+
+    def apply(self, animation) -> bool:
+        frame = animation.frames[self.frame_index]
+        self.__old_sfx = frame.sfxs[self.__sfx_index][0]
+        frame.set_sfx(self.__sfx, self.__sfx_index)
+        return self.__sfx != self.__old_sfx
+
+    def revert(self, animation) -> None:
+        animation.frames[self.frame_index].set_sfx(self.__old_sfx, self.__sfx_index)
+
+
+class MoveSfx(Command):
+    def __init__(self, frame_index: int, sfx_index: int, x: int, y: int) -> None:
+        self.frame_index = frame_index
+        self.__sfx_index, self.__x, self.__y = sfx_index, x, y
+        self.__old_x = self.__old_y = None
+
+    def apply(self, animation) -> bool:
+        frame = animation.frames[self.frame_index]
+        _, self.__old_x, self.__old_y = frame.sfxs[self.__sfx_index]
+        frame.change_sfx_pos(self.__sfx_index, self.__x, self.__y)
+        return (self.__x, self.__y) != (self.__old_x, self.__old_y)
+
+    def revert(self, animation) -> None:
+        animation.frames[self.frame_index].change_sfx_pos(self.__sfx_index, self.__old_x, self.__old_y)
+
+
+class DeleteSfx(Command):
+    def __init__(self, frame_index: int, sfx_index: int) -> None:
+        self.frame_index = frame_index
+        self.__sfx_index = sfx_index
+        self.__removed = None
+
+    def apply(self, animation) -> bool:
+        frame = animation.frames[self.frame_index]
+        self.__removed = frame.sfxs[self.__sfx_index]
+        frame.delete_sfx(self.__sfx_index)
+        return True
+
+    def revert(self, animation) -> None:
+        animation.frames[self.frame_index].insert_sfx(self.__sfx_index, self.__removed)
+
+
+class SetFrameLength(Command):
+    def __init__(self, frame_index: int, length: float) -> None:
+        self.frame_index = frame_index
+        self.__length = length
+        self.__old_length = None
+
+    def apply(self, animation) -> bool:
+        frames = animation.frames
+        self.__old_length = frames.length(self.frame_index)
+        frames.set_length(self.frame_index, self.__length)
+        return frames.length(self.frame_index) != self.__old_length
+
+    def revert(self, animation) -> None:
+        animation.frames.set_length(self.frame_index, self.__old_length)
+
+
+class SetAttr(Command):
+    def __init__(self, attr: str, value: str) -> None:
+        self.attr = attr.lower()
+        self.__value = value
+        self.__old_value = None
+
+    def apply(self, animation) -> bool:
+        self.__old_value = animation.attrs[self.attr]
+        animation.set_attr(self.attr, self.__value)
+        return self.__value != self.__old_value
+
+    def revert(self, animation) -> None:
+        animation.set_attr(self.attr, self.__old_value)
+
+
+class SetSetbackto(Command):
+    def __init__(self, setbackto: str) -> None:
+        self.__setbackto = setbackto
+        self.__old_setbackto = None
+
+    def apply(self, animation) -> bool:
+        self.__old_setbackto = animation.setbackto
+        animation.set_setbackto(self.__setbackto)
+        return self.__setbackto != self.__old_setbackto
+
+    def revert(self, animation) -> None:
+        animation.set_setbackto(self.__old_setbackto)
+
+    def merge(self, command) -> bool:
+        """
+        The textbox is recorded on every keystroke, typing a word becomes one change
+        """
+        if not isinstance(command, SetSetbackto): return False
+        self.__setbackto = command.__setbackto
+        return True
+
+
+class SetFlags(Command):
+    def __init__(self, is_loop: bool, is_continuous: bool) -> None:
+        self.__flags = (is_loop, is_continuous)
+        self.__old_flags = None
+
+    def apply(self, animation) -> bool:
+        self.__old_flags = (animation.is_loop, animation.is_continuous)
+        animation.is_loop, animation.is_continuous = self.__flags
+        return self.__flags != self.__old_flags
+
+    def revert(self, animation) -> None:
+        animation.is_loop, animation.is_continuous = self.__old_flags
+
+
+class SetScript(Command):
+    def __init__(self, script: str) -> None:
+        self.__script = script
+        self.__old_script = None
+        self.size = 100 + 2 * len(script)
+
+    def apply(self, animation) -> bool:
+        self.__old_script = animation.script
+        animation.set_script(self.__script)
+        self.size += len(self.__old_script)
+        return self.__script != self.__old_script
+
+    def revert(self, animation) -> None:
+        animation.set_script(self.__old_script)
+
+
+class ReverseFrames(Command):
+    def apply(self, animation) -> bool:
+        animation.reverse_frames()
+        return len(animation.frames) > 1
+
+    def revert(self, animation) -> None:
+        animation.reverse_frames()
+
+
+class ToggleSingleDir(Command):
+    """
+    Converting the frames replaces all of them, the frames from before and after the conversion are kept
+    (they share their layers until one of them is changed, see FramePart)
+    """
+    frame_index = 0
+
+    def __init__(self) -> None:
+        self.__old_frames = self.__new_frames = None
+
+    def apply(self, animation) -> bool:
+        if self.__new_frames is None:
+            self.__old_frames = animation.toggle_single_dir()
+            self.__new_frames = list(animation.frames)
+            self.size = 100 + sum(map(Command.frame_size, self.__old_frames))
+        else:
+            animation.replace_frames(self.__new_frames, not animation.is_single_dir)
+        return True
+
+    def revert(self, animation) -> None:
+        animation.replace_frames(self.__old_frames, not animation.is_single_dir)
+
+
+class AddSprite(Command):
+    """
+    Adds a new sprite, or replaces the sprite with the same index when it is edited
+    """
+    def __init__(self, sprite: Sprite, image_path: str = None, replaced_image_path: str = None) -> None:
+        """
+        @param image_path: file the image of the sprite was picked from, for the editor to load it again
+        @param replaced_image_path: same for the replaced sprite
+        """
+        self.sprite_index = sprite.index
+        self.image_path, self.replaced_image_path = image_path, replaced_image_path
+        self.__sprite = sprite
+        self.__replaced = self.__position = None
+
+    def apply(self, animation) -> bool:
+        self.__replaced = animation.get_sprite(self.sprite_index)
+        self.__position = animation.sprite_position(self.sprite_index)
+        animation.add_sprite(self.__sprite)
+        return True
+
+    def revert(self, animation) -> None:
+        if self.__replaced is None:
+            animation.delete_sprite(self.__sprite)
+        else:
+            animation.add_sprite(self.__replaced, self.__position)
+
+
+class DeleteSprite(Command):
+    def __init__(self, sprite: Sprite) -> None:
+        self.sprite_index = sprite.index
+        self.__sprite = sprite
+        self.__deletion = None
+
+    def apply(self, animation) -> bool:
+        self.__deletion = animation.delete_sprite(self.__sprite)
+        self.size = 100 + 60 * len(self.__deletion[1])
+        return True
+
+    def revert(self, animation) -> None:
+        animation.restore_sprite(self.__sprite, self.__deletion)
+
+
+class History:
+    """
+    Undo and redo stacks of the commands applied to an animation.
+
+    Commands applied within MERGE_SECONDS of each other are merged when the last command allows it
+    (see Command.merge), so holding an arrow key is undone in one step.
+    When the commands hold on to more than max_bytes, the oldest ones are forgotten.
+    """
+    MERGE_SECONDS = 1.0
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024) -> None:
+        """
+        @param max_bytes: rough limit of the memory held by all commands together
+        """
+        self.max_bytes = max_bytes
+        self.__undo_stack = deque()
+        self.__redo_stack = []
+        self.__bytes = 0
+        self.__last_time = None  # when the last command was applied, None if it may not be merged into
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self.__undo_stack)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self.__redo_stack)
+
+    def do(self, animation, command: Command) -> bool:
+        """
+        Applies the command to the animation and records it
+        @return: whether the command changed the animation
+        """
+        if not command.apply(animation): return False
+        for undone in self.__redo_stack:
+            self.__bytes -= undone.size
+        self.__redo_stack.clear()
+        now = time.monotonic()
+        last = self.__undo_stack[-1] if self.__undo_stack else None
+        if last is not None and self.__last_time is not None and now - self.__last_time < History.MERGE_SECONDS:
+            size = last.size
+            if last.merge(command):
+                self.__bytes += last.size - size
+                self.__last_time = now
+                return True
+        self.__undo_stack.append(command)
+        self.__bytes += command.size
+        self.__last_time = now
+        while self.__bytes > self.max_bytes and self.__undo_stack:
+            self.__bytes -= self.__undo_stack.popleft().size
+        return True
+
+    def undo(self, animation) -> Command:
+        """
+        @return: the command that was undone, or None if there is nothing to undo
+        """
+        if not self.__undo_stack: return None
+        command = self.__undo_stack.pop()
+        command.revert(animation)
+        self.__redo_stack.append(command)
+        self.__last_time = None
+        return command
+
+    def redo(self, animation) -> Command:
+        """
+        @return: the command that was redone, or None if there is nothing to redo
+        """
+        if not self.__redo_stack: return None
+        command = self.__redo_stack.pop()
+        command.apply(animation)
+        self.__undo_stack.append(command)
+        self.__last_time = None
+        return command
+
+    def clear(self) -> None:
+        self.__undo_stack.clear()
+        self.__redo_stack.clear()
+        self.__bytes = 0
+        self.__last_time = None
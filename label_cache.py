@@ -0,0 +1,141 @@
+import os
+from collections import OrderedDict
+import numpy as np
+from sheet_cache import sheets
+
+
+def label_components(pixels: np.ndarray) -> tuple:
+    """
+    Labels the 8-connected components of the opaque (alpha > 0) pixels of an image.
+
+    The opaque pixels of each row are split into runs, runs of neighbouring rows that touch (diagonally included)
+    are joined by a union-find over all runs at once, so that the work is done by numpy whatever the size and shape
+    of the components.
+    @param pixels: (height, width, 4) RGBA array
+    @return: (label map, boxes): the label map is a (height, width) array holding 0 for transparent pixels and
+    the label of the component otherwise, boxes is a (components + 1, 4) array of the (x, y, width, height) of the
+    component of each label, row 0 is unused
+    """
+    height, width = pixels.shape[:2]
+    stride = width + 2  # of the keys of runs, so that the keys of a row are all below those of the next row
+    opaque = np.zeros((height, stride), dtype=np.int8)
+    opaque[:, 1:-1] = pixels[:, :, 3] != 0
+    edges = np.diff(opaque, axis=1)
+    run_rows, run_starts = np.nonzero(edges == 1)
+    run_ends = np.nonzero(edges == -1)[1]  # exclusive, in the same order as the starts
+    num_runs = len(run_rows)
+
+    # the runs of the next row touching a run are those starting at most one past its end and ending at least one
+    # before its start: a range of runs, as the runs of a row are sorted and disjoint
+    start_keys = run_rows * stride + run_starts
+    end_keys = run_rows * stride + run_ends
+    first = np.searchsorted(end_keys, (run_rows + 1) * stride + run_starts, side="left")
+    last = np.searchsorted(start_keys, (run_rows + 1) * stride + run_ends, side="right")
+    counts = np.maximum(last - first, 0)
+    upper = np.repeat(np.arange(num_runs), counts)
+    lower = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+    parents = np.arange(num_runs)
+    while len(upper):
+        upper_roots, lower_roots = parents[upper], parents[lower]
+        apart = upper_roots != lower_roots
+        if not apart.any():
+            break
+        upper, lower = upper[apart], lower[apart]
+        upper_roots, lower_roots = upper_roots[apart], lower_roots[apart]
+        # the greater root of each pair is hooked to the smallest root it is paired with, so parents never increase
+        np.minimum.at(parents, np.maximum(upper_roots, lower_roots), np.minimum(upper_roots, lower_roots))
+        while True:
+            grandparents = parents[parents]
+            if np.array_equal(grandparents, parents):
+                break
+            parents = grandparents
+
+    roots, run_labels = np.unique(parents, return_inverse=True)
+    run_labels = run_labels.reshape(-1) + 1
+    num_labels = len(roots)
+    boxes = np.zeros((num_labels + 1, 4), dtype=np.int64)
+    if num_runs:
+        left = np.full(num_labels + 1, width)
+        top = np.full(num_labels + 1, height)
+        right = np.zeros(num_labels + 1, dtype=np.int64)
+        bottom = np.zeros(num_labels + 1, dtype=np.int64)
+        np.minimum.at(left, run_labels, run_starts)
+        np.minimum.at(top, run_labels, run_rows)
+        np.maximum.at(right, run_labels, run_ends)
+        np.maximum.at(bottom, run_labels, run_rows + 1)
+        boxes[1:] = np.stack((left, top, right - left, bottom - top), axis=1)[1:]
+
+    label_map = np.zeros((height, width), dtype=np.uint16 if num_labels < 2 ** 16 else np.int32)
+    lengths = run_ends - run_starts
+    pixel_starts = np.repeat(run_starts - np.cumsum(lengths) + lengths, lengths)
+    label_map[np.repeat(run_rows, lengths), pixel_starts + np.arange(lengths.sum())] = np.repeat(run_labels, lengths)
+    return label_map, boxes
+
+
+class LabelCache:
+    """
+    The connected components of source images (see label_components), for slicing sprites out of a sheet by
+    clicking on them: a sheet is labelled once, then finding the sprite under a pixel is a lookup.
+
+    Entries are keyed by the absolute path and mtime of the image, like those of SheetCache. When the label maps
+    take more than max_bytes, the least recently used ones are dropped.
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """
+        @param max_bytes: size limit of all label maps together
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()  # {(path, mtime): (label map, boxes)}
+        self.__bytes = 0
+
+    def get(self, path: str) -> tuple:
+        """
+        @return: (label map, boxes) of the image, see label_components
+        @raise OSError: if the file cannot be read or is not an image
+        """
+        path = os.path.abspath(path)
+        key = (path, os.stat(path).st_mtime_ns)
+        entry = self.__entries.get(key)
+        if entry is not None:
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = label_components(sheets.get(path))
+        size = entry[0].nbytes + entry[1].nbytes
+        if size <= self.max_bytes:
+            for old in [old for old in self.__entries if old[0] == path]:
+                self.__remove(old)  # an older version of the file
+            self.__entries[key] = entry
+            self.__bytes += size
+            while self.__bytes > self.max_bytes:
+                self.__remove(next(iter(self.__entries)))
+        return entry
+
+    def bounds_at(self, path: str, x: int, y: int) -> tuple or None:
+        """
+        @return: (x, y, width, height) of the sprite (connected component) the pixel at x, y of the image belongs
+        to, or None if the pixel is transparent or outside the image
+        @raise OSError: if the file cannot be read or is not an image
+        """
+        label_map, boxes = self.get(path)
+        if x < 0 or y < 0 or y >= label_map.shape[0] or x >= label_map.shape[1]: return None
+        label = label_map[y, x]
+        return tuple(int(value) for value in boxes[label]) if label else None
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.__bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __remove(self, key: tuple) -> None:
+        label_map, boxes = self.__entries.pop(key)
+        self.__bytes -= label_map.nbytes + boxes.nbytes
+
+
+labels = LabelCache()  # shared by the whole process
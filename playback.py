@@ -0,0 +1,77 @@
+import math
+
+
+class PlaybackStats:
+    """
+    How well one playback session kept up with the timeline of the animation
+    """
+    def __init__(self) -> None:
+        self.dropped = 0  # frames that were due but never shown
+        self.__lateness = []  # seconds between when each shown frame was due and when it was on screen
+
+    def record_shown(self, lateness: float) -> None:
+        self.__lateness.append(max(0.0, lateness))
+
+    @property
+    def shown(self) -> int:
+        return len(self.__lateness)
+
+    @property
+    def mean_lateness(self) -> float:
+        return sum(self.__lateness) / len(self.__lateness) if self.__lateness else 0.0
+
+    @property
+    def p99_lateness(self) -> float:
+        """
+        @return: the lateness 99% of the shown frames did not exceed (nearest rank)
+        """
+        if not self.__lateness: return 0.0
+        ordered = sorted(self.__lateness)
+        return ordered[max(0, math.ceil(len(ordered) * 0.99) - 1)]
+
+    def __str__(self) -> str:
+        return f"Played {self.shown} frames, dropped {self.dropped}, " \
+               f"late by {self.mean_lateness * 1000:.1f} ms on average, {self.p99_lateness * 1000:.1f} ms at p99"
+
+
+class PlaybackClock:
+    """
+    Tells which frame of an animation should be on screen at a point in time.
+
+    The animation starts at a fixed point of the monotonic clock and each frame is due at its start time on the
+    timeline of the frames (see LazyFrameList.start_time), so how long showing a frame takes never shifts the frames
+    after it. Frames whose time passed before they were asked for are skipped and counted as dropped.
+    A looping animation starts over after its duration, any other animation ends on its last frame, like in game.
+    """
+    def __init__(self, animation, start: float, stats: PlaybackStats) -> None:
+        """
+        @param animation: read again on every call, so that changing the loop flag while playing takes effect
+        @param start: time.monotonic() at which the first frame is due
+        """
+        self.__animation = animation
+        self.__start = start
+        self.__stats = stats
+        self.__next_index = 0  # the frame after the one shown last, in the current run through the animation
+
+    def frame_at(self, now: float) -> tuple or None:
+        """
+        @param now: time.monotonic()
+        @return: (index, due, end) the frame to show and the monotonic times at which it starts and stops playing,
+        None when the animation is over
+        """
+        frames = self.__animation.frames
+        duration = frames.duration
+        if duration <= 0: return None
+        elapsed = now - self.__start
+        if elapsed >= duration:
+            if not self.__animation.is_loop: return None
+            runs = int(elapsed // duration)
+            self.__stats.dropped += max(0, len(frames) - self.__next_index) + (runs - 1) * len(frames)
+            self.__start += runs * duration
+            elapsed -= runs * duration
+            self.__next_index = 0
+        # waking up at the end time of a frame may round to just before it, the next frame is due then either way
+        index = max(frames.index_at(elapsed), min(self.__next_index, len(frames) - 1))
+        self.__stats.dropped += max(0, index - self.__next_index)
+        self.__next_index = index + 1
+        return index, self.__start + frames.start_time(index), self.__start + frames.end_time(index)
@@ -0,0 +1,124 @@
+import hashlib
+import os
+import struct
+import threading
+import zlib
+from PyQt5 import QtGui
+import disk_cache
+from sheet_cache import RawSheetCache
+
+FORMAT = QtGui.QImage.Format_ARGB32_Premultiplied  # of the images made by NewSpriteDialog.crop_sprite_image
+
+
+class RenderCache:
+    """
+    On-disk cache of the final images of sprites (cropped, transformed and with their color effect), so that
+    reopening an animation skips decoding its sheets and redoing the effects.
+
+    An entry is keyed by the hash of the contents of the source image and everything about the sprite that changes
+    its image: the rectangle, rotation, stretch, zoom, color effect and mode. It holds the offsets of the image and
+    the width and height of the sprite clamped to the source, followed by the zlib-compressed pixels.
+    When the cache directory grows over max_bytes, the least recently used entries are deleted.
+    Without a cache_dir, nothing is cached.
+    """
+    VERSION = 1
+    HEADER = struct.Struct("<4sIiiiiII")
+    MAGIC = b"SPRT"
+    SUFFIX = ".sprite"
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = 128 * 1024 * 1024) -> None:
+        """
+        @param cache_dir: directory to store the entries in, created when needed
+        @param max_bytes: size limit of all entries together
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.__digests = {}  # {(path, mtime, size): sha1 of the file}
+        self.__bytes = None  # size of all entries, counted when first needed
+        self.__lock = threading.Lock()  # sprites are loaded from several threads
+
+    def key(self, image_path: str, sprite) -> str or None:
+        """
+        @return: the name of the entry of the sprite cut from image_path, None if there is no cache or the image
+        cannot be read
+        """
+        if not self.cache_dir or self.max_bytes <= 0: return None
+        try:
+            stat = os.stat(image_path)
+            file_key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+            digest = self.__digests.get(file_key)
+            if digest is None:
+                digest = self.__digests[file_key] = RawSheetCache.key(image_path)[2]
+        except OSError:
+            return None
+        fields = (RenderCache.VERSION, digest, sprite.x, sprite.y, sprite.width, sprite.height, sprite.rotation,
+                  sprite.stretch_x, sprite.stretch_y, sprite.zoom, tuple(sprite.color_effect), sprite.mode)
+        return hashlib.sha1(repr(fields).encode("utf-8")).hexdigest()
+
+    def load(self, key: str) -> tuple or None:
+        """
+        @return: (image, x_offset, y_offset, width, height) of the sprite, or None if there is no valid entry
+        """
+        entry = os.path.join(self.cache_dir, key + RenderCache.SUFFIX)
+        try:
+            with open(entry, "rb") as f:
+                data = f.read()
+            magic, version, x_offset, y_offset, width, height, image_width, image_height = RenderCache.HEADER.unpack_from(data)
+            if magic != RenderCache.MAGIC or version != RenderCache.VERSION:
+                raise ValueError("not an entry of this version")
+            pixels = zlib.decompress(data[RenderCache.HEADER.size:])
+            if len(pixels) != image_width * image_height * 4:
+                raise ValueError("truncated entry")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, struct.error, zlib.error):
+            # unreadable or corrupt entry
+            self.misses += 1
+            disk_cache.remove(entry)
+            return None
+        disk_cache.mark_used(entry)
+        self.hits += 1
+        image = QtGui.QImage(pixels, image_width, image_height, image_width * 4, FORMAT).copy() if pixels else QtGui.QImage()
+        return image, x_offset, y_offset, width, height
+
+    def store(self, key: str, image: QtGui.QImage, x_offset: int, y_offset: int, width: int, height: int) -> None:
+        """
+        Caches the final image of a sprite. Failing to write the cache is not an error.
+        @param image: the image, in FORMAT
+        @param width, height: of the sprite, clamped to its source image
+        """
+        if image.isNull():
+            pixels = b""
+        else:
+            image = image.convertToFormat(FORMAT)
+            bits = image.constBits()
+            bits.setsize(image.sizeInBytes())
+            # rows of 32 bit pixels have no padding
+            pixels = bits.asstring()
+        header = RenderCache.HEADER.pack(RenderCache.MAGIC, RenderCache.VERSION, x_offset, y_offset, width, height, image.width(), image.height())
+        data = header + zlib.compress(pixels, 1)
+        entry = os.path.join(self.cache_dir, key + RenderCache.SUFFIX)
+        try:
+            replaced = os.path.getsize(entry)  # the same sprite stored again, its old entry no longer counts
+        except OSError:
+            replaced = 0
+        if not disk_cache.write(entry, lambda f: f.write(data)): return
+        with self.__lock:
+            if self.__bytes is None:
+                self.__bytes = sum(size for _, size, _ in disk_cache.entries(self.cache_dir, RenderCache.SUFFIX))
+            else:
+                self.__bytes += len(data) - replaced
+            if self.__bytes > self.max_bytes:
+                # down to three quarters of max_bytes, so that the cache is not listed again for every new entry
+                self.__bytes = disk_cache.evict(self.cache_dir, RenderCache.SUFFIX, self.max_bytes * 3 // 4, keep=entry)
+
+    def clear(self) -> None:
+        with self.__lock:
+            disk_cache.clear(self.cache_dir, RenderCache.SUFFIX)
+            self.__bytes = None
+
+
+renders = RenderCache()  # shared by the whole process, off until it is given a cache_dir
@@ -1,9 +1,17 @@
-from PyQt5 import QtCore, QtWidgets
+from PyQt5 import QtCore, QtGui, QtWidgets
+from draggable import DragImage, SfxImage
 
 class AniGraphicsView(QtWidgets.QGraphicsView):
     """
     This class extends QGraphicsView and contains QGraphicsScene to allow for clicking and dragging on the screen
+
+    The scene is kept between frames instead of being cleared and rebuilt: the guide lines are added once,
+    and the items drawing sprites and sounds are reused, the item of a layer only changes what differs from the
+    frame shown before. Items that are not needed by the frame shown are hidden.
+    During playback, a frame part is shown as a single pre-composited image instead (see show_composite).
     """
+    SFX_Z = 1000000  # sounds are drawn above every layer
+
     def __init__(self, widget, scene_rect_x, scene_rect_y, def_scale):
         """
         @param scene_rect_x/y: may be specified depending on the type of animation.
@@ -22,3 +30,98 @@ class AniGraphicsView(QtWidgets.QGraphicsView):
         self.setResizeAnchor(QtWidgets.QGraphicsView.AnchorViewCenter)
 
         self.scale(def_scale, def_scale)
+
+        self.__sprite_items = []  # DragImage of each layer, the first __shown_sprites are visible
+        self.__shown_sprites = 0
+        self.__sfx_items = []
+        self.__shown_sfxs = 0
+        self.__add_guide_lines()
+        self.__composite_item = CompositeImage()
+        self.__composite_item.setZValue(1)
+        self.__composite_item.setVisible(False)
+        self.scene.addItem(self.__composite_item)
+
+    def __add_guide_lines(self) -> None:
+        self.scene.addLine(0, -100000, 0, 100000)
+        self.scene.addLine(-100000, 0, 100000, 0)
+        self.scene.addLine(0, 49, 49, 49)
+        self.scene.addLine(49, 0, 49, 49)
+
+    def show_sprites(self, parent, layers: list) -> None:
+        """
+        @param parent: the editor, passed on to new DragImages
+        @param layers: [(Sprite, x, y, x_offset, y_offset)] of the frame part to show, from the bottom up
+        """
+        self.__composite_item.setVisible(False)
+        items = self.__sprite_items
+        for layer, (sprite, x, y, x_offset, y_offset) in enumerate(layers):
+            if layer < len(items):
+                items[layer].set_sprite(sprite, layer, x, y, x_offset, y_offset)
+            else:
+                item = DragImage(parent, sprite, layer, x, y, x_offset, y_offset)
+                item.setZValue(layer + 1)  # above the guide lines
+                self.scene.addItem(item)
+                items.append(item)
+        self.__shown_sprites = AniGraphicsView.__show_first(items, len(layers), self.__shown_sprites)
+
+    def show_sfxs(self, parent, sfxs: list) -> None:
+        """
+        @param parent: the editor, passed on to new SfxImages
+        @param sfxs: [(file, pygame.mixer.Sound or None, x, y)] of the frame to show
+        """
+        items = self.__sfx_items
+        for sfx_num, (sfx, sfx_to_play, x, y) in enumerate(sfxs):
+            if sfx_num < len(items):
+                items[sfx_num].set_sfx(sfx, sfx_to_play, x, y, sfx_num)
+            else:
+                item = SfxImage(parent, sfx, sfx_to_play, x, y, sfx_num)
+                item.setZValue(AniGraphicsView.SFX_Z)
+                self.scene.addItem(item)
+                items.append(item)
+        self.__shown_sfxs = AniGraphicsView.__show_first(items, len(sfxs), self.__shown_sfxs)
+
+    def show_composite(self, image: QtGui.QImage, x: int, y: int) -> None:
+        """
+        Shows a whole frame part as one image, hiding the items of the layers and sounds
+        (they are shown again by the next show_sprites and show_sfxs)
+        @param x, y: where the top left corner of the image goes
+        """
+        self.__shown_sprites = AniGraphicsView.__show_first(self.__sprite_items, 0, self.__shown_sprites)
+        self.__shown_sfxs = AniGraphicsView.__show_first(self.__sfx_items, 0, self.__shown_sfxs)
+        self.__composite_item.set_image(image, x, y)
+        self.__composite_item.setVisible(True)
+
+    @staticmethod
+    def __show_first(items: list, count: int, shown: int) -> int:
+        """
+        Makes the first count items visible and hides the others, only touching the items that change
+        @param shown: how many items were visible
+        @return: count
+        """
+        for item in items[shown:count]:
+            item.setVisible(True)
+        for item in items[count:shown]:
+            item.setVisible(False)
+        return count
+
+
+class CompositeImage(QtWidgets.QGraphicsItem):
+    """
+    Draws a QImage as it is, without converting it to a QPixmap first
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.__image = QtGui.QImage()
+
+    def set_image(self, image: QtGui.QImage, x: int, y: int) -> None:
+        if image is not self.__image:
+            self.prepareGeometryChange()
+            self.__image = image
+            self.update()
+        self.setPos(x, y)
+
+    def boundingRect(self) -> QtCore.QRectF:
+        return QtCore.QRectF(0, 0, self.__image.width(), self.__image.height())
+
+    def paint(self, painter, option, widget=None) -> None:
+        painter.drawImage(0, 0, self.__image)
@@ -0,0 +1,208 @@
+import hashlib
+import os
+import struct
+import threading
+import typing
+from collections import OrderedDict
+import disk_cache
+# numpy and PIL are imported in the methods that use them, the editor imports this module at startup
+if typing.TYPE_CHECKING:
+    import numpy as np
+
+
+class SheetCache:
+    """
+    Decoded source images (sprite sheets), shared by every sprite cut from them, so that a sheet is decoded once
+    instead of once per sprite.
+
+    Sheets are kept as read-only (height, width, 4) RGBA uint8 arrays, a sprite is a slice of its sheet.
+    Entries are keyed by the absolute path and mtime of the image and are decoded again once the file changes.
+    When the arrays take more than max_bytes, the least recently used ones are dropped.
+
+    Sheets of at least raw_min_bytes (decoded) also go to raw_cache, if there is one, and are memory-mapped from
+    there instead of being held in memory. Those do not count towards max_bytes, their pages belong to the OS.
+    """
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, raw_cache=None, raw_min_bytes: int = 4 * 1024 * 1024) -> None:
+        """
+        @param max_bytes: size limit of all decoded sheets held in memory together
+        @param raw_cache: RawSheetCache for big sheets, or None
+        """
+        self.max_bytes = max_bytes
+        self.raw_cache = raw_cache
+        self.raw_min_bytes = raw_min_bytes
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()  # {(path, mtime): (array, bytes it counts for)}
+        self.__bytes = 0
+        self.__lock = threading.Lock()  # sprites may be loaded from other threads
+
+    def get(self, path: str) -> "np.ndarray":
+        """
+        @param path: path to an image file
+        @return: the decoded image as a read-only (height, width, 4) RGBA array
+        @raise OSError: if the file cannot be read or is not an image
+        """
+        import numpy as np
+        path = os.path.abspath(path)
+        key = (path, os.stat(path).st_mtime_ns)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        array = self.raw_cache.load(path) if self.raw_cache else None
+        if array is None:
+            array = self.__decode(path)
+        size = 0 if isinstance(array, np.memmap) else array.nbytes
+        with self.__lock:
+            if key not in self.__entries and size <= self.max_bytes:
+                for old in [old for old in self.__entries if old[0] == path]:
+                    self.__remove(old)  # an older version of the file
+                self.__entries[key] = (array, size)
+                self.__bytes += size
+                while self.__bytes > self.max_bytes:
+                    self.__remove(next(iter(self.__entries)))
+        return array
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__bytes = 0
+
+    @property
+    def size_in_bytes(self) -> int:
+        return self.__bytes
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __decode(self, path: str) -> "np.ndarray":
+        import numpy as np
+        from PIL import Image
+        with Image.open(path, mode="r") as im:  # only reads the header, the pixels are decoded by convert
+            width, height = im.size
+            big = self.raw_cache is not None and width * height * 4 >= self.raw_min_bytes
+            key = RawSheetCache.key(path) if big else None  # taken before decoding in case the file changes meanwhile
+            array = np.asarray(im.convert("RGBA"))
+        if big:
+            mapped = self.raw_cache.store(path, array, key)
+            if mapped is not None:
+                return mapped
+        array.flags.writeable = False
+        return array
+
+    def __remove(self, key: tuple) -> None:
+        self.__bytes -= self.__entries.pop(key)[1]
+
+
+class RawSheetCache:
+    """
+    On-disk cache of decoded sheets as uncompressed RGBA, which are memory-mapped when loaded, so that reopening a
+    big sheet costs no decoding and editors opened at the same time share its pages.
+
+    Every sheet gets one entry, named after the hash of its absolute path. An entry is a header holding the size
+    of the image and the (mtime, size, sha1) of the file it was decoded from, followed by the rows of pixels.
+    An entry whose mtime differs is still used if the contents of the file are the same (a copied or touched sheet).
+    When the cache directory grows over max_bytes, the least recently used entries are deleted.
+    """
+    VERSION = 1
+    HEADER = struct.Struct("<4sIIIqq20s")
+    HEADER_SIZE = 64  # the pixels start here
+    MAGIC = b"RGBA"
+    SUFFIX = ".rgba"
+
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 * 1024 * 1024) -> None:
+        """
+        @param cache_dir: directory to store the entries in, created when needed
+        @param max_bytes: size limit of all entries together
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, file_name: str) -> "np.memmap or None":
+        """
+        @return: the memory-mapped (height, width, 4) pixels, or None if there is no valid entry for the image
+        """
+        import numpy as np
+        entry = self.__entry_path(file_name)
+        try:
+            with open(entry, "rb") as f:
+                magic, version, width, height, mtime, size, digest = RawSheetCache.HEADER.unpack(f.read(RawSheetCache.HEADER.size))
+            if magic != RawSheetCache.MAGIC or version != RawSheetCache.VERSION:
+                raise ValueError("not an entry of this version")
+            stat = os.stat(file_name)
+            if (mtime, size) != (stat.st_mtime_ns, stat.st_size):
+                if size != stat.st_size or digest != RawSheetCache.__digest(file_name):
+                    self.misses += 1
+                    return None
+                with open(entry, "r+b") as f:  # the same image, remember its new mtime
+                    f.write(RawSheetCache.HEADER.pack(magic, version, width, height, stat.st_mtime_ns, size, digest))
+            array = np.memmap(entry, dtype=np.uint8, mode="r", offset=RawSheetCache.HEADER_SIZE, shape=(height, width, 4))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, struct.error):
+            # unreadable, truncated or corrupt entry
+            self.misses += 1
+            disk_cache.remove(entry)
+            return None
+        disk_cache.mark_used(entry)
+        self.hits += 1
+        return array
+
+    def store(self, file_name: str, array: "np.ndarray", key: tuple = None) -> "np.memmap or None":
+        """
+        Caches the decoded pixels of file_name. Failing to write the cache is not an error.
+        @param array: (height, width, 4) RGBA pixels
+        @param key: the key of the image as it was when it was decoded, taken now if not given
+        @return: the stored pixels memory-mapped, or None if they were not stored
+        """
+        import numpy as np
+        height, width = array.shape[:2]
+        if RawSheetCache.HEADER_SIZE + array.nbytes > self.max_bytes: return None
+        try:
+            mtime, size, digest = key or RawSheetCache.key(file_name)
+        except OSError:
+            return None
+        header = RawSheetCache.HEADER.pack(RawSheetCache.MAGIC, RawSheetCache.VERSION, width, height, mtime, size, digest)
+
+        def write_entry(f) -> None:
+            f.write(header.ljust(RawSheetCache.HEADER_SIZE, b"\0"))
+            f.write(np.ascontiguousarray(array, dtype=np.uint8).data)
+
+        entry = self.__entry_path(file_name)
+        if not disk_cache.write(entry, write_entry): return None
+        try:
+            mapped = np.memmap(entry, dtype=np.uint8, mode="r", offset=RawSheetCache.HEADER_SIZE, shape=(height, width, 4))
+        except (OSError, ValueError):
+            disk_cache.remove(entry)
+            return None
+        disk_cache.evict(self.cache_dir, RawSheetCache.SUFFIX, self.max_bytes, keep=entry)
+        return mapped
+
+    def clear(self) -> None:
+        disk_cache.clear(self.cache_dir, RawSheetCache.SUFFIX)
+
+    @staticmethod
+    def key(file_name: str) -> tuple:
+        """
+        @return: (mtime, size, sha1) of the image file
+        """
+        stat = os.stat(file_name)
+        return stat.st_mtime_ns, stat.st_size, RawSheetCache.__digest(file_name)
+
+    def __entry_path(self, file_name: str) -> str:
+        name = hashlib.sha1(os.path.abspath(file_name).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, name + RawSheetCache.SUFFIX)
+
+    @staticmethod
+    def __digest(file_name: str) -> bytes:
+        with open(file_name, "rb") as f:
+            return hashlib.sha1(f.read()).digest()
+
+
+sheets = SheetCache()  # shared by the whole process
@@ -1,4 +1,7 @@
 class Sprite:
+    __slots__ = ("image", "x", "y", "width", "height", "index", "desc",
+                 "rotation", "stretch_x", "stretch_y", "zoom", "color_effect", "mode")
+
     def __init__(self, sprite_index, image, x, y, width, height, description='') -> None:
         self.image = image
         self.x = int(x)
@@ -2,19 +2,43 @@ from genericpath import isfile
 import os
 import sys
 import json
+import threading
 import time
-import requests
 from PyQt5 import QtCore, QtGui, QtWidgets
 from animation import Animation
+from ani_cache import AniCache
+from asset_index import AssetIndex, IMAGE_EXTENSIONS, SOUND_EXTENSIONS
+from composite_cache import CompositeCache
+from frame import Frame
+from history import History, MoveSprite, ChangeLayer, AddLayer, RemoveLayer, InsertFrame, RemoveFrame, AddSfx, SetSfx, \
+    MoveSfx, DeleteSfx, SetFrameLength, SetAttr, SetSetbackto, SetFlags, SetScript, ReverseFrames, ToggleSingleDir, \
+    AddSprite, DeleteSprite
 from sprite import Sprite
-from draggable import DragImage, DragSpriteView, SfxImage
-from new_sprite_ui import Ui_Dialog as NewSpriteDialog
+from playback import PlaybackClock, PlaybackStats
+from render_cache import renders
 from scene import AniGraphicsView
+from sheet_cache import RawSheetCache, sheets
+from sprite_palette import SpritePalette
 from ui import Ui_MainWindow
-from NewSpriteDialog import NewSpriteDialog
-import pygame
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# image names that stand for another file: {name: the attribute of the animation holding it, None for sprites.png}
+ALIASES = {"SPRITES": None, "SHIELD": "shield", "BODY": "body", "HEAD": "head", "ATTR1": "attr1", "ATTR2": "attr2",
+           "ATTR3": "attr3", "ATTR12": "attr12", "PARAM1": "param1", "PARAM2": "param2", "PARAM3": "param3"}
+# pygame, numpy and PIL (through NewSpriteDialog and SpriteLoader) and requests are slow to import, they are imported
+# where they are first needed so that the window shows up without waiting for them
+
+
+def _mixer():
+    """
+    @return: pygame.mixer, initialized the first time (pygame is used for playing .wav files)
+    """
+    import pygame
+    if not pygame.mixer.get_init():
+        pygame.init()
+        pygame.mixer.init()
+    return pygame.mixer
+
 
 class Animator_GUI(Ui_MainWindow):
     def __init__(self, MainWindow) -> None:
@@ -26,12 +50,26 @@ class Animator_GUI(Ui_MainWindow):
         # set icon to pk_clapper.ico
         MainWindow.setWindowIcon(QtGui.QIcon(os.path.join(BASE_DIR, "pk_clapper.ico")))
 
-        self.__check_for_update()
         self.__init_graphics_view()
         self.__check_for_config_file()
         self.__init_vars()
         self.file_path_map = {} # not in init method because I want it to persist as long as the program is open
+        # files of the game folder by name, stored in the cache and brought up to date when a file is not found
+        self.__assets = AssetIndex(self.__game_folder_path, os.path.join(BASE_DIR, "cache", "assets"), self.__asset_miss_ttl)
         self.curr_file = ""
+        self.__save_thread = None  # saves outlive the animation they were started for, so these are not in init_vars
+        self.__pending_save = None  # (snapshot, file name) of a save requested while another one was still being written
+        self.__sprite_loader = None  # SpriteLoader of the images of the sprites of the current animation
+        self.__loading_sprites = {}  # {index: sprite} whose images are on their way from the loader
+        # the canvas is redrawn at most this often while the images of the sprites arrive
+        self.__loaded_sprites_timer = QtCore.QTimer()
+        self.__loaded_sprites_timer.setSingleShot(True)
+        self.__loaded_sprites_timer.setInterval(50)
+        self.__loaded_sprites_timer.timeout.connect(self.__show_loaded_sprites)
+        # the sprites of the animation, in place of the contents of the scroll area
+        self.__sprite_palette = SpritePalette(self)
+        self.__sprite_palette.sprite_released.connect(self.__add_sprite_to_frame_part)
+        self.sprite_scroll_area.setWidget(self.__sprite_palette)
 
         btns = self.enable_disable_buttons(False)
 
@@ -66,6 +104,7 @@ class Animator_GUI(Ui_MainWindow):
 
         # add arrow key events
         MainWindow.keyPressEvent = self.key_press_event
+        MainWindow.closeEvent = self.close_event
         self.__graphics_view.keyPressEvent = self.key_press_event
         for btn in btns: btn.keyPressEvent = self.key_press_event
 
@@ -140,6 +179,14 @@ class Animator_GUI(Ui_MainWindow):
 
         self.setbackto_textbox.textChanged.connect(self.__set_setbackto)
 
+        # link undo and redo buttons and their shortcuts
+        self.undo_btn.clicked.connect(self.__undo)
+        self.redo_btn.clicked.connect(self.__redo)
+        QtWidgets.QShortcut(QtGui.QKeySequence.Undo, MainWindow).activated.connect(self.__undo)
+        QtWidgets.QShortcut(QtGui.QKeySequence.Redo, MainWindow).activated.connect(self.__redo)
+
+        # once the window is up, so that startup does not share the time with it
+        QtCore.QTimer.singleShot(UpdateChecker.DELAY_MS, self.__check_for_update)
         self.__open_file_associated()
 
     def __open_file_associated(self) -> None:
@@ -185,23 +232,22 @@ class Animator_GUI(Ui_MainWindow):
     
     def __check_for_update(self):
         """
-        Checks if there is an update available.
+        Checks if there is an update available, in the background ("check_for_updates": false turns it off)
         """
-        current_version = self.__get_version()
-        try:
-            response = requests.get("https://api.github.com/repos/nikovacs/sprite-animator/releases/latest")
-            if response.status_code == 200:
-                version = response.json()["name"]
-                if version != current_version:
-                    message_box = QtWidgets.QMessageBox()
-                    message_box.setWindowTitle("Sprite Animator - Update Available")
-                    message_box.setTextFormat(QtCore.Qt.RichText)
-                    message_box.setText(f"<b>Sprite Animator</b> has been updated to version <b>{version}</b>!<br>" \
-                                "Download <a href='https://github.com/nikovacs/sprite-animator/releases/latest'>here</a>.")
-                    message_box.setStandardButtons(QtWidgets.QMessageBox.Ok)
-                    message_box.exec_()
-        except:
-            QtWidgets.QMessageBox.warning(None, "Sprite Animator - Error", "Could not check for updates.")
+        if not self.__check_for_updates: return
+        self.__update_checker = UpdateChecker(self.__get_version())
+        self.__update_checker.update_available_signal.connect(self.__show_update_available)
+        self.__update_checker.failed_signal.connect(lambda: self.statusbar.showMessage("Could not check for updates.", 5000))
+        self.__update_checker.start()
+
+    def __show_update_available(self, version: str) -> None:
+        message_box = QtWidgets.QMessageBox()
+        message_box.setWindowTitle("Sprite Animator - Update Available")
+        message_box.setTextFormat(QtCore.Qt.RichText)
+        message_box.setText(f"<b>Sprite Animator</b> has been updated to version <b>{version}</b>!<br>" \
+                    "Download <a href='https://github.com/nikovacs/sprite-animator/releases/latest'>here</a>.")
+        message_box.setStandardButtons(QtWidgets.QMessageBox.Ok)
+        message_box.exec_()
 
     def __get_version(self) -> str:
         """
@@ -226,19 +272,20 @@ class Animator_GUI(Ui_MainWindow):
         font.setPointSize(14)
         editor.setFont(font)
         editor.show()
-        editor.textChanged.connect(lambda: self.curr_animation.set_script(editor.toPlainText()))
         # wait for the editor to close
         while editor.isVisible():
             QtWidgets.QApplication.processEvents()
+        # recorded once for the whole editing session rather than on every keystroke
+        self.__do(SetScript(editor.toPlainText()))
 
     def __add_sfx(self):
         self.sound_textbox.setText("")
-        self.get_current_frame().add_sfx()
+        self.__do(AddSfx(self.curr_frame))
         self.__display_current_frame()
 
     def __set_sfx(self, sfx):
         if self.curr_animation and isinstance(self.last_sfx_num, int):
-            self.get_current_frame().set_sfx(sfx, self.last_sfx_num)
+            self.__do(SetSfx(self.curr_frame, self.last_sfx_num, sfx))
             self.__display_current_frame()
 
     def __clear_sfx_textbox(self) -> None:
@@ -250,7 +297,8 @@ class Animator_GUI(Ui_MainWindow):
 
     def __set_attr(self, attr: str, value: str) -> None:
         if self.curr_animation:
-            self.curr_animation.set_attr(attr, value)
+            self.__do(SetAttr(attr, value))
+            self.__resolve_aliases()
             self.__update_attr_image(attr)
             self.__display_current_frame()
 
@@ -261,7 +309,7 @@ class Animator_GUI(Ui_MainWindow):
         if self.__clipboard is None: return
         direction = direction.lower()
         if self.curr_animation:
-            self.curr_animation.add_new_frame(self.curr_frame, direction, self.__clipboard)
+            self.__do(InsertFrame(self.curr_frame + (1 if direction == "right" else 0), self.__clipboard.copy()))
             if direction == "right":
                 self.curr_frame += 1
             self.__display_current_frame()
@@ -272,28 +320,35 @@ class Animator_GUI(Ui_MainWindow):
 
     def __add_frame(self) -> None:
         if self.curr_animation:
-            self.curr_animation.add_new_frame(self.curr_frame)
+            self.__do(InsertFrame(self.curr_frame + 1, Frame()))
             self.curr_frame += 1
             self.__display_current_frame()
 
     def __remove_frame(self) -> None:
         if self.curr_animation:
             num_frames = self.__ani_length
-            self.curr_animation.remove_frame(self.curr_frame)
+            self.__do(RemoveFrame(self.curr_frame))
             if not num_frames - 1 > self.curr_frame:
                 self.curr_frame -= 1
             self.__display_current_frame()
 
     def __init_vars(self):
-        # pygame being used for playing .wav files
-        pygame.init()
-        pygame.mixer.init()
-
         with open(os.path.join(BASE_DIR, "config.json"), "r") as f:
-            self.__game_folder_path = json.load(f)["game_folder_path"]
+            config = json.load(f)
+        self.__game_folder_path = config["game_folder_path"]
+        self.__check_for_updates = config.get("check_for_updates", True)
+        # parsed ganis are cached on disk to speed up reopening them, "ani_cache_max_mb": 0 turns the cache off
+        ani_cache_max_mb = config.get("ani_cache_max_mb", 256)
+        self.__ani_cache = AniCache(os.path.join(BASE_DIR, "cache", "ganis"), ani_cache_max_mb * 1024 * 1024) if ani_cache_max_mb > 0 else None
+        # ganis at least this big are opened lazily, their frames are only built once they are viewed
+        self.__lazy_load_min_bytes = config.get("lazy_load_min_mb", 8) * 1024 * 1024
+        # a file that is not in the game folder is only looked for again after this many seconds
+        self.__asset_miss_ttl = config.get("asset_miss_ttl_s", 10)
+        self.__alias_files = None  # {alias: file name or None} of ALIASES for the attributes of the current animation
 
         self.play = False
         self.__play_thread = None
+        self.playback_stats = PlaybackStats()  # of the last playback
         self.curr_dir = "down"
         self.curr_animation = None
         self.curr_frame = 0
@@ -303,10 +358,28 @@ class Animator_GUI(Ui_MainWindow):
         self.sprite_offsets = {}  # index: (x_offset, y_offset) for adjusted sprite images which are no longer their original sizes
         self.__sfx_dict = {}  # {sfx_file.wav: pygame.mixer.Sound)}
         self.__clipboard = None
+        self.__shown_frame = None  # the frame on the canvas, its sounds are played when another frame is shown
+        self.__combo_items = None  # items of selected_sprite_combo
+        # decoded sprite sheets shared by all sprites cut from them, "sheet_cache_mb" limits the memory they take
+        sheets.max_bytes = config.get("sheet_cache_mb", 256) * 1024 * 1024
+        # sheets of at least "raw_sheet_min_mb" once decoded are also kept uncompressed on disk and memory-mapped,
+        # "raw_sheet_cache_mb": 0 turns that off
+        raw_sheet_cache_mb = config.get("raw_sheet_cache_mb", 1024)
+        sheets.raw_cache = RawSheetCache(os.path.join(BASE_DIR, "cache", "sheets"), raw_sheet_cache_mb * 1024 * 1024) if raw_sheet_cache_mb > 0 else None
+        sheets.raw_min_bytes = config.get("raw_sheet_min_mb", 4) * 1024 * 1024
+        # final images of the sprites, kept on disk so that reopening an animation skips decoding and effects,
+        # "render_cache_mb": 0 turns that off
+        render_cache_mb = config.get("render_cache_mb", 128)
+        renders.cache_dir = os.path.join(BASE_DIR, "cache", "sprites") if render_cache_mb > 0 else None
+        renders.max_bytes = render_cache_mb * 1024 * 1024
+        # frame parts drawn into one image each for playback, "playback_cache_mb" limits the memory they take
+        self.__composites = CompositeCache(config.get("playback_cache_mb", 64) * 1024 * 1024)
         self.time_label.setText("0.00")
         self.__listen = False
         self.__last_sfx_num = None
         self.__sfx_active = False
+        # edits of the animation that can be undone, "undo_history_mb" limits the memory they hold on to
+        self.__history = History(config.get("undo_history_mb", 32) * 1024 * 1024)
 
     @property
     def __ani_length(self) -> int:
@@ -315,9 +388,15 @@ class Animator_GUI(Ui_MainWindow):
     def __do_frame_slider_changed_event(self) -> None:
         if self.__listen:
             self.curr_frame = self.frame_slider.value()
-            timer_val = sum([self.curr_animation.frames[i].length for i in range(self.curr_frame + 1)])
-            self.time_label.setText(f"{timer_val:.2f}")
-            self.curr_frame = self.frame_slider.value()
+            self.time_label.setText(f"{self.curr_animation.frames.end_time(self.curr_frame):.2f}")
+            self.__display_current_frame()
+
+    def seek(self, seconds: float) -> None:
+        """
+        Shows the frame that plays at the given time of the animation
+        """
+        if self.curr_animation:
+            self.curr_frame = self.curr_animation.frames.index_at(seconds)
             self.__display_current_frame()
 
     def __set_frame_slider(self) -> None:
@@ -330,35 +409,81 @@ class Animator_GUI(Ui_MainWindow):
     
     def __stop_animation(self) -> None:
         self.play = False
-        self.__play_thread = None
-    
+        if self.__play_thread:
+            self.__play_thread.stop()
+        self.__display_current_frame()  # back to the editable layers
+
+    def __end_playback_thread(self) -> None:
+        """
+        Stops the playback thread and waits for it, before the thread object is let go of
+        """
+        if self.__play_thread:
+            self.__play_thread.stop()
+            self.__play_thread.wait()
+            self.__play_thread = None
+
     def __play_animation(self) -> None:
-        def overwrite_thread(parent):
-            parent.__play_thread = None
-        if self.play: return
-        self.__play_thread = RunAniWorker(self)
-        self.__play_thread.update_screen_signal.connect(self.__display_current_frame)
+        if self.play or not self.curr_animation: return
+        self.__end_playback_thread()  # one that was stopped may not have returned yet
+        thread = RunAniWorker(self.curr_animation)
+        thread.show_frame_signal.connect(lambda index, due: self.__display_playing_frame(thread, index, due))
+        thread.finished.connect(lambda: self.__playback_finished(thread))
+        self.__play_thread = thread
         self.play = True
-        self.__play_thread.start()
-        self.__play_thread.finished.connect(lambda: overwrite_thread(self))
+        thread.start()
+
+    def __playback_finished(self, thread) -> None:
+        self.playback_stats = thread.stats
+        self.statusbar.showMessage(str(thread.stats), 5000)
+        if thread is self.__play_thread:
+            self.__play_thread = None
+            if self.play:  # a non-looping animation ended by itself
+                self.play = False
+                self.__display_current_frame()  # back to the editable layers
+
+    def __display_playing_frame(self, thread, index: int, due: float) -> None:
+        """
+        Shows a frame during playback as one pre-composited image
+        @param thread: the RunAniWorker asking, frames of a playback that was stopped are ignored
+        @param due: time.monotonic() at which the frame should have been on screen
+        """
+        if thread is not self.__play_thread or not self.play: return
+        self.curr_frame = index
+        frame = self.get_current_frame()
+        self.__graphics_view.show_composite(*self.__composites.get(frame.frame_parts[self.curr_dir], self.sprite_images, self.sprite_offsets))
+        self.__listen = False  # moving the slider would show the frame again
+        self.__set_frame_slider()
+        self.__listen = True
+        self.time_label.setText(f"{self.curr_animation.frames.end_time(self.curr_frame):.2f}")
+        if frame.sfxs:
+            for sfx, _, _ in frame.sfxs:
+                if sfx not in self.__sfx_dict:
+                    self.__load_sfx_from_ani()
+        self.__play_frame_sfx()
+        self.__shown_frame = frame
+        thread.frame_shown(due)
 
     def __do_loop_checkbox_changed_event(self) -> None:
         if self.curr_animation and self.__listen:
-            self.curr_animation.is_loop = self.loop_checkbox.isChecked()
-            if self.loop_checkbox.isChecked():
+            is_loop = self.loop_checkbox.isChecked()
+            self.__do(SetFlags(is_loop, self.curr_animation.is_continuous and not is_loop))
+            if is_loop:
+                self.__listen = False
                 self.continuous_checkbox.setChecked(False)
-                self.curr_animation.is_continuous = False
-            
+                self.__listen = True
+
     def __do_continuous_checkbox_changed_event(self) -> None:
         if self.curr_animation and self.__listen:
-            self.curr_animation.is_continuous = self.continuous_checkbox.isChecked()
-            if self.continuous_checkbox.isChecked():
+            is_continuous = self.continuous_checkbox.isChecked()
+            self.__do(SetFlags(self.curr_animation.is_loop and not is_continuous, is_continuous))
+            if is_continuous:
+                self.__listen = False
                 self.loop_checkbox.setChecked(False)
-                self.curr_animation.is_loop = False
+                self.__listen = True
 
     def __do_singledir_checkbox_changed_event(self) -> None:
         if self.curr_animation and self.__listen:
-            self.curr_animation.toggle_single_dir()
+            self.__do(ToggleSingleDir())
             self.__play = False
             self.curr_frame = 0
             self.__display_current_frame()
@@ -370,7 +495,7 @@ class Animator_GUI(Ui_MainWindow):
             length = float(f"{length:.2f}")
             if length < 0.05: length = 0.05
             self.length_textbox.setText(str(length))
-            self.get_current_frame().set_length(length)
+            self.__do(SetFrameLength(self.curr_frame, length))
 
     def __do_sprite_combo_changed_event(self):
         if self.__listen:
@@ -433,14 +558,66 @@ class Animator_GUI(Ui_MainWindow):
         [btn.setEnabled(enable) for btn in lst_btns]
         [other.setEnabled(enable) for other in others]
 
+        self.__update_undo_buttons(enable)
+
         # these buttons are not yet implemented
         self.import_btn.setEnabled(False)
         self.minus_unused_btn.setEnabled(False)
-        self.undo_btn.setEnabled(False)
-        self.redo_btn.setEnabled(False)
 
         return lst_btns  # return the things we want to change the keyPressEvent of
 
+    def __update_undo_buttons(self, enable=True) -> None:
+        self.undo_btn.setEnabled(enable and self.__history.can_undo)
+        self.redo_btn.setEnabled(enable and self.__history.can_redo)
+
+    def __do(self, command) -> bool:
+        """
+        Applies an edit to the current animation through the undo history
+        @return: whether the edit changed the animation
+        """
+        changed = self.__history.do(self.curr_animation, command)
+        self.__update_undo_buttons()
+        return changed
+
+    def __undo(self) -> None:
+        if self.curr_animation and not self.play:
+            self.__show_history_step(self.__history.undo(self.curr_animation), undone=True)
+
+    def __redo(self) -> None:
+        if self.curr_animation and not self.play:
+            self.__show_history_step(self.__history.redo(self.curr_animation), undone=False)
+
+    def __show_history_step(self, command, undone: bool) -> None:
+        """
+        Goes to where an undone or redone command made its edit and refreshes what it changed
+        """
+        if command is None: return
+        self.__update_undo_buttons()
+        if command.frame_index is not None:
+            self.curr_frame = command.frame_index
+        self.curr_frame = max(0, min(self.curr_frame, self.__ani_length - 1))
+        if command.layer is not None:
+            self.curr_sprite = command.layer
+        if isinstance(command, AddSprite):
+            image_path = command.replaced_image_path if undone else command.image_path
+            if image_path:
+                self.file_path_map[command.sprite_index] = image_path
+            else:
+                self.file_path_map.pop(command.sprite_index, None)
+        if command.sprite_index is not None:
+            self.__reload_sprite_image(command.sprite_index)
+        if isinstance(command, SetAttr):
+            self.__resolve_aliases()
+            self.__update_attr_image(command.attr)
+        if command.direction is not None and command.direction != self.curr_dir:
+            self.dir_combo_box.setCurrentText(command.direction.capitalize())
+        self.__listen = False
+        self.__set_frame_slider_max()
+        self.__set_animation_textboxes()
+        self.__set_animation_checkboxes()
+        self.__listen = True
+        self.__display_current_frame()
+
     def __init_graphics_view(self):
         self.__graphics_view = AniGraphicsView(self.centralwidget, -24, 0, 2)
         self.__graphics_view.setObjectName("graphicsView")
@@ -448,17 +625,9 @@ class Animator_GUI(Ui_MainWindow):
         self.horizontalLayout_3.setStretch(0, 2)
         self.horizontalLayout_3.setStretch(1, 10)
         self.horizontalLayout_3.setStretch(2, 1)
-        self.__prepare_graphics_view()
-
-    def __prepare_graphics_view(self):
-        self.__graphics_view.scene.clear()
-        self.__graphics_view.scene.addLine(0, -100000, 0, 100000)
-        self.__graphics_view.scene.addLine(-100000, 0, 100000, 0)
-        self.__graphics_view.scene.addLine(0, 49, 49, 49)
-        self.__graphics_view.scene.addLine(49, 0, 49, 49)
 
     def __do_change_layer(self, direction: str) -> None:
-        if self.__sprites_exist() and self.get_current_frame_part().change_layer(self.curr_sprite, direction):
+        if self.__sprites_exist() and self.__do(ChangeLayer(self.curr_frame, self.curr_dir, self.curr_sprite, direction)):
             if direction.lower() == "up":
                 self.curr_sprite += 1
             else:
@@ -475,7 +644,7 @@ class Animator_GUI(Ui_MainWindow):
 
     def __delete_curr_sprite(self) -> None:
         if self.curr_animation and self.curr_sprite is not None and self.curr_sprite >= 0:
-            self.get_current_frame_part().list_of_sprites.pop(self.curr_sprite)
+            self.__do(RemoveLayer(self.curr_frame, self.curr_dir, self.curr_sprite))
             self.__set_sprite_last() if len(self.get_current_frame_part().list_of_sprites) > 0 else None
             self.__display_current_frame()
 
@@ -495,8 +664,8 @@ class Animator_GUI(Ui_MainWindow):
             self.set_curr_sprite(self.curr_sprite - 1)
             return
         if event.key() == QtCore.Qt.Key_Space:
-            if self.play: 
-                self.play = False
+            if self.play:
+                self.__stop_animation()
             else:
                 self.__play_animation()
             return
@@ -536,7 +705,8 @@ class Animator_GUI(Ui_MainWindow):
         @param amount: int amount to shift the sprite
         """
         if not self.__sprites_exist(): return
-        self.get_current_frame_part().shift(self.curr_sprite, direction, amount)
+        dx, dy = (amount, 0) if direction.lower() == "horizontal" else (0, amount)
+        self.__do(MoveSprite(self.curr_frame, self.curr_dir, self.curr_sprite, dx, dy))
         self.__display_current_frame()
 
     def __sprites_exist(self) -> bool:
@@ -546,11 +716,15 @@ class Animator_GUI(Ui_MainWindow):
         if not self.__sprites_exist(): return
         self.__listen = False
         self.__correct_current_sprite()
-        self.x_textbox.setText(str(self.get_current_frame_part().list_of_sprites[self.curr_sprite][1]))  # TODO consider making these named tuples to avoid indexing
-        self.y_textbox.setText(str(self.get_current_frame_part().list_of_sprites[self.curr_sprite][2]))
+        list_of_sprites = self.get_current_frame_part().list_of_sprites
+        self.x_textbox.setText(str(list_of_sprites[self.curr_sprite][1]))  # TODO consider making these named tuples to avoid indexing
+        self.y_textbox.setText(str(list_of_sprites[self.curr_sprite][2]))
         self.selected_sprite_text.setText(str(self.curr_sprite))
-        self.selected_sprite_combo.clear()
-        self.selected_sprite_combo.addItems([f"{i}: {sprite.desc}" for i, (sprite, _, _) in enumerate(self.get_current_frame_part().list_of_sprites)])
+        combo_items = [f"{i}: {sprite.desc}" for i, (sprite, _, _) in enumerate(list_of_sprites)]
+        if combo_items != self.__combo_items:  # refilling the combo box is slow, nudges keep its items
+            self.selected_sprite_combo.clear()
+            self.selected_sprite_combo.addItems(combo_items)
+            self.__combo_items = combo_items
         self.selected_sprite_combo.setCurrentIndex(self.curr_sprite)
         self.__listen = True
         self.length_textbox.setText(f"{self.get_current_frame().length:.2f}")
@@ -576,43 +750,70 @@ class Animator_GUI(Ui_MainWindow):
 
     def __set_sprite_location(self, x=None, y=None) -> None:
         if not self.__sprites_exist(): return
-        self.get_current_frame_part().change_sprite_xs_ys(self.curr_sprite, x, y)
+        _, curr_x, curr_y = self.get_current_frame_part().list_of_sprites[self.curr_sprite]
+        dx = x - curr_x if isinstance(x, int) else 0
+        dy = y - curr_y if isinstance(y, int) else 0
+        self.__do(MoveSprite(self.curr_frame, self.curr_dir, self.curr_sprite, dx, dy))
         self.__display_current_frame()
 
-    def __display_current_frame(self) -> None:
+    def __display_current_frame(self, play_sfx=False) -> None:
+        """
+        Shows the current frame part on the canvas, reusing the items already in the scene
+        @param play_sfx: play the sounds of the frame even if the frame was already shown (during playback)
+        """
         if self.curr_animation:
-            if self.get_current_frame().sfxs:
-                for sfx, _, _ in self.get_current_frame().sfxs:
+            frame = self.get_current_frame()
+            if frame.sfxs:
+                for sfx, _, _ in frame.sfxs:
                     if sfx not in self.__sfx_dict:
                         self.__load_sfx_from_ani()
-            self.curr_sprite = self.curr_sprite if self.curr_sprite is None or 0 <= self.curr_sprite < len(self.get_current_frame_part().list_of_sprites) else -1
+            list_of_sprites = self.get_current_frame_part().list_of_sprites
+            self.curr_sprite = self.curr_sprite if self.curr_sprite is None or 0 <= self.curr_sprite < len(list_of_sprites) else -1
             self.__correct_current_sprite()
-            self.__prepare_graphics_view()
-            for i, (sprite, x, y) in enumerate(self.get_current_frame_part().list_of_sprites):
-                offsets = self.sprite_offsets.get(sprite.index)
-                x_offset, y_offset = offsets if offsets else (0, 0)
-                self.__graphics_view.scene.addItem(DragImage(self, sprite, i, x, y, x_offset, y_offset))
-            for i, (sfx, x, y) in enumerate(self.get_current_frame().sfxs):
-                self.__graphics_view.scene.addItem(SfxImage(self, sfx, self.__sfx_dict.get(sfx, None), x, y, i))
+            no_offsets = (0, 0)
+            self.__graphics_view.show_sprites(self, [(sprite, x, y, *self.sprite_offsets.get(sprite.index, no_offsets))
+                                                     for sprite, x, y in list_of_sprites])
+            self.__graphics_view.show_sfxs(self, [(sfx, self.__sfx_dict.get(sfx, None), x, y) for sfx, x, y in frame.sfxs])
             self.__update_sprite_textboxes()
             self.__set_frame_slider()
-            self.__play_frame_sfx()
+            if play_sfx or frame is not self.__shown_frame:  # not again for every edit of the frame
+                self.__play_frame_sfx()
+            self.__shown_frame = frame
             self.__clear_sfx_textbox()
 
     def change_sfx_pos(self, sfx_index: int, x: int, y: int) -> None:
-        self.get_current_frame().change_sfx_pos(sfx_index, x, y)
+        self.__do(MoveSfx(self.curr_frame, sfx_index, x, y))
         self.__display_current_frame()
 
     def __delete_sfx(self) -> None:
-        self.get_current_frame().delete_sfx(self.__last_sfx_num)
+        self.__do(DeleteSfx(self.curr_frame, self.__last_sfx_num))
         self.__display_current_frame()
     
-    def add_sprite_to_scroll_area(self, sprite: Sprite) -> None:
-        self.curr_animation.add_sprite(sprite)
-        pixmap, x_offset, y_offset = NewSpriteDialog.load_and_crop_sprite(self.file_path_map[sprite.index], sprite)
-        self.sprite_offsets[sprite.index] = (x_offset, y_offset)
-        self.sprite_images[sprite.index] = pixmap
-        self.__init_scroll_area()
+    def add_sprite_to_scroll_area(self, sprite: Sprite, replaced_image_path: str = None) -> None:
+        """
+        @param replaced_image_path: file the image of the sprite with the same index was loaded from, if it is replaced
+        """
+        self.__do(AddSprite(sprite, self.file_path_map[sprite.index], replaced_image_path))
+        self.__reload_sprite_image(sprite.index)
+
+    def __reload_sprite_image(self, index: int) -> None:
+        """
+        Loads the image of the sprite with the given index again, or forgets it if the animation no longer has the
+        sprite, and updates its row of the palette
+        """
+        sprite = self.curr_animation.get_sprite(index)
+        if sprite is None:
+            self.sprite_images.pop(index, None)
+            self.sprite_offsets.pop(index, None)
+            self.__loading_sprites.pop(index, None)
+            self.__sprite_palette.model().update_sprite(index)
+            return
+        self.__loading_sprites.pop(index, None)  # what the loader still sends for the index is out of date
+        from NewSpriteDialog import NewSpriteDialog
+        pixmap, x_offset, y_offset = NewSpriteDialog.load_and_crop_sprite(self.file_path_map.get(index) or self.find_file(sprite.image), sprite)
+        self.sprite_offsets[index] = (x_offset, y_offset)
+        self.sprite_images[index] = pixmap
+        self.__sprite_palette.model().update_sprite(index)
 
     def __play_frame_sfx(self) -> None:
         if sfxs := self.get_current_frame().sfxs:
@@ -622,81 +823,128 @@ class Animator_GUI(Ui_MainWindow):
 
     def __set_setbackto(self) -> None:
         if self.__listen:
-            self.curr_animation.set_setbackto(self.setbackto_textbox.text().strip().lower())
+            self.__do(SetSetbackto(self.setbackto_textbox.text().strip().lower()))
 
     def __update_attr_image(self, attr: str) -> None:
         attr = attr.upper()
         sprites = [sprite for sprite in self.curr_animation.sprites if sprite.image == attr]
+        from NewSpriteDialog import NewSpriteDialog
         for sprite in sprites:
+            self.__loading_sprites.pop(sprite.index, None)
             pixmap, x_offset, y_offset = NewSpriteDialog.load_and_crop_sprite(self.find_file(sprite.image), sprite)
             self.sprite_offsets[sprite.index] = (x_offset, y_offset)
             self.sprite_images[sprite.index] = pixmap
+            self.__sprite_palette.model().update_sprite(sprite.index)
 
     def __load_sfx_from_ani(self) -> None:
         if self.curr_animation:
-            for frame in self.curr_animation.frames:
-                for sfx, x, y in frame.sfxs:
+            frames = self.curr_animation.frames
+            for i in range(len(frames)):
+                for sfx, x, y in frames.sfxs(i):
                     if sfx and sfx not in self.__sfx_dict.keys():
-                        sfx_path = self.find_file(sfx)
-                        self.__sfx_dict[sfx] = pygame.mixer.Sound(sfx_path) if sfx_path else None
+                        sfx_path = self.find_file(sfx, SOUND_EXTENSIONS)
+                        self.__sfx_dict[sfx] = _mixer().Sound(sfx_path) if sfx_path else None
 
-    def __load_sprites_from_ani(self):
+    def __load_sprites_from_ani(self) -> None:
+        """
+        Loads the images of the sprites in the background (see SpriteLoader), the sprites are shown as transparent
+        placeholders until their images arrive in __on_sprite_loaded
+        """
         if self.curr_animation and len(self.curr_animation.sprites) > 0:
-            threads = []
+            from NewSpriteDialog import NewSpriteDialog
+            from sprite_loader import SpriteLoader
+            sprites_by_path = {}  # each image is decoded once, for all sprites cut from it
             for sprite in self.curr_animation.sprites:
-                thread = QtCore.QThread(None)
-                thread.run = lambda s=sprite: self.__load_sprites_from_ani_helper(s)
-                threads.append(thread)
-                thread.start()
-            [thread.wait() for thread in threads]
-
-    def __load_sprites_from_ani_helper(self, sprite):
-        image_path = self.find_file(sprite.image)
-        pixmap, x_offset, y_offset = NewSpriteDialog.load_and_crop_sprite(image_path, sprite)
+                image_path = self.find_file(sprite.image)
+                if not image_path:
+                    self.sprite_images[sprite.index], _, _ = NewSpriteDialog.load_and_crop_sprite(image_path, sprite)
+                    continue
+                sprites_by_path.setdefault(image_path, []).append(sprite)
+                self.__loading_sprites[sprite.index] = sprite
+                placeholder = QtGui.QPixmap(sprite.width, sprite.height)
+                placeholder.fill(QtCore.Qt.transparent)
+                self.sprite_images[sprite.index] = placeholder
+            self.__sprite_loader = SpriteLoader()
+            self.__sprite_loader.sprite_loaded.connect(self.__on_sprite_loaded)
+            self.__sprite_loader.progress.connect(lambda loaded, total: self.statusbar.showMessage(f"Loading sprites {loaded}/{total}"))
+            self.__sprite_loader.finished.connect(self.__on_sprites_loaded)
+            self.__sprite_loader.load(sprites_by_path)
+
+    def __on_sprite_loaded(self, sprite: Sprite, image: QtGui.QImage, x_offset: int, y_offset: int, width: int, height: int) -> None:
+        """
+        @param image: the cropped image of the sprite, None if it could not be loaded (the placeholder stays)
+        @param width, height: of the sprite, clamped to its source image
+        """
+        if self.__loading_sprites.get(sprite.index) is not sprite: return  # reloaded or replaced meanwhile
+        del self.__loading_sprites[sprite.index]
+        sprite.width, sprite.height = width, height
+        if image is None: return
         if x_offset or y_offset:
             self.sprite_offsets[sprite.index] = (x_offset, y_offset)
-        self.sprite_images[sprite.index] = pixmap
+        self.sprite_images[sprite.index] = QtGui.QPixmap.fromImage(image)
+        self.__sprite_palette.model().update_sprite(sprite.index)
+        if not self.__loaded_sprites_timer.isActive():
+            self.__loaded_sprites_timer.start()
+
+    def __show_loaded_sprites(self) -> None:
+        if self.curr_animation and not self.play:
+            self.__display_current_frame()
+
+    def __on_sprites_loaded(self) -> None:
+        self.statusbar.clearMessage()
+        self.__loaded_sprites_timer.stop()
+        self.__show_loaded_sprites()
+
+    def __cancel_sprite_loading(self) -> None:
+        if self.__sprite_loader:
+            self.__sprite_loader.cancel()
+            self.__sprite_loader = None
+        self.__loading_sprites.clear()
+        self.__loaded_sprites_timer.stop()
+
+    def wait_for_sprites(self) -> None:
+        """
+        Processes events until the images of all sprites of the animation are loaded, for scripts and benchmarks
+        that need them right after opening a file
+        """
+        loader = self.__sprite_loader
+        if loader and not loader.done:
+            loop = QtCore.QEventLoop()
+            loader.finished.connect(loop.quit)
+            loop.exec_()
 
-    def find_file(self, file_name: str):
+    def find_file(self, file_name: str, extensions: tuple = IMAGE_EXTENSIONS):
         if file_name in self.file_path_map:
             return self.file_path_map[file_name]
 
-        file_name_upper = file_name.upper()  # TODO: make these already be in self.file_path_map from start.
-        if file_name_upper == "SPRITES":
-            return self.find_file("sprites.png")
-        elif file_name_upper == "SHIELD":
-            return self.find_file(self.curr_animation.attrs['shield'])
-        elif file_name_upper == "BODY":
-            return self.find_file(self.curr_animation.attrs['body'])
-        elif file_name_upper == "HEAD":
-            return self.find_file(self.curr_animation.attrs['head'])
-        elif file_name_upper == "ATTR1":
-            return self.find_file(self.curr_animation.attrs['attr1'])
-        elif file_name_upper == "ATTR2":
-            return self.find_file(self.curr_animation.attrs['attr2'])
-        elif file_name_upper == "ATTR3":
-            return self.find_file(self.curr_animation.attrs['attr3'])
-        elif file_name_upper == "ATTR12":
-            return self.find_file(self.curr_animation.attrs['attr12'])
-        elif file_name_upper == "PARAM1":
-            return self.find_file(self.curr_animation.attrs['param1'])
-        elif file_name_upper == "PARAM2":
-            return self.find_file(self.curr_animation.attrs['param2'])
-        elif file_name_upper == "PARAM3":
-            return self.find_file(self.curr_animation.attrs['param3'])
-        
+        alias = file_name.upper()
+        if alias in ALIASES:
+            if self.__alias_files is None:
+                self.__resolve_aliases()
+            # looked up like any other name, so a missing file is looked for again once the miss expires
+            alias_file = self.__alias_files.get(alias)
+            return self.find_file(alias_file) if alias_file else None
+
         # if the user did not enter an extension on their file, we still need to try to find the file
-        if '.' not in file_name:
-            possible_file_names = [f"{file_name.lower()}" + ext for ext in ('.png', '.gif', '.mng')]
-        else:
-            possible_file_names = (file_name.lower(),)
+        path = self.__assets.lookup(file_name, extensions)
+        if path:
+            self.file_path_map[file_name] = path
+        return path
 
-        for root, _, _ in os.walk(self.__game_folder_path, followlinks=True):
-            for possible_file_name in possible_file_names:
-                if os.path.isfile(os.path.join(root, possible_file_name)):
-                    self.file_path_map[file_name] = os.path.join(root, possible_file_name)
-                    return os.path.join(root, possible_file_name)
-        
+    def __resolve_aliases(self) -> None:
+        """
+        Finds the file names that the names in ALIASES stand for in the current animation, so that find_file does
+        not go through the attributes for every alias. Called whenever an attribute of the animation changes.
+        """
+        self.__alias_files = {}
+        for alias, attr in ALIASES.items():
+            self.__alias_files[alias] = "sprites.png" if attr is None else self.curr_animation.attrs[attr] or None
+
+    def __open_animation(self, file: str) -> Animation:
+        if os.path.getsize(file) >= self.__lazy_load_min_bytes:
+            # opening lazily is already cheaper than a cache hit, which builds every frame
+            return Animation(from_file=file, lazy=True)
+        return self.__ani_cache.open(file) if self.__ani_cache else Animation(from_file=file)
 
     def __new_animation(self, *, from_file=False, from_associated_file: str = "") -> None:
         self.__new_ani_loaded = False
@@ -707,17 +955,23 @@ class Animator_GUI(Ui_MainWindow):
             else:
                 file = from_associated_file
             if file.endswith(".gani"):
+                self.__end_playback_thread()
+                self.__cancel_sprite_loading()
                 self.curr_file = file
                 self.__init_vars()
-                self.curr_animation = Animation(from_file=file)
+                self.curr_animation = self.__open_animation(file)
                 self.__new_ani_loaded = True
         else:
+            self.__end_playback_thread()
+            self.__cancel_sprite_loading()
             self.curr_file = ""
             self.__init_vars()
             self.curr_animation = Animation()
             self.__new_ani_loaded = True
 
         if self.curr_animation and self.__new_ani_loaded:
+            self.__assets.forget_misses()  # files may have been added since they were last looked for
+            self.__resolve_aliases()
             self.__load_sprites_from_ani()
             self.enable_disable_buttons(True)
             self.__set_frame_slider_max()
@@ -749,19 +1003,11 @@ class Animator_GUI(Ui_MainWindow):
 
     def __init_scroll_area(self) -> None:
         """
-        Populate the scroll area with the current animation's sprites
+        Populate the sprite palette with the current animation's sprites. Later changes to single sprites update
+        their rows (see SpritePaletteModel.update_sprite).
         """
         if self.curr_animation:
-            self.sprite_scroll_area.setWidget(QtWidgets.QWidget())
-            self.sprite_scroll_area.widget().setLayout(QtWidgets.QVBoxLayout())
-
-            for index, image in sorted(self.sprite_images.items(), key=lambda x: x[0]):
-                im_view = DragSpriteView(self, image, index, self.curr_animation.sprites)
-                im_view.mouseReleaseEvent = lambda e, i=index: self.__drag_sprite_view_mouse_event(e, i)
-
-    def __drag_sprite_view_mouse_event(self, event, i) -> None:
-        if event.button() == QtCore.Qt.LeftButton:
-            self.__add_sprite_to_frame_part(i)
+            self.__sprite_palette.model().reset()
 
     def __add_sprite_to_frame_part(self, index: int) -> None:
         """
@@ -772,16 +1018,12 @@ class Animator_GUI(Ui_MainWindow):
             viewPoint = self.__graphics_view.mapFromGlobal(QtGui.QCursor.pos())
             scenePoint = self.__graphics_view.mapToScene(viewPoint)
 
-            sprite_to_add = None
-            for sprite in self.curr_animation.sprites:
-                if sprite.index == index:
-                    sprite_to_add = sprite
-                    break
+            sprite_to_add = self.curr_animation.get_sprite(index)
 
             # add sprite to the current frame part
             sprite_tuple = (sprite_to_add, round(scenePoint.x() - (sprite_to_add.width / 2)),
                             round(scenePoint.y() - (sprite_to_add.height / 2)))
-            self.get_current_frame_part().add_sprite_xs_ys(sprite_tuple)
+            self.__do(AddLayer(self.curr_frame, self.curr_dir, *sprite_tuple))
             # self.__correct_current_sprite()
             self.__set_sprite_last()
             self.__display_current_frame()
@@ -809,11 +1051,8 @@ class Animator_GUI(Ui_MainWindow):
         Delete the provided sprite from the sprite scroll area and animation
         """
         if self.curr_animation:
-            self.curr_animation.delete_sprite(sprite)
-            del self.sprite_images[sprite.index]
-            if sprite.index in self.sprite_offsets:
-                del self.sprite_offsets[sprite.index]
-            self.__init_scroll_area()
+            self.__do(DeleteSprite(sprite))
+            self.__reload_sprite_image(sprite.index)
             self.__display_current_frame()
 
     def edit_sprite(self, sprite: Sprite) -> None:
@@ -840,7 +1079,7 @@ class Animator_GUI(Ui_MainWindow):
         Reverses the order of the frames in the current animation
         """
         if self.curr_animation:
-            self.curr_animation.reverse_frames()
+            self.__do(ReverseFrames())
             self.__display_current_frame()
 
     def __save_animation_as(self) -> None:
@@ -852,10 +1091,54 @@ class Animator_GUI(Ui_MainWindow):
     def __save_animation(self) -> None:
         if self.curr_animation:
             if self.curr_file:
-                self.curr_animation.save(self.curr_file)
+                self.__start_save(self.curr_file)
             else:
                 self.__save_animation_as()
 
+    def __start_save(self, file_name: str) -> None:
+        """
+        Saves a snapshot of the current animation on a worker thread so that the editor does not freeze.
+        Only one save is written at a time, a save requested in the meantime starts once the running one is done.
+        The snapshot is taken when the save is requested, so opening another animation in the meantime does not
+        change what is written.
+        """
+        snapshot = self.curr_animation.snapshot()
+        if self.__save_thread is not None:
+            self.__pending_save = (snapshot, file_name)
+            return
+        self.__write_save(snapshot, file_name)
+
+    def __write_save(self, snapshot: Animation, file_name: str) -> None:
+        self.__save_thread = SaveAniWorker(snapshot, file_name)
+        self.__save_thread.saved_signal.connect(self.__on_animation_saved)
+        self.__save_thread.failed_signal.connect(self.__on_save_failed)
+        self.__save_thread.finished.connect(self.__on_save_thread_finished)
+        self.statusbar.showMessage(f"Saving {os.path.basename(file_name)}...")
+        self.__save_thread.start()
+
+    def __on_animation_saved(self, file_name: str) -> None:
+        self.statusbar.showMessage(f"Saved {os.path.basename(file_name)}", 5000)
+
+    def __on_save_failed(self, file_name: str, error: str) -> None:
+        self.statusbar.clearMessage()
+        QtWidgets.QMessageBox.warning(None, "Sprite Animator - Error", f"Could not save {file_name}.\n{error}")
+
+    def __on_save_thread_finished(self) -> None:
+        self.__save_thread = None
+        if self.__pending_save:
+            (snapshot, file_name), self.__pending_save = self.__pending_save, None
+            self.__write_save(snapshot, file_name)
+
+    def close_event(self, event) -> None:
+        """
+        Waits for the save being written and then writes the one requested in the meantime before the window closes,
+        so that no save is lost or left half written
+        """
+        while self.__save_thread is not None:
+            self.__save_thread.wait()
+            QtCore.QCoreApplication.processEvents()  # reports the save and starts the pending one
+        event.accept()
+
     def __change_dir(self) -> None:
         self.curr_dir = self.dir_combo_box.currentText().lower()
         self.__display_current_frame()
@@ -865,6 +1148,7 @@ class Animator_GUI(Ui_MainWindow):
         Creates a new window that allows the user to create a new sprite
         """
         if self.curr_animation:
+            from NewSpriteDialog import NewSpriteDialog
             new_sprite_window = QtWidgets.QDialog()
             NewSpriteDialog(self, new_sprite_window, from_sprite)
             new_sprite_window.exec_()
@@ -887,23 +1171,94 @@ class Animator_GUI(Ui_MainWindow):
         return file[0]
 
 
+class UpdateChecker(QtCore.QObject):
+    """
+    Asks GitHub for the latest release on a background thread and reports back through signals, so that startup
+    does not wait on the network. The thread is a daemon, closing the editor does not wait for it either.
+    """
+    update_available_signal = QtCore.pyqtSignal(str)  # the latest version
+    failed_signal = QtCore.pyqtSignal()
+    URL = "https://api.github.com/repos/nikovacs/sprite-animator/releases/latest"
+    TIMEOUT = 5  # seconds to wait for GitHub
+    DELAY_MS = 1000  # after startup
+
+    def __init__(self, current_version: str):
+        super().__init__()
+        self.current_version = current_version
+
+    def start(self) -> None:
+        threading.Thread(target=self.__run, name="update-check", daemon=True).start()
+
+    def __run(self) -> None:
+        try:
+            import requests
+            response = requests.get(UpdateChecker.URL, timeout=UpdateChecker.TIMEOUT)
+            if response.status_code == 200:
+                version = response.json()["name"]
+                if version != self.current_version:
+                    self.update_available_signal.emit(version)
+        except Exception:
+            self.failed_signal.emit()
+
+
 class RunAniWorker(QtCore.QThread):
-    update_screen_signal = QtCore.pyqtSignal()
+    """
+    Plays an animation on the monotonic clock (see PlaybackClock) and hands the frames to show to the GUI thread.
+    A frame that becomes due while the editor is still showing the one before is dropped instead of queued.
+    """
+    show_frame_signal = QtCore.pyqtSignal(int, float)  # frame index, time.monotonic() at which it is due
 
-    def __init__(self, parent: Animator_GUI):
+    def __init__(self, animation: Animation):
         super().__init__()
-        self.parent = parent
+        self.__animation = animation
+        self.stats = PlaybackStats()
+        self.__stopped = threading.Event()
+        self.__shown = threading.Event()  # the last frame handed over is on screen
+        self.__shown.set()
+
+    def stop(self) -> None:
+        self.__stopped.set()
+
+    def frame_shown(self, due: float) -> None:
+        """
+        Called by the GUI thread once the frame due at due is on screen
+        """
+        self.stats.record_shown(time.monotonic() - due)
+        self.__shown.set()
+
+    def run(self):
+        clock = PlaybackClock(self.__animation, time.monotonic(), self.stats)
+        while not self.__stopped.is_set():
+            frame = clock.frame_at(time.monotonic())
+            if frame is None: return
+            index, due, end = frame
+            if self.__shown.is_set():
+                self.__shown.clear()
+                self.show_frame_signal.emit(index, due)
+            else:
+                self.stats.dropped += 1
+            self.__stopped.wait(max(0.0, end - time.monotonic()))  # stopping wakes it up
+
+
+class SaveAniWorker(QtCore.QThread):
+    """
+    Writes an animation snapshot to disk off the GUI thread and reports back through signals.
+    """
+    saved_signal = QtCore.pyqtSignal(str)  # file name
+    failed_signal = QtCore.pyqtSignal(str, str)  # file name, error message
+
+    def __init__(self, animation: Animation, file_name: str):
+        super().__init__()
+        self.animation = animation
+        self.file_name = file_name
 
     def run(self):
-        if self.parent.curr_animation:
-            while self.parent.play:
-                for i in range(len(self.parent.curr_animation.frames)):
-                    self.parent.curr_frame = i
-                    self.update_screen_signal.emit()
-                    if not self.parent.play: return  # allows stopping mid-animation
-                    time.sleep(self.parent.get_current_frame().length)
-                if not self.parent.curr_animation.is_loop:
-                    self.parent.play = False
+        try:
+            self.animation.save(self.file_name)
+        except Exception as e:
+            self.failed_signal.emit(self.file_name, str(e))
+        else:
+            self.saved_signal.emit(self.file_name)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,121 @@
+import copy
+import itertools
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5 import QtCore
+from NewSpriteDialog import NewSpriteDialog
+from render_cache import renders
+
+THREADS = max(1, min(4, os.cpu_count() or 1))  # sprites are cut on at most this many threads at once
+
+_pool = None  # shared by every loader of the process
+_relay = None
+_loaders = weakref.WeakValueDictionary()  # {key: SpriteLoader}, results of loaders that are gone are dropped
+_keys = itertools.count()
+
+
+class _Relay(QtCore.QObject):
+    """
+    Carries results from the pool threads to the GUI thread. The tasks only know the key of their loader, so a
+    loader is never kept alive, and so never deleted, by a pool thread.
+    """
+    loaded = QtCore.pyqtSignal(int, object, object, int, int, int, int)  # key of the loader, then as SpriteLoader.sprite_loaded
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.loaded.connect(self.__deliver, QtCore.Qt.QueuedConnection)
+
+    def __deliver(self, key: int, *result) -> None:
+        loader = _loaders.get(key)
+        if loader is not None:
+            loader.receive(*result)
+
+
+class SpriteLoader(QtCore.QObject):
+    """
+    Loads the images of the sprites of an animation on a fixed pool of threads.
+
+    Sprites are grouped by the image they are cut from and each group is one task, so a sheet is decoded once
+    (see SheetCache) and no more threads run than the pool has, however many sprites there are.
+    The tasks only make QImages, which sprite_loaded hands to the GUI thread to be turned into QPixmaps there.
+    Images found in the render cache (see RenderCache) are neither cut again nor is their sheet decoded.
+    The sprites themselves are not touched off the GUI thread: tasks work on copies and the clamped width and
+    height come along with the image.
+    Must be created on the GUI thread.
+    """
+    sprite_loaded = QtCore.pyqtSignal(object, object, int, int, int, int)  # sprite, QImage or None if it could not be loaded, x_offset, y_offset, width, height
+    progress = QtCore.pyqtSignal(int, int)  # sprites loaded, sprites to load
+    finished = QtCore.pyqtSignal()  # every sprite was loaded, not emitted once cancelled
+
+    def __init__(self) -> None:
+        global _pool, _relay
+        super().__init__()
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=THREADS, thread_name_prefix="sprite-loader")
+            _relay = _Relay()
+        self.__key = next(_keys)
+        _loaders[self.__key] = self
+        self.__cancelled = threading.Event()
+        self.__futures = []
+        self.__loaded = 0
+        self.__total = 0
+
+    def load(self, sprites_by_path: dict) -> None:
+        """
+        Starts loading, returns at once
+        @param sprites_by_path: {path of the image file: [sprites cut from it]}
+        """
+        self.__total = sum(len(sprites) for sprites in sprites_by_path.values())
+        if not self.__total:
+            self.finished.emit()
+            return
+        for path, sprites in sprites_by_path.items():
+            copies = [copy.copy(sprite) for sprite in sprites]
+            self.__futures.append(_pool.submit(_load_group, self.__key, self.__cancelled, path, copies, sprites))
+
+    def cancel(self) -> None:
+        """
+        Drops the groups that have not started, stops the running ones at their next sprite and ignores what
+        they already sent
+        """
+        self.__cancelled.set()
+        for future in self.__futures:
+            future.cancel()
+
+    @property
+    def done(self) -> bool:
+        return self.__cancelled.is_set() or self.__loaded == self.__total
+
+    def receive(self, sprite, image, x_offset: int, y_offset: int, width: int, height: int) -> None:
+        """
+        Called on the GUI thread for every sprite a task is done with
+        """
+        if self.__cancelled.is_set(): return
+        self.__loaded += 1
+        self.sprite_loaded.emit(sprite, image, x_offset, y_offset, width, height)
+        self.progress.emit(self.__loaded, self.__total)
+        if self.__loaded == self.__total:
+            self.finished.emit()
+
+
+def _load_group(key: int, cancelled: threading.Event, path: str, copies: list, sprites: list) -> None:
+    """
+    Runs on a pool thread
+    @param copies: copies of sprites, which may be changed freely here
+    """
+    for sprite_copy, sprite in zip(copies, sprites):
+        if cancelled.is_set(): return
+        render_key = renders.key(path, sprite_copy)
+        cached = renders.load(render_key) if render_key else None
+        if cached:
+            image, x_offset, y_offset, sprite_copy.width, sprite_copy.height = cached
+        else:
+            try:
+                image, x_offset, y_offset = NewSpriteDialog.crop_sprite_image(path, sprite_copy)
+            except Exception:  # an unreadable image, every sprite still has to be reported for the loader to finish
+                image, x_offset, y_offset = None, 0, 0
+            else:
+                if render_key: renders.store(render_key, image, x_offset, y_offset, sprite_copy.width, sprite_copy.height)
+        _relay.loaded.emit(key, sprite, image, x_offset, y_offset, sprite_copy.width, sprite_copy.height)
@@ -0,0 +1,168 @@
+import bisect
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+THUMBNAIL_SIZE = 96  # sprites bigger than this are scaled down to fit in the palette
+PADDING = 4
+
+
+class SpritePaletteModel(QtCore.QAbstractListModel):
+    """
+    The sprites of the current animation, one row per sprite in the order of their indices.
+    Rows are inserted, removed and refreshed one at a time by update_sprite as sprites change, and the thumbnail of a
+    sprite is made when its row is first painted and kept until the image of the sprite is replaced.
+    """
+    SpriteIndexRole = QtCore.Qt.UserRole
+
+    def __init__(self, parent) -> None:
+        """
+        @param parent: the Animator_GUI whose sprite_images and curr_animation are shown
+        """
+        super().__init__()
+        self.parent = parent
+        self.__indices = []  # sprite index of each row, sorted
+        self.__thumbnails = {}  # {sprite index: (image the thumbnail was made from, thumbnail)}
+
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.__indices)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.__indices): return None
+        sprite_index = self.__indices[index.row()]
+        if role == SpritePaletteModel.SpriteIndexRole:
+            return sprite_index
+        if role == QtCore.Qt.DecorationRole:
+            return self.thumbnail(sprite_index)
+        if role == QtCore.Qt.ToolTipRole:
+            sprite = self.parent.curr_animation.get_sprite(sprite_index) if self.parent.curr_animation else None
+            return f"Sprite({sprite_index}) " + sprite.desc if sprite else None
+        return None
+
+    def reset(self) -> None:
+        """
+        Shows the sprites of sprite_images from scratch, for a new animation
+        """
+        self.beginResetModel()
+        self.__indices = sorted(self.parent.sprite_images)
+        self.__thumbnails.clear()
+        self.endResetModel()
+
+    def update_sprite(self, sprite_index: int) -> None:
+        """
+        Adds, refreshes or removes the row of a sprite after its entry in sprite_images was set or removed
+        """
+        row = bisect.bisect_left(self.__indices, sprite_index)
+        present = row < len(self.__indices) and self.__indices[row] == sprite_index
+        if sprite_index in self.parent.sprite_images:
+            if present:
+                self.dataChanged.emit(self.index(row), self.index(row))
+            else:
+                self.beginInsertRows(QtCore.QModelIndex(), row, row)
+                self.__indices.insert(row, sprite_index)
+                self.endInsertRows()
+        elif present:
+            self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+            del self.__indices[row]
+            self.__thumbnails.pop(sprite_index, None)
+            self.endRemoveRows()
+
+    def thumbnail(self, sprite_index: int) -> QtGui.QPixmap or None:
+        """
+        @return: the image of the sprite, scaled down to fit in THUMBNAIL_SIZE if it is bigger
+        """
+        image = self.parent.sprite_images.get(sprite_index)
+        if image is None: return None
+        cached = self.__thumbnails.get(sprite_index)
+        if cached is None or cached[0] is not image:
+            thumbnail = image
+            if image.width() > THUMBNAIL_SIZE or image.height() > THUMBNAIL_SIZE:
+                thumbnail = image.scaled(THUMBNAIL_SIZE, THUMBNAIL_SIZE, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+            cached = self.__thumbnails[sprite_index] = (image, thumbnail)
+        return cached[1]
+
+
+class SpritePaletteDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    Paints the thumbnail of a sprite centered in a framed cell of fixed size
+    """
+    def paint(self, painter, option, index) -> None:
+        cell = option.rect.adjusted(PADDING // 2, PADDING // 2, -PADDING // 2 - 1, -PADDING // 2 - 1)
+        painter.save()
+        if option.state & QtWidgets.QStyle.State_MouseOver:
+            painter.fillRect(cell, option.palette.alternateBase())
+        painter.setPen(option.palette.mid().color())
+        painter.drawRect(cell)
+        thumbnail = index.data(QtCore.Qt.DecorationRole)
+        if thumbnail is not None and not thumbnail.isNull():
+            painter.drawPixmap(cell.x() + (cell.width() - thumbnail.width()) // 2,
+                               cell.y() + (cell.height() - thumbnail.height()) // 2, thumbnail)
+        painter.restore()
+
+    def sizeHint(self, option, index) -> QtCore.QSize:
+        return QtCore.QSize(THUMBNAIL_SIZE + 2 * PADDING, THUMBNAIL_SIZE + 2 * PADDING)
+
+
+class SpritePalette(QtWidgets.QListView):
+    """
+    Side bar of the sprites of the animation, for dragging sprites to the canvas. Only the rows in view are painted.
+    Pressing on a sprite and releasing the mouse over the canvas adds it there, right clicking a sprite gives the
+    options to edit or delete it.
+    """
+    sprite_released = QtCore.pyqtSignal(int)  # sprite index, when the mouse is released after pressing on it
+
+    def __init__(self, parent, widget_parent=None) -> None:
+        """
+        @param parent: the Animator_GUI
+        @param widget_parent: the widget the palette is shown in
+        """
+        super().__init__(widget_parent)
+        self.parent = parent
+        self.setModel(SpritePaletteModel(parent))
+        self.setItemDelegate(SpritePaletteDelegate(self))
+        self.setUniformItemSizes(True)  # rows are laid out by arithmetic instead of asking every row for its size
+        self.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self.setMouseTracking(True)
+        self.viewport().setCursor(QtCore.Qt.OpenHandCursor)
+        self.__pressed = None  # sprite index the left button was pressed on
+
+    def mousePressEvent(self, event) -> None:
+        index = self.indexAt(event.pos())
+        if event.button() == QtCore.Qt.LeftButton and index.isValid():
+            self.__pressed = index.data(SpritePaletteModel.SpriteIndexRole)
+            self.viewport().setCursor(QtCore.Qt.ClosedHandCursor)
+
+    def mouseMoveEvent(self, event) -> None:
+        pass  # no rubber band or dragging of rows
+
+    def mouseDoubleClickEvent(self, event) -> None:
+        self.mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event) -> None:
+        self.viewport().setCursor(QtCore.Qt.OpenHandCursor)
+        if event.button() == QtCore.Qt.LeftButton and self.__pressed is not None:
+            sprite_index, self.__pressed = self.__pressed, None
+            self.sprite_released.emit(sprite_index)
+
+    def keyPressEvent(self, event) -> None:
+        """
+        Calls the keypressevent method of parent so that the sprite can still be moved by the arrow keys without having
+        to click on the main canvas window/sprite
+        """
+        self.parent.key_press_event(event)
+
+    # on right click, give the options to edit or delete
+    def contextMenuEvent(self, event) -> None:
+        index = self.indexAt(event.pos())
+        sprite = self.parent.curr_animation.get_sprite(index.data(SpritePaletteModel.SpriteIndexRole)) \
+            if index.isValid() and self.parent.curr_animation else None
+        if sprite is None: return
+        menu = QtWidgets.QMenu()
+        edit_action = menu.addAction("Edit")
+        delete_action = menu.addAction("Delete")
+        action = menu.exec_(event.globalPos())
+        if action == edit_action:
+            self.parent.edit_sprite(sprite)
+        elif action == delete_action:
+            self.parent.delete_sprite(sprite)
@@ -0,0 +1,105 @@
+from sprite import Sprite
+
+
+class SpriteRegistry:
+    """
+    Holds the sprites of an animation keyed by their index.
+
+    The registry also keeps track of which frames use each sprite, so finding, replacing or deleting a sprite
+    only has to visit the frames that actually draw it instead of every frame in the animation.
+    Frames report their uses through add_use/remove_use once they have been attached with Frame.set_registry.
+
+    The order of the sprites is kept as an increasing number per sprite, so that a removed sprite can be put back in
+    its place without shifting the others. Putting one back only marks the order as out of date, it is sorted again
+    the next time the sprites are listed.
+    """
+    def __init__(self) -> None:
+        self.__sprites = {}  # {index: Sprite} in the order they were added, unless __unsorted
+        self.__order = {}  # {index: place of the sprite in the order}
+        self.__next_place = 0
+        self.__unsorted = False  # whether a sprite was put back in a place before the end of __sprites
+        self.__uses = {}  # {index: {Frame: number of layers of the frame drawing the sprite}}
+
+    def __len__(self) -> int:
+        return len(self.__sprites)
+
+    def __iter__(self):
+        return iter(self.__sorted().values())
+
+    def __contains__(self, index: int) -> bool:
+        return index in self.__sprites
+
+    def keys(self):
+        """
+        @return: a view of the indices of the sprites
+        """
+        return self.__sorted().keys()
+
+    def get(self, index: int) -> Sprite:
+        """
+        @param index: the index of the sprite
+        @return: the sprite with the given index, or None if there is no such sprite
+        """
+        return self.__sprites.get(index)
+
+    def add(self, sprite: Sprite, position: int = None) -> Sprite:
+        """
+        Adds a sprite, replacing any sprite that already has the same index.
+        The sprite is moved to the end of the order either way, unless a position is given.
+        @param sprite: the sprite to add
+        @param position: place of the sprite in the order, as returned by position before it was removed or replaced
+        @return: the sprite that was replaced, or None
+        """
+        replaced = self.__sprites.pop(sprite.index, None)
+        if position is None:
+            position = self.__next_place
+            self.__next_place += 1
+        else:
+            self.__unsorted = True
+        self.__sprites[sprite.index] = sprite
+        self.__order[sprite.index] = position
+        return replaced
+
+    def position(self, index: int) -> int:
+        """
+        @return: the place of the sprite with the given index in the order, or None if there is no such sprite.
+        Places only compare with each other, they are not the number of sprites before it.
+        """
+        return self.__order.get(index)
+
+    def remove(self, index: int) -> Sprite:
+        """
+        @param index: the index of the sprite to remove
+        @return: the removed sprite, or None if there was no such sprite
+        """
+        self.__order.pop(index, None)
+        return self.__sprites.pop(index, None)
+
+    def __sorted(self) -> dict:
+        """
+        @return: __sprites, sorted by place first if a sprite was put back before the end
+        """
+        if self.__unsorted:
+            self.__sprites = dict(sorted(self.__sprites.items(), key=lambda item: self.__order[item[0]]))
+            self.__unsorted = False
+        return self.__sprites
+
+    def uses(self, index: int) -> list:
+        """
+        @param index: the index of the sprite
+        @return: the frames that draw the sprite on at least one layer
+        """
+        return list(self.__uses.get(index, ()))
+
+    def add_use(self, index: int, frame, count=1) -> None:
+        frames = self.__uses.setdefault(index, {})
+        frames[frame] = frames.get(frame, 0) + count
+
+    def remove_use(self, index: int, frame, count=1) -> None:
+        frames = self.__uses.get(index)
+        if not frames or frame not in frames: return
+        frames[frame] -= count
+        if frames[frame] <= 0:
+            del frames[frame]
+            if not frames:
+                del self.__uses[index]
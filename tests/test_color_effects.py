@@ -0,0 +1,85 @@
+"""
+Correctness of apply_color_effect (COLOREFFECT) in each mode, against a reference worked out one pixel at a time
+on random sprites, semi-transparent pixels and factors above 1 included: no channel may be off by more than 1.
+
+usage: python tests/test_color_effects.py, or python -m unittest discover tests
+"""
+import os
+import random
+import sys
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtGui, QtWidgets
+from color_effects import apply_color_effect
+
+
+def random_image(rng: random.Random, width: int, height: int) -> QtGui.QImage:
+    image = QtGui.QImage(width, height, QtGui.QImage.Format_ARGB32)
+    for y in range(height):
+        for x in range(width):
+            alpha = rng.choice((0, 255, 255, rng.randrange(256)))
+            image.setPixel(x, y, QtGui.qRgba(rng.randrange(256), rng.randrange(256), rng.randrange(256), alpha))
+    return image.convertToFormat(QtGui.QImage.Format_ARGB32_Premultiplied)
+
+
+def reference(image: QtGui.QImage, color_effect, mode: int) -> list:
+    """
+    @return: [(a, r, g, b)] premultiplied, of every pixel with the effect, worked out one pixel at a time
+    """
+    red, green, blue, alpha = color_effect
+    image = image.convertToFormat(QtGui.QImage.Format_ARGB32)  # pixel gives the stored value, unpremultiplied here
+    pixels = []
+    for y in range(image.height()):
+        for x in range(image.width()):
+            pixel = image.pixel(x, y)
+            a, r, g, b = QtGui.qAlpha(pixel), QtGui.qRed(pixel), QtGui.qGreen(pixel), QtGui.qBlue(pixel)
+            if mode == 1:
+                new_a = min(a * alpha, 255)
+                rgb = [min(c * f, 255) for c, f in ((r, red), (g, green), (b, blue))]
+            else:
+                gray = (r * 11 + g * 16 + b * 5) / 32 * a / 255  # of the premultiplied color
+                new_a = min(gray * alpha, 255)
+                factors = (red, green, blue) if mode == 0 else (1 - red, 1 - green, 1 - blue)
+                rgb = [min(max(gray * f, 0), 255) for f in factors]
+            pixels.append((new_a, *(c * new_a / 255 for c in rgb)))
+    return pixels
+
+
+class ColorEffectTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+
+    def check_mode(self, mode: int, seed: int = 0) -> None:
+        rng = random.Random(seed)
+        for _ in range(10):
+            image = random_image(rng, rng.randint(1, 12), rng.randint(1, 12))
+            color_effect = [rng.choice((0, 0.5, 1, 1.5, rng.random() * 2)) for _ in range(4)]
+            result = apply_color_effect(image, color_effect, mode).copy()
+            for index, pixel in enumerate(reference(image, color_effect, mode)):
+                got = result.pixel(index % image.width(), index // image.width())  # premultiplied, as stored
+                got = (QtGui.qAlpha(got), QtGui.qRed(got), QtGui.qGreen(got), QtGui.qBlue(got))
+                self.assertTrue(all(abs(g - e) <= 1 for g, e in zip(got, pixel)), (color_effect, got, pixel))
+
+    def test_mode_0(self) -> None:
+        self.check_mode(0)
+
+    def test_mode_1(self) -> None:
+        self.check_mode(1)
+
+    def test_mode_2(self) -> None:
+        self.check_mode(2)
+
+    def test_source_unchanged(self) -> None:
+        image = random_image(random.Random(1), 8, 8)
+        before = image.copy()
+        for mode in (0, 1, 2):
+            apply_color_effect(image, (0.5, 1.5, 0.25, 0.75), mode)
+        self.assertEqual(image, before)
+
+
+if __name__ == "__main__":
+    unittest.main()